@@ -0,0 +1,32 @@
+"""
+AI Chat Archive: import Claude and ChatGPT exports into a dated markdown
+archive, with search, catalog, embedding and near-duplicate indexes.
+
+Importing the package is cheap. Submodules load when first used, and so
+does the configuration (see settings). For convenience, helpers can be
+reached as attributes of the package, e.g. ``ai_chat_archive.SearchIndex``.
+To change settings such as ARCHIVE_ROOT, assign them on ``settings``.
+Assigning them on the package has no effect.
+"""
+
+import importlib
+
+# Searched in this order when a helper is looked up on the package
+_SUBMODULES = ("settings", "parallel", "analysis", "claude_api", "context", "exports", "transcripts", "entries",
+               "sources", "manifest", "search", "catalog", "duplicates", "enrich", "pipeline", "batches", "cli",
+               "vectors")
+
+
+def __getattr__(name: str):
+    """Import a submodule, or find a helper in the submodules, on first use."""
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    for submodule in _SUBMODULES:
+        try:
+            module = importlib.import_module(f"{__name__}.{submodule}")
+        except ImportError:
+            # vectors needs numpy
+            continue
+        if name in dir(module) or (submodule == "settings" and name in module._LAZY_SETTINGS):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,379 @@
+"""Rule-based analysis: domain detection, tags, summaries and key outputs without an API."""
+
+import re
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import settings
+
+
+# ============================================================================
+# RULE-BASED ANALYSIS
+# ============================================================================
+
+# Topic tags and the keywords that trigger them
+TOPIC_TAG_KEYWORDS = {
+    "positioning": ["positioning", "brand strategy", "offer"],
+    "music": ["song", "lyrics", "melody", "music", "audio"],
+    "code": ["python", "javascript", "function", "script", "code"],
+    "2e": ["2e", "dyslexia", "twice-exceptional", "neurodivergent"],
+    "shadow-work": ["shadow", "integration", "shadow-work"],
+    "website": ["website", "site", "landing page", "domain"]
+}
+
+
+class KeywordMatcher:
+    """
+    Find which of a fixed set of keywords occur in a text, in one pass.
+
+    The keywords are compiled into a single trie-shaped regex that is tried at
+    every position through a lookahead, so overlapping matches are found and the
+    cost grows with text length rather than keywords x text length. The regex
+    reports the longest keyword starting at each position; shorter keywords
+    that are prefixes of it are added from a precomputed table.
+
+    Below REGEX_MIN_KEYWORDS keywords, one C-level substring scan per keyword
+    is still faster than the regex pass, so small tables use that instead.
+    """
+
+    REGEX_MIN_KEYWORDS = 100
+
+    def __init__(self, keywords):
+        self.keywords = sorted({kw.lower() for kw in keywords if kw})
+        self.prefixes = {
+            kw: [other for other in self.keywords if other != kw and kw.startswith(other)]
+            for kw in self.keywords
+        }
+        self.pattern = re.compile(f"(?=({self._trie_pattern(self.keywords)}))") if self.keywords else None
+
+    @staticmethod
+    def _trie_pattern(keywords: List[str]) -> str:
+        trie = {}
+        for kw in keywords:
+            node = trie
+            for char in kw:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            # Greedy optional branch: prefer the longest keyword at this position
+            return f"(?:{body})?" if "" in node else body
+
+        return build(trie)
+
+    def find(self, text: str) -> set:
+        """Return the set of keywords occurring in text (text must already be lowercased)."""
+        if self.pattern is None:
+            return set()
+        if len(self.keywords) < self.REGEX_MIN_KEYWORDS:
+            found = {kw for kw in self.keywords if kw in text}
+        else:
+            found = set(self.pattern.findall(text))
+            for kw in list(found):
+                found.update(self.prefixes[kw])
+        return found
+
+
+# (keywords it was built from, matcher)
+_keyword_matcher: Optional[Tuple[Tuple[str, ...], KeywordMatcher]] = None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Return the matcher for all domain and topic-tag keywords, rebuilt when the keywords change."""
+    global _keyword_matcher
+    keywords = tuple(kw for kws in settings.DOMAIN_KEYWORDS.values() for kw in kws)
+    keywords += tuple(kw for kws in TOPIC_TAG_KEYWORDS.values() for kw in kws)
+    if _keyword_matcher is None or _keyword_matcher[0] != keywords:
+        _keyword_matcher = (keywords, KeywordMatcher(keywords))
+    return _keyword_matcher[1]
+
+
+class ConversationAnalysis:
+    """
+    Per-conversation values shared by the rule-based analysis functions.
+
+    Each value is computed on first use and cached, so a transcript is
+    lowercased and keyword-scanned once, however many of detect_domain and
+    generate_tags run on it.
+    The lowercased copy is only needed for the keyword scan and is not kept,
+    so a large transcript does not stay resident twice.
+    """
+
+    def __init__(self, title: str, transcript: str):
+        self.title = title
+        self.transcript = transcript
+
+    @cached_property
+    def keyword_hits(self) -> set:
+        """Domain and topic-tag keywords occurring in the title or transcript."""
+        return get_keyword_matcher().find(f"{self.title} {self.transcript}".lower())
+
+    @cached_property
+    def domain(self) -> str:
+        """Highest-scoring domain (first in config order on ties), or the default domain."""
+        scores = {}
+        for domain, keywords in settings.DOMAIN_KEYWORDS.items():
+            score = sum(1 for kw in keywords if kw.lower() in self.keyword_hits)
+            if score > 0:
+                scores[domain] = score
+
+        if scores:
+            return max(scores, key=scores.get)
+
+        # Return default domain from config
+        default_domain = settings.CONFIG["domains"].get("default", "system")
+        return f"@{default_domain}" if not default_domain.startswith("@") else default_domain
+
+
+def generate_summary(title: str, transcript: str, domain: str) -> str:
+    """Generate a 2-3 sentence summary of the conversation."""
+    # Get first few exchanges to understand the topic
+    lines = transcript.split('\n', 20)[:20]
+    early_content = ' '.join(lines)
+
+    # Extract what the conversation was about
+    summary_parts = []
+
+    # First sentence: what was discussed
+    if title and title.strip():
+        summary_parts.append(f"Conversation about {title.lower()}.")
+    else:
+        # Try to infer from content
+        if "music" in early_content.lower() or "song" in early_content.lower():
+            summary_parts.append("Conversation about music creation or lyrics.")
+        elif "code" in early_content.lower() or "script" in early_content.lower():
+            summary_parts.append("Technical discussion about code or automation.")
+        elif "brand" in early_content.lower() or "positioning" in early_content.lower():
+            summary_parts.append("Discussion about brand strategy or positioning.")
+        else:
+            summary_parts.append("General conversation on various topics.")
+
+    # Second sentence: domain context
+    domain_names = {
+        "@loopwalker": "music and creative work",
+        "@pulsekeeper": "heart coherence and ADHD",
+        "@shadow-institute": "2E and dyslexia",
+        "@unlimited-band": "music collaboration",
+        "@brent": "brand and personal systems",
+        "@gal": "connections and outreach",
+        "@system": "systems and workflows"
+    }
+    domain_desc = domain_names.get(domain, "general topics")
+    summary_parts.append(f"Related to {domain_desc}.")
+
+    # Third sentence: key themes (if we can extract them)
+    themes = []
+    theme_keywords = {
+        "brand strategy": ["brand", "positioning", "offer"],
+        "music creation": ["song", "lyrics", "melody"],
+        "technical implementation": ["code", "script", "function"],
+        "workflow": ["workflow", "process", "system"],
+        "2E awareness": ["2e", "dyslexia", "neurodivergent"]
+    }
+
+    for theme, keywords in theme_keywords.items():
+        if any(kw in early_content.lower() for kw in keywords):
+            themes.append(theme)
+            if len(themes) >= 2:
+                break
+
+    if themes:
+        summary_parts.append(f"Key themes: {', '.join(themes)}.")
+
+    return ' '.join(summary_parts)
+
+
+# Phrases that mark a decision or commitment, matched anywhere in a line
+DECISION_MARKER_RE = re.compile(r"decided to|will|going to|plan to|final(?:ized)?", re.IGNORECASE)
+_BOLD_LABEL_RE = re.compile(r'\*\*(.+?):\*\*')
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of text one at a time, like text.split('\\n') without the list."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def extract_key_outputs(transcript: str) -> List[str]:
+    """
+    Extract key outputs from the conversation.
+
+    Prefers lines containing a decision marker. If there are none, falls back
+    to the first lines of assistant responses. Both are collected in a single
+    pass that stops as soon as three decision lines have been found.
+    """
+    outputs = []
+    fallback = []
+    # Lines left to look at after the most recent assistant marker
+    window = 0
+
+    for line in iter_lines(transcript):
+        # Look for decision markers
+        if len(line) < 200 and DECISION_MARKER_RE.search(line):
+            # Clean up the line
+            cleaned = _BOLD_LABEL_RE.sub('', line).strip()
+            if len(cleaned) > 10 and len(cleaned) < 150:
+                outputs.append(f"- {cleaned[:100]}")
+                if len(outputs) >= 3:
+                    break
+
+        # Key points from assistant responses, only needed if no decisions are found
+        if outputs or len(fallback) >= 3:
+            continue
+        if "**Assistant:**" in line or "**assistant**:" in line.lower():
+            window = 3
+        elif window:
+            window -= 1
+            if line.strip() and not line.startswith("**"):
+                cleaned = line.strip()
+                if len(cleaned) > 20 and len(cleaned) < 150:
+                    fallback.append(f"- {cleaned[:100]}")
+
+    outputs = outputs or fallback
+    return outputs[:3] if outputs else ["- [Key decisions or outputs from this conversation]"]
+
+
+def sanitize_topic(text: str) -> str:
+    """Convert text to a hyphenated topic name."""
+    # Remove special chars, lowercase, hyphenate
+    text = re.sub(r'[^\w\s-]', '', text.lower())
+    text = re.sub(r'\s+', '-', text.strip())
+    # Limit to 4 words
+    words = text.split('-')[:4]
+    result = '-'.join(words)
+    # Handle empty titles
+    if not result or result == '-':
+        return "untitled-conversation"
+    return result
+
+
+def detect_domain(content: str, title: str = "",
+                  analysis: Optional[ConversationAnalysis] = None) -> Optional[str]:
+    """Detect domain from content and title using keyword matching."""
+    if analysis is None:
+        analysis = ConversationAnalysis(title, content)
+    return analysis.domain
+
+
+def generate_tags(content: str, title: str, context: Dict,
+                  analysis: Optional[ConversationAnalysis] = None) -> List[str]:
+    """Generate tags from content and context."""
+    tags = set()
+    if analysis is None:
+        analysis = ConversationAnalysis(title, content)
+
+    # Add domain-related tags
+    detected_domain = detect_domain(content, title, analysis)
+    if detected_domain:
+        tags.add(detected_domain.replace("@", ""))
+
+    # Add sprint-related tags (if Human OS is enabled)
+    if settings.CONFIG["human_os"]["enabled"] and "flagship" in context["sprint"]:
+        flagship = context["sprint"]["flagship"].lower()
+        if "brand" in flagship:
+            tags.add("brand")
+        if "visual" in flagship:
+            tags.add("visual-direction")
+
+    # Add common topic tags
+    for tag, keywords in TOPIC_TAG_KEYWORDS.items():
+        if any(kw in analysis.keyword_hits for kw in keywords):
+            tags.add(tag)
+
+    return sorted(list(tags))[:5]  # Max 5 tags
+
+
+# ============================================================================
+# TOKEN ESTIMATES AND CHUNKING
+# ============================================================================
+
+# Word pieces, digit runs, and any other non-space character
+_TOKEN_PIECE_RE = re.compile(r'[A-Za-z]+|\d+|\S')
+# Start of a transcript message: **Speaker:** at the beginning of a line
+_MESSAGE_START_RE = re.compile(r'^\*\*[^*\n]{1,40}:\*\* ', re.MULTILINE)
+# Lines that usually carry results: list items, headings, code fences
+_OUTPUT_LINE_RE = re.compile(r'^\s*(?:[-*] |\d+[.)] |#{1,6} |```)', re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate Claude's token count for text without a tokenizer.
+
+    Counts a token per word (plus one per 7 letters beyond the first), per
+    3 digits and per punctuation mark or other symbol. Errs high for prose,
+    which is the safe side for budgets.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECE_RE.findall(text):
+        if piece.isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1 + len(piece) // 8
+    return tokens
+
+
+def split_messages(transcript: str) -> List[str]:
+    """Split a transcript into its messages, each with its trailing blank line, so "".join() restores it."""
+    starts = [match.start() for match in _MESSAGE_START_RE.finditer(transcript)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [transcript[start:end] for start, end in zip(starts, starts[1:] + [len(transcript)])]
+
+
+def _split_oversized(message: str, max_tokens: int) -> Iterator[str]:
+    """Split one message that is over max_tokens at line breaks (or, for a huge line, every few KB)."""
+    current, size = [], 0
+    for line in message.splitlines(keepends=True):
+        tokens = estimate_tokens(line)
+        if tokens > max_tokens:
+            if current:
+                yield "".join(current)
+                current, size = [], 0
+            step = max(1, len(line) * max_tokens // tokens)
+            yield from (line[i:i + step] for i in range(0, len(line), step))
+            continue
+        if current and size + tokens > max_tokens:
+            yield "".join(current)
+            current, size = [], 0
+        current.append(line)
+        size += tokens
+    if current:
+        yield "".join(current)
+
+
+def chunk_transcript(transcript: str, max_tokens: int) -> List[str]:
+    """
+    Split a transcript into chunks of at most ~max_tokens (see estimate_tokens).
+
+    Chunks end on message boundaries; only a message that is too long on its
+    own is split, at line breaks. Joining the chunks gives back the transcript.
+    """
+    chunks, current, size = [], [], 0
+    for message in split_messages(transcript):
+        tokens = estimate_tokens(message)
+        if current and size + tokens > max_tokens:
+            chunks.append("".join(current))
+            current, size = [], 0
+        if tokens > max_tokens:
+            chunks.extend(_split_oversized(message, max_tokens))
+            continue
+        current.append(message)
+        size += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def chunk_relevance(chunk: str) -> int:
+    """Cheap relevance score for a chunk: decision phrases plus list items, headings and code fences."""
+    return len(DECISION_MARKER_RE.findall(chunk)) + len(_OUTPUT_LINE_RE.findall(chunk))
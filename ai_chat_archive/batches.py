@@ -0,0 +1,244 @@
+"""
+Claude Message Batches for --claude-batch: summary prompts are queued while an
+import runs, sent as message batches, and the replies written back into the
+archive entries, over as many runs as it takes.
+"""
+
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Optional
+
+from . import settings
+from .claude_api import (TRANSCRIPT_PREVIEW_CHARS, LLMCache, analysis_max_tokens, analysis_prompt,
+                         chunk_note_prompts, get_llm_cache, join_chunk_notes, parse_analysis_response)
+from .entries import replace_entry_analysis
+from .settings import write_text_atomic
+from .transcripts import read_archive_entry
+
+
+# ============================================================================
+# MESSAGE BATCHES
+# ============================================================================
+
+class BatchQueue:
+    """
+    Message Batches requests for archive entries, stored in ARCHIVE_ROOT/.import-state/batches.sqlite.
+
+    Each entry queued with add() needs one "analysis" request (the combined
+    summary and key-outputs prompt). A long transcript first needs a
+    "chunk_notes" request per chunk picked by chunk_note_prompts(); its
+    analysis request is queued once all of its notes are back. Replies found
+    in the LLM cache are used without a request, and replies from batches are
+    added to it.
+
+    Requests go from queued to submitted (with their batch id) to done or
+    failed, and are dropped once their entry has been rewritten, so a later
+    run picks up where an interrupted one stopped: queued requests are
+    submitted and batches still running are polled again. `stats` counts
+    requests, tokens and rewritten entries for the import report.
+    """
+
+    def __init__(self, archive_root: Path):
+        import sqlite3
+
+        self.root = archive_root
+        state_dir = archive_root / ".import-state"
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(state_dir / "batches.sqlite"), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries "
+                        "(path TEXT PRIMARY KEY, title TEXT NOT NULL, domain TEXT NOT NULL, parts INTEGER)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS requests "
+                        "(id INTEGER PRIMARY KEY, path TEXT NOT NULL, kind TEXT NOT NULL, part INTEGER, "
+                        "prompt TEXT NOT NULL, max_tokens INTEGER NOT NULL, batch_id TEXT, state TEXT NOT NULL, "
+                        "reply TEXT)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS requests_path ON requests (path)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS requests_state ON requests (state, batch_id)")
+        self.db.commit()
+        self.cache = get_llm_cache()
+        self.model = settings.CONFIG["anthropic"]["model"]
+        self.stats = Counter()
+
+    def add(self, path: str, title: str, domain: str, transcript: str):
+        """Queue the analysis of the entry at path (relative to the archive root), replacing any queued before."""
+        self._drop(path)
+        plan = chunk_note_prompts(title, transcript, final_calls=1)
+        if plan is None:
+            self.db.execute("INSERT INTO entries VALUES (?, ?, ?, NULL)", (path, title, domain))
+            self._request(path, "analysis", None, analysis_prompt(title, transcript[:TRANSCRIPT_PREVIEW_CHARS], domain),
+                          analysis_max_tokens())
+            return
+        parts, prompts = plan
+        self.stats["chunked_conversations"] += 1
+        self.stats["chunks_sent"] += len(prompts)
+        self.stats["chunks_skipped"] += parts - len(prompts)
+        self.db.execute("INSERT INTO entries VALUES (?, ?, ?, ?)", (path, title, domain, parts))
+        notes_tokens = settings.CONFIG["anthropic"].get("max_tokens_chunk_notes", 150)
+        for part, prompt in prompts:
+            self._request(path, "chunk_notes", part, prompt, notes_tokens)
+
+    def _request(self, path: str, kind: str, part: Optional[int], prompt: str, max_tokens: int):
+        reply = None
+        if self.cache:
+            reply = self.cache.get(LLMCache.make_key(kind, self.model, max_tokens, prompt))
+            self.stats["cache_misses" if reply is None else "cache_hits"] += 1
+        self.db.execute("INSERT INTO requests (path, kind, part, prompt, max_tokens, state, reply) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (path, kind, part, prompt, max_tokens, "queued" if reply is None else "done", reply))
+
+    def _drop(self, path: str):
+        self.db.execute("DELETE FROM requests WHERE path = ?", (path,))
+        self.db.execute("DELETE FROM entries WHERE path = ?", (path,))
+
+    def advance(self, rewritten: Optional[Callable[[str, str], None]] = None) -> int:
+        """
+        Act on the replies so far. Returns the number of entries rewritten.
+
+        Entries whose chunk notes are all back get their analysis request
+        queued; entries whose analysis is back are rewritten, and
+        `rewritten(path, content)` is called for each (to update the
+        indexes). An entry with a failed request keeps its rule-based summary.
+        """
+        for (path,) in self.db.execute("SELECT DISTINCT path FROM requests WHERE state = 'failed'").fetchall():
+            self.stats["batch_failed"] += 1
+            self._drop(path)
+
+        ready = self.db.execute(
+            "SELECT path, title, domain, parts FROM entries e WHERE parts IS NOT NULL AND NOT EXISTS "
+            "(SELECT 1 FROM requests r WHERE r.path = e.path AND (r.kind = 'analysis' OR r.state != 'done'))")
+        for path, title, domain, parts in ready.fetchall():
+            notes = self.db.execute("SELECT part, reply FROM requests WHERE path = ? AND kind = 'chunk_notes' "
+                                    "ORDER BY part", (path,)).fetchall()
+            self._request(path, "analysis", None, analysis_prompt(title, join_chunk_notes(parts, notes), domain),
+                          analysis_max_tokens())
+
+        count = 0
+        for path, reply in self.db.execute("SELECT path, reply FROM requests "
+                                           "WHERE kind = 'analysis' AND state = 'done'").fetchall():
+            content = self._rewrite(path, reply)
+            if content is not None:
+                count += 1
+                if rewritten is not None:
+                    rewritten(path, content)
+            self._drop(path)
+        self.db.commit()
+        self.stats["batch_rewritten"] += count
+        return count
+
+    def _rewrite(self, path: str, reply: str) -> Optional[str]:
+        """Put an analysis reply into the entry's file; returns its new full content (None if nothing changed)."""
+        filepath = self.root / path
+        summary, outputs = parse_analysis_response(reply)
+        if not (summary or outputs) or not filepath.exists():
+            return None
+        # A section missing from the reply keeps its rule-based text
+        content = replace_entry_analysis(filepath.read_text(encoding="utf-8"), summary or None, outputs or None)
+        if content is None:
+            return None
+        write_text_atomic(filepath, content)
+        return read_archive_entry(filepath, content)
+
+    def submit(self, client) -> int:
+        """Send every queued request, in batches of anthropic.batch_size. Returns the number sent."""
+        batch_size = max(1, settings.CONFIG["anthropic"].get("batch_size", 10000))
+        sent = 0
+        while True:
+            rows = self.db.execute("SELECT id, prompt, max_tokens FROM requests WHERE state = 'queued' "
+                                   "ORDER BY id LIMIT ?", (batch_size,)).fetchall()
+            if not rows:
+                return sent
+            batch = client.messages.batches.create(requests=[
+                {"custom_id": f"request-{request_id}",
+                 "params": {"model": self.model, "max_tokens": max_tokens, "temperature": 0.3,
+                            "messages": [{"role": "user", "content": prompt}]}}
+                for request_id, prompt, max_tokens in rows])
+            self.db.executemany("UPDATE requests SET state = 'submitted', batch_id = ? WHERE id = ?",
+                                [(batch.id, request_id) for request_id, _, _ in rows])
+            self.db.commit()
+            self.stats["batch_requests"] += len(rows)
+            sent += len(rows)
+
+    def running(self) -> int:
+        """Requests submitted and not answered yet."""
+        return self.db.execute("SELECT count(*) FROM requests WHERE state = 'submitted'").fetchone()[0]
+
+    def poll(self, client) -> bool:
+        """Collect the results of every batch that has ended. Returns True if some are still running."""
+        still_running = False
+        batch_ids = [row[0] for row in self.db.execute(
+            "SELECT DISTINCT batch_id FROM requests WHERE state = 'submitted'").fetchall()]
+        for batch_id in batch_ids:
+            if client.messages.batches.retrieve(batch_id).processing_status != "ended":
+                still_running = True
+                continue
+            for item in client.messages.batches.results(batch_id):
+                request_id = int(item.custom_id.rsplit("-", 1)[1])
+                row = self.db.execute("SELECT kind, prompt, max_tokens FROM requests WHERE id = ? AND batch_id = ?",
+                                      (request_id, batch_id)).fetchone()
+                if row is None:
+                    # The entry was queued again (re-imported) since
+                    continue
+                if item.result.type != "succeeded":
+                    self.stats[f"batch_{item.result.type}"] += 1
+                    self.db.execute("UPDATE requests SET state = 'failed' WHERE id = ?", (request_id,))
+                    continue
+                message = item.result.message
+                reply = message.content[0].text
+                self.stats["input_tokens"] += message.usage.input_tokens
+                self.stats["output_tokens"] += message.usage.output_tokens
+                self.db.execute("UPDATE requests SET state = 'done', reply = ? WHERE id = ?", (reply, request_id))
+                if self.cache:
+                    self.cache.put(LLMCache.make_key(row[0], self.model, row[2], row[1]), reply)
+            # Requests the results did not mention
+            self.db.execute("UPDATE requests SET state = 'failed' WHERE batch_id = ? AND state = 'submitted'",
+                            (batch_id,))
+            self.db.commit()
+        return still_running
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def get_batch_client(api_key: str):
+    """
+    An Anthropic client for the Message Batches endpoints.
+
+    Raises RuntimeError if the installed anthropic package predates
+    client.messages.batches (added in 0.41.0).
+    """
+    import anthropic
+
+    options = settings.CONFIG["anthropic"]
+    client = anthropic.Anthropic(api_key=api_key, base_url=options.get("base_url"),
+                                 max_retries=options.get("max_retries", 5))
+    if not hasattr(client.messages, "batches"):
+        raise RuntimeError(f"anthropic {anthropic.__version__} has no Message Batches API; "
+                           "--claude-batch needs anthropic>=0.41.0 (pip install -U anthropic)")
+    return client
+
+
+def run_batches(queue: BatchQueue, client, rewritten: Optional[Callable[[str, str], None]] = None,
+                poll_seconds: Optional[float] = None) -> int:
+    """
+    Submit, poll and apply until no request is left. Returns the number of entries rewritten.
+
+    Safe to interrupt: the queue keeps every submitted batch id, so the next
+    run polls them again instead of paying for the requests twice.
+    """
+    if poll_seconds is None:
+        poll_seconds = settings.CONFIG["anthropic"].get("batch_poll_seconds", 60)
+    count = 0
+    while True:
+        count += queue.advance(rewritten)
+        queue.submit(client)
+        if not queue.running():
+            return count
+        if queue.poll(client):
+            print(f"  {queue.running()} batch requests running; checking again in {poll_seconds:g}s "
+                  f"(Ctrl-C is safe: run with --claude-batch again to collect them)")
+            time.sleep(poll_seconds)
@@ -0,0 +1,217 @@
+"""SQLite metadata catalog for domain, date, month and tag filtering."""
+
+import json
+import re
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import settings
+from .settings import MONTH_NAMES
+from .search import iter_archive_files, parse_archive_entry
+from .parallel import batched, ordered_map, process_pool
+from .transcripts import read_archive_entry
+
+
+# ============================================================================
+# ARCHIVE CATALOG
+# ============================================================================
+
+# Entries per task when rebuilding the catalog across processes
+CATALOG_BATCH_SIZE = 64
+
+
+def parse_month(text: str) -> Tuple[Optional[int], int]:
+    """Parse "2025-12", "12", "December" or "dec" into (year or None, month)."""
+    text = text.strip().lower()
+    match = re.fullmatch(r'(?:(\d{4})-)?(\d{1,2})', text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return (int(match.group(1)) if match.group(1) else None), int(match.group(2))
+    for number, name in MONTH_NAMES.items():
+        month_name = name.split('-')[1].lower()
+        if len(text) >= 3 and month_name.startswith(text):
+            return None, number
+    raise ValueError(f"not a month: {text!r}")
+
+
+class ArchiveCatalog:
+    """
+    Metadata catalog of archive entries, stored in ARCHIVE_ROOT/.catalog.sqlite.
+
+    One row per entry with the frontmatter fields (date, topic, domain, tags,
+    ai) plus path, transcript size and content hash. Domain, date, month and
+    tag lookups use indexes, so filtering never opens the markdown files.
+    """
+
+    COMMIT_EVERY = 500
+
+    def __init__(self, path: Path):
+        import sqlite3
+
+        self.path = path
+        self.db = sqlite3.connect(str(path), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries "
+                        "(path TEXT PRIMARY KEY, date TEXT NOT NULL, month INTEGER NOT NULL, topic TEXT, "
+                        "domain TEXT COLLATE NOCASE, tags TEXT, ai TEXT, transcript_bytes INTEGER, "
+                        "content_hash TEXT)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_domain_date ON entries (domain, date)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_date ON entries (date)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_month ON entries (month, date)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entry_tags "
+                        "(tag TEXT NOT NULL COLLATE NOCASE, path TEXT NOT NULL, PRIMARY KEY (tag, path)) "
+                        "WITHOUT ROWID")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entry_tags_path ON entry_tags (path)")
+        self.db.commit()
+        self._pending = 0
+
+    @staticmethod
+    def make_row(path: str, data: Dict, content: str) -> Tuple:
+        """Catalog row for an entry from the data dict it was rendered from."""
+        import hashlib
+
+        return (path, data["date"].strftime('%Y-%m-%d'), data["title"], data["domain"], list(data["tags"]),
+                data["ai"], len(data["transcript"].strip().encode('utf-8')),
+                hashlib.sha256(content.encode('utf-8')).hexdigest())
+
+    def add_row(self, row: Tuple):
+        """Insert or replace a row made by make_row (or read back from a file)."""
+        path, date, topic, domain, tags, ai, transcript_bytes, content_hash = row
+        month = int(date[5:7]) if re.match(r'\d{4}-\d{2}', date) else 0
+        self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (path, date, month, topic, domain, json.dumps(tags), ai, transcript_bytes, content_hash))
+        self.db.execute("DELETE FROM entry_tags WHERE path = ?", (path,))
+        self.db.executemany("INSERT OR IGNORE INTO entry_tags VALUES (?, ?)", [(tag, path) for tag in tags])
+        self._changed()
+
+    def record(self, path: str, data: Dict, content: str):
+        """Catalog the entry written to path (relative to the archive root)."""
+        self.add_row(self.make_row(path, data, content))
+
+    def refresh(self, path: str):
+        """Re-read the row for the entry at path from its file (after the file was rewritten in place)."""
+        self.add_row(_catalog_rows_for_files(settings.ARCHIVE_ROOT, [settings.ARCHIVE_ROOT / path])[0])
+
+    def remove(self, path: str):
+        """Drop the entry at path from the catalog."""
+        self.db.execute("DELETE FROM entries WHERE path = ?", (path,))
+        self.db.execute("DELETE FROM entry_tags WHERE path = ?", (path,))
+        self._changed()
+
+    def clear(self):
+        self.db.execute("DELETE FROM entries")
+        self.db.execute("DELETE FROM entry_tags")
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.commit()
+
+    def query(self, domains: Optional[List[str]] = None, tags: Optional[List[str]] = None,
+              month: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+              ai: Optional[str] = None, path: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Return entries matching every given filter, newest first.
+
+        Dates are YYYY-MM-DD strings (inclusive). month takes anything
+        parse_month accepts; without a year it matches that month in any year.
+        """
+        where = []
+        params = []
+        if domains:
+            where.append(f"domain IN ({', '.join('?' * len(domains))})")
+            params += domains
+        for tag in tags or []:
+            where.append("path IN (SELECT path FROM entry_tags WHERE tag = ?)")
+            params.append(tag)
+        if month:
+            year, number = parse_month(month)
+            if year:
+                where.append("date >= ? AND date < ?")
+                params += [f"{year:04d}-{number:02d}-01", f"{year:04d}-{number:02d}-99"]
+            else:
+                where.append("month = ?")
+                params.append(number)
+        if since:
+            where.append("date >= ?")
+            params.append(since)
+        if until:
+            where.append("date <= ?")
+            params.append(until)
+        if ai:
+            where.append("ai = ?")
+            params.append(ai)
+        if path:
+            where.append("path = ?")
+            params.append(path)
+
+        sql = "SELECT path, date, topic, domain, tags, ai, transcript_bytes, content_hash FROM entries"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY date DESC, path"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        columns = ("path", "date", "topic", "domain", "tags", "ai", "transcript_bytes", "content_hash")
+        results = [dict(zip(columns, row)) for row in self.db.execute(sql, params)]
+        for result in results:
+            result["tags"] = json.loads(result["tags"])
+        return results
+
+    def get(self, path: str) -> Optional[Dict]:
+        """Return the catalog row for one entry, if it is cataloged."""
+        return next(iter(self.query(path=path)), None)
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def commit(self):
+        self.db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+def get_catalog_path() -> Path:
+    """Location of the archive's metadata catalog."""
+    return settings.ARCHIVE_ROOT / ".catalog.sqlite"
+
+
+def _catalog_rows_for_files(archive_root: Path, filepaths: List[Path]) -> List[Tuple]:
+    """Read catalog rows back from archive files (runs in worker processes)."""
+    import hashlib
+
+    rows = []
+    for filepath in filepaths:
+        # Hashed with the transcript, as when the entry was recorded at import time
+        raw = read_archive_entry(filepath).encode('utf-8')
+        entry = parse_archive_entry(raw.decode('utf-8'))
+        rows.append((str(filepath.relative_to(archive_root)), entry.get("date", ""), entry.get("topic", ""),
+                     entry["domains"][0] if entry["domains"] else "", entry["tags"], entry.get("ai", ""),
+                     len(entry["transcript"].encode('utf-8')), hashlib.sha256(raw).hexdigest()))
+    return rows
+
+
+def rebuild_catalog(archive_root: Path, catalog: ArchiveCatalog, workers: int = 1) -> int:
+    """Re-create the catalog from the markdown files in the archive. Returns the number of entries."""
+    read_batch = partial(_catalog_rows_for_files, archive_root)
+    batches = batched(iter_archive_files(archive_root), CATALOG_BATCH_SIZE)
+    catalog.clear()
+    count = 0
+    if workers <= 1:
+        for rows in map(read_batch, batches):
+            for row in rows:
+                catalog.add_row(row)
+            count += len(rows)
+    else:
+        with process_pool(workers) as pool:
+            for rows in ordered_map(pool, read_batch, batches, workers * 2):
+                for row in rows:
+                    catalog.add_row(row)
+                count += len(rows)
+    catalog.commit()
+    return count
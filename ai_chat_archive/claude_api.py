@@ -0,0 +1,579 @@
+"""
+Claude Messages API access: rate-limited scheduling, the response cache, and
+the summary / key-output prompts. The anthropic SDK is only imported when a
+client is first needed.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import settings
+from .analysis import chunk_relevance, chunk_transcript, estimate_tokens, extract_key_outputs, generate_summary
+
+
+# ============================================================================
+# CLAUDE API CLIENT
+# ============================================================================
+
+# HTTP status codes worth retrying: request timeout, conflict, rate limited, server errors, overloaded
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504, 529)
+
+# anthropic exceptions worth retrying (APITimeoutError subclasses APIConnectionError), matched by
+# class name so the scheduler does not import the SDK
+RETRYABLE_ERRORS = ("APIConnectionError", "APITimeoutError")
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed request should be sent again: a retryable status, a timeout or a dropped connection."""
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests-per-minute and tokens-per-minute budgets.
+
+    Each bucket refills continuously at budget/60 per second. A budget of 0 or
+    None disables that limit. Thread-safe; acquire() blocks until both buckets
+    can cover the request.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int], tokens_per_minute: Optional[int]):
+        self.limits = (requests_per_minute or 0, tokens_per_minute or 0)
+        self.available = list(self.limits)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        self.updated = now
+        for i, limit in enumerate(self.limits):
+            if limit:
+                self.available[i] = min(limit, self.available[i] + elapsed * limit / 60)
+
+    def acquire(self, tokens: int = 0):
+        """Block until one request and `tokens` tokens fit in the budgets."""
+        wanted = (1, tokens)
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                wait = 0.0
+                for limit, available, need in zip(self.limits, self.available, wanted):
+                    if limit:
+                        # Oversized requests only need a full bucket
+                        need = min(need, limit)
+                        if available < need:
+                            wait = max(wait, (need - available) * 60 / limit)
+                if wait == 0.0:
+                    for i, limit in enumerate(self.limits):
+                        if limit:
+                            self.available[i] -= wanted[i]
+                    return
+            time.sleep(wait)
+
+
+# Per-thread API usage for the conversation being converted (see track_api_usage)
+_api_usage = threading.local()
+
+
+def track_api_usage() -> Counter:
+    """Start counting API usage on this thread; returns the live counter."""
+    _api_usage.current = Counter()
+    return _api_usage.current
+
+
+def count_api_usage(name: str, amount=1):
+    """Add to one of the thread's usage counters, if tracking is on."""
+    usage = getattr(_api_usage, "current", None)
+    if usage is not None:
+        usage[name] += amount
+
+
+def record_api_usage(response, seconds: float):
+    """Add one response's requests, tokens and latency to the thread's counter."""
+    tokens = getattr(response, "usage", None)
+    count_api_usage("api_requests")
+    count_api_usage("input_tokens", getattr(tokens, "input_tokens", 0) or 0)
+    count_api_usage("output_tokens", getattr(tokens, "output_tokens", 0) or 0)
+    count_api_usage("api_seconds", seconds)
+
+
+class ClaudeScheduler:
+    """
+    Shared Messages API access for all summary/key-output calls.
+
+    Wraps one client with a concurrency limit, RPM/TPM rate limiting and
+    retries with exponential backoff for 429 (rate limited), 529
+    (overloaded), 408/409 and 5xx responses, timeouts and connection
+    errors (see is_retryable). Safe to call from many threads.
+    """
+
+    def __init__(self, client, concurrency: int = 4, requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0):
+        self.client = client
+        self.slots = threading.BoundedSemaphore(max(1, concurrency))
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    @staticmethod
+    def estimate_tokens(request: Dict) -> int:
+        """Rough token cost of a request: ~4 characters per input token plus max_tokens."""
+        chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+        return chars // 4 + request.get("max_tokens", 0)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.backoff_max)
+        except ValueError:
+            pass
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay, self.backoff_max) * (0.5 + random.random() / 2)
+
+    def create(self, **request):
+        """Send a messages.create request, waiting for rate budget and retrying transient failures."""
+        tokens = self.estimate_tokens(request)
+        attempt = 0
+        while True:
+            self.limiter.acquire(tokens)
+            with self.slots:
+                try:
+                    started = time.monotonic()
+                    response = self.client.messages.create(**request)
+                    record_api_usage(response, time.monotonic() - started)
+                    return response
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= self.max_retries:
+                        raise
+                    delay = self._retry_delay(e, attempt)
+            attempt += 1
+            time.sleep(delay)
+
+
+_claude_schedulers: Dict[str, ClaudeScheduler] = {}
+_claude_schedulers_lock = threading.Lock()
+
+# Fraction of the configured rate budgets this process may use (set per pool worker)
+_api_budget_share = 1
+
+
+def get_claude_scheduler(api_key: str) -> ClaudeScheduler:
+    """Return the process-wide scheduler for api_key, creating the client on first use."""
+    with _claude_schedulers_lock:
+        scheduler = _claude_schedulers.get(api_key)
+        if scheduler is None:
+            import anthropic
+
+            options = settings.CONFIG["anthropic"]
+            # Retries are handled by the scheduler so they count against the rate budget
+            client = anthropic.Anthropic(api_key=api_key, base_url=options.get("base_url"), max_retries=0)
+            rpm = options.get("requests_per_minute")
+            tpm = options.get("tokens_per_minute")
+            scheduler = ClaudeScheduler(
+                client,
+                concurrency=options.get("concurrency", 4),
+                requests_per_minute=rpm and max(1, rpm // _api_budget_share),
+                tokens_per_minute=tpm and max(1, tpm // _api_budget_share),
+                max_retries=options.get("max_retries", 5),
+            )
+            _claude_schedulers[api_key] = scheduler
+        return scheduler
+
+
+# ============================================================================
+# LLM RESPONSE CACHE
+# ============================================================================
+
+# Bump a prompt's version when its wording changes to invalidate cached replies
+PROMPT_VERSIONS = {"summary": 1, "key_outputs": 1, "analysis": 1, "chunk_notes": 1}
+
+
+class LLMCache:
+    """
+    Content-addressed SQLite cache of Claude responses.
+
+    Keys are hashes of everything that determines a reply (prompt kind and
+    version, model, max_tokens and the prompt, which embeds the transcript
+    preview). Entries are evicted least-recently-used first once the stored
+    text exceeds max_bytes. Safe to share between threads; separate processes
+    open their own connection to the same file.
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        import sqlite3
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), timeout=30, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses "
+                        "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses (used)")
+        self.size = self._stored_bytes()
+
+    @staticmethod
+    def make_key(kind: str, model: str, max_tokens: int, prompt: str) -> str:
+        import hashlib
+
+        version = PROMPT_VERSIONS[kind]
+        material = json.dumps([kind, version, model, max_tokens, prompt])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _stored_bytes(self) -> int:
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE responses SET used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode('utf-8'))
+        with self.lock:
+            # A replaced row's bytes are no longer stored
+            old = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.db.execute("INSERT OR REPLACE INTO responses (key, value, size, used) VALUES (?, ?, ?, ?)",
+                            (key, value, size, time.time()))
+            self.size += size - (old[0] if old else 0)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache is under 90% of its budget."""
+        # Other processes may have written too, so start from the real total
+        self.size = self._stored_bytes()
+        target = self.max_bytes * 0.9
+        if self.size <= target:
+            return
+        evicted = []
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY used"):
+            if self.size <= target:
+                break
+            evicted.append((key,))
+            self.size -= size
+        self.db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+
+_llm_caches: Dict[Path, LLMCache] = {}
+_llm_caches_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the response cache for this archive, or None if caching is disabled."""
+    options = settings.CONFIG["anthropic"]
+    if not options.get("cache", True):
+        return None
+    path = Path(options.get("cache_path") or settings.ARCHIVE_ROOT / ".llm-cache.sqlite").expanduser()
+    with _llm_caches_lock:
+        cache = _llm_caches.get(path)
+        if cache is None:
+            cache = LLMCache(path, int(options.get("cache_max_mb", 100) * 1024 * 1024))
+            _llm_caches[path] = cache
+        return cache
+
+
+def complete_with_claude(kind: str, prompt: str, max_tokens: int, api_key: str) -> str:
+    """Return Claude's reply text for a prompt, using the response cache when possible."""
+    model = settings.CONFIG["anthropic"]["model"]
+    cache = get_llm_cache()
+    key = LLMCache.make_key(kind, model, max_tokens, prompt) if cache else None
+
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            count_api_usage("cache_hits")
+            return cached
+        count_api_usage("cache_misses")
+
+    response = get_claude_scheduler(api_key).create(
+        model=model,
+        max_tokens=max_tokens,
+        temperature=0.3,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    text = response.content[0].text
+
+    if cache:
+        cache.put(key, text)
+    return text
+
+
+# ============================================================================
+# LONG TRANSCRIPTS
+# ============================================================================
+
+# Characters of transcript sent as-is (the whole transcript, if it is shorter)
+TRANSCRIPT_PREVIEW_CHARS = 8000
+
+# Estimated tokens of prompt wording around a transcript or chunk
+PROMPT_OVERHEAD_TOKENS = 150
+
+# Last chunk notes made on this thread, so separate summary and key-output calls share them
+_chunk_notes = threading.local()
+
+
+def select_chunks(chunks: List[str], budget: int, chunk_cost, min_relevance: int) -> List[int]:
+    """
+    Pick which chunks to summarize, in transcript order, within a token budget.
+
+    The last chunk (where conclusions usually are) and the first (what the
+    conversation is about) come first; the others by chunk_relevance(), and
+    only if they score at least min_relevance. `chunk_cost(chunk)` is the
+    total budget a chunk uses, including its share of the final prompt.
+    """
+    last = len(chunks) - 1
+    candidates = [last, 0] + sorted((i for i in range(1, last) if chunk_relevance(chunks[i]) >= min_relevance),
+                                    key=lambda i: (-chunk_relevance(chunks[i]), -i))
+    selected, spent = set(), 0
+    for i in candidates:
+        cost = chunk_cost(chunks[i])
+        if i not in selected and spent + cost <= budget:
+            selected.add(i)
+            spent += cost
+    return sorted(selected)
+
+
+def chunk_note_prompts(title: str, transcript: str,
+                       final_calls: Optional[int] = None) -> Optional[Tuple[int, List[Tuple[int, str]]]]:
+    """
+    Plan the chunk notes for a long transcript (see transcript_for_prompt).
+
+    Returns (number of chunks, [(chunk index, notes prompt), ...]) for the
+    chunks to condense, or None if the transcript is sent as it is (short,
+    long_transcripts "truncate", or no chunk fits the budget). `final_calls`
+    is the number of prompts the notes end up in (default: 1 with
+    combined_analysis, else 2).
+    """
+    options = settings.CONFIG["anthropic"]
+    if len(transcript) <= TRANSCRIPT_PREVIEW_CHARS or options.get("long_transcripts", "map_reduce") != "map_reduce":
+        return None
+
+    chunks = chunk_transcript(transcript, options.get("chunk_tokens", 3000))
+    notes_tokens = options.get("max_tokens_chunk_notes", 150)
+    if final_calls is None:
+        final_calls = 1 if options.get("combined_analysis", True) else 2
+    # Each chunk costs its own call, and its notes are read again by the final call(s)
+    final_cost = final_calls * PROMPT_OVERHEAD_TOKENS + options["max_tokens_summary"] + options["max_tokens_outputs"]
+    selected = select_chunks(
+        chunks, options.get("token_budget", 20000) - final_cost,
+        lambda chunk: PROMPT_OVERHEAD_TOKENS + estimate_tokens(chunk) + notes_tokens * (1 + final_calls),
+        options.get("chunk_min_relevance", 1))
+    if not selected:
+        return None
+    return len(chunks), [(i, chunk_notes_prompt(title, chunks[i], i, len(chunks))) for i in selected]
+
+
+def chunk_notes_prompt(title: str, chunk: str, part: int, parts: int) -> str:
+    """The prompt that condenses one chunk of a long transcript to notes."""
+    return f"""These messages are part {part + 1} of {parts} of an AI conversation titled "{title}".
+
+{chunk}
+
+In at most 5 short bullet points, note what was discussed, decided or produced in this part. Be specific."""
+
+
+def join_chunk_notes(parts: int, notes: List[Tuple[int, str]]) -> str:
+    """The text that replaces a long transcript in the final prompt: each chunk's notes, in order."""
+    lines = [f"(Notes on {len(notes)} of {parts} parts of a long conversation, in order)"]
+    lines += [f"Part {i + 1}:\n{text.strip()}" for i, text in notes]
+    return "\n\n".join(lines)
+
+
+def transcript_for_prompt(title: str, transcript: str, api_key: str) -> str:
+    """
+    The transcript text for a summary or key-output prompt.
+
+    Short transcripts are sent whole. Longer ones are cut to their first
+    TRANSCRIPT_PREVIEW_CHARS characters with anthropic.long_transcripts
+    "truncate". With "map_reduce" (the default), the transcript is split into
+    chunks on message boundaries, and the chunks that fit in
+    anthropic.token_budget (first and last first, then the most relevant) are
+    each condensed to notes by a separate call; the notes, in order, replace
+    the transcript. Budgets are in estimated tokens (input plus max output)
+    and cover every call for the conversation.
+    """
+    key = (title, transcript)
+    if getattr(_chunk_notes, "key", None) == key:
+        return _chunk_notes.text
+    plan = chunk_note_prompts(title, transcript)
+    if plan is None:
+        return transcript[:TRANSCRIPT_PREVIEW_CHARS]
+
+    parts, prompts = plan
+    count_api_usage("chunked_conversations")
+    count_api_usage("chunks_sent", len(prompts))
+    count_api_usage("chunks_skipped", parts - len(prompts))
+    notes_tokens = settings.CONFIG["anthropic"].get("max_tokens_chunk_notes", 150)
+    notes = [(i, complete_with_claude("chunk_notes", prompt, notes_tokens, api_key)) for i, prompt in prompts]
+    _chunk_notes.key, _chunk_notes.text = key, join_chunk_notes(parts, notes)
+    return _chunk_notes.text
+
+
+# ============================================================================
+# CLAUDE API FUNCTIONS
+# ============================================================================
+
+def generate_summary_with_claude(title: str, transcript: str, domain: str, api_key: str) -> str:
+    """Generate a high-quality summary using Claude API."""
+    if not settings.ANTHROPIC_AVAILABLE:
+        return generate_summary(title, transcript, domain)
+
+    try:
+        # The transcript, its start, or notes on its chunks (see transcript_for_prompt)
+        transcript_preview = transcript_for_prompt(title, transcript, api_key)
+
+        prompt = f"""Analyze this AI conversation and generate a concise 2-3 sentence summary.
+
+Title: {title}
+Domain: {domain}
+
+Transcript:
+{transcript_preview}
+
+Focus on:
+1. What was discussed/main topic
+2. Any decisions made or key insights
+3. Relevance to the domain
+
+Keep it to 2-3 sentences maximum. Be specific and concise."""
+
+        max_tokens = settings.CONFIG["anthropic"]["max_tokens_summary"]
+        text = complete_with_claude("summary", prompt, max_tokens, api_key)
+
+        return text.strip()
+
+    except Exception as e:
+        print(f"  Warning: Claude API error ({e}), falling back to rule-based summary")
+        return generate_summary(title, transcript, domain)
+
+
+def extract_key_outputs_with_claude(transcript: str, api_key: str, title: str = "") -> List[str]:
+    """Extract key outputs using Claude API."""
+    if not settings.ANTHROPIC_AVAILABLE:
+        return extract_key_outputs(transcript)
+
+    try:
+        # The transcript, its start, or notes on its chunks (see transcript_for_prompt)
+        transcript_preview = transcript_for_prompt(title, transcript, api_key)
+
+        prompt = f"""Extract 2-3 key outputs, decisions, or insights from this conversation.
+
+Transcript:
+{transcript_preview}
+
+Return as a bulleted list with one line per item. Focus on:
+- Decisions made
+- Action items
+- Key insights
+- Files/code created
+- Agreements reached
+
+Format:
+- First key point
+- Second key point
+- Third key point"""
+
+        max_tokens = settings.CONFIG["anthropic"]["max_tokens_outputs"]
+        text = complete_with_claude("key_outputs", prompt, max_tokens, api_key)
+
+        result = text.strip()
+        # Parse into list
+        outputs = [line.strip() for line in result.split('\n') if line.strip().startswith('-')]
+        return outputs[:3] if outputs else ["- [Key insights from this conversation]"]
+
+    except Exception as e:
+        print(f"  Warning: Claude API error ({e}), falling back to rule-based extraction")
+        return extract_key_outputs(transcript)
+
+
+# Section headers in the combined analysis response
+_ANALYSIS_SECTION_RE = re.compile(r'^\s*(SUMMARY|KEY OUTPUTS)\s*:\s*', re.IGNORECASE | re.MULTILINE)
+
+
+def parse_analysis_response(text: str) -> Tuple[str, List[str]]:
+    """Split a combined analysis response into (summary, key output bullets)."""
+    sections = {}
+    matches = list(_ANALYSIS_SECTION_RE.finditer(text))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections[match.group(1).upper()] = text[match.end():end].strip()
+
+    summary = sections.get("SUMMARY", "")
+    outputs = [line.strip() for line in sections.get("KEY OUTPUTS", "").split('\n')
+               if line.strip().startswith('-')]
+    return summary, outputs[:3]
+
+
+def analysis_prompt(title: str, transcript_preview: str, domain: str) -> str:
+    """The combined summary and key-outputs prompt (see parse_analysis_response)."""
+    return f"""Analyze this AI conversation.
+
+Title: {title}
+Domain: {domain}
+
+Transcript:
+{transcript_preview}
+
+Respond in exactly this format:
+
+SUMMARY:
+A concise 2-3 sentence summary covering what was discussed, any decisions made or key insights, and relevance to the domain.
+
+KEY OUTPUTS:
+- First key point
+- Second key point
+- Third key point
+
+Key outputs are decisions made, action items, key insights, files/code created or agreements reached. Be specific and concise."""
+
+
+def analysis_max_tokens() -> int:
+    """max_tokens for analysis_prompt: room for both sections."""
+    return settings.CONFIG["anthropic"]["max_tokens_summary"] + settings.CONFIG["anthropic"]["max_tokens_outputs"]
+
+
+def analyze_with_claude(title: str, transcript: str, domain: str, api_key: str) -> Tuple[str, List[str]]:
+    """
+    Generate the summary and key outputs with a single Claude API call.
+
+    Sends the transcript preview once instead of twice. Each field falls back
+    to its rule-based version if it is missing from the response, and both do
+    if the call fails.
+    """
+    if not settings.ANTHROPIC_AVAILABLE:
+        return generate_summary(title, transcript, domain), extract_key_outputs(transcript)
+
+    try:
+        # The transcript, its start, or notes on its chunks (see transcript_for_prompt)
+        transcript_preview = transcript_for_prompt(title, transcript, api_key)
+
+        text = complete_with_claude("analysis", analysis_prompt(title, transcript_preview, domain),
+                                    analysis_max_tokens(), api_key)
+
+        summary, outputs = parse_analysis_response(text)
+
+    except Exception as e:
+        print(f"  Warning: Claude API error ({e}), falling back to rule-based summary and extraction")
+        return generate_summary(title, transcript, domain), extract_key_outputs(transcript)
+
+    if not summary:
+        summary = generate_summary(title, transcript, domain)
+    if not outputs:
+        outputs = extract_key_outputs(transcript)
+    return summary, outputs
@@ -0,0 +1,262 @@
+"""
+Command line entry point for bin/import-chats.py.
+
+Only argparse is imported before the arguments are parsed, so --help and
+argument errors return immediately; the pipeline modules are imported after.
+"""
+
+import os
+import sys
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+from . import settings
+
+# Names of the adapters in sources.SOURCES, listed here so --help does not import the parsers
+SOURCE_NAMES = ("claude", "chatgpt", "grok")
+
+# ============================================================================
+# MAIN IMPORT FUNCTION
+# ============================================================================
+
+def main():
+    """Main import function."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import AI chat conversations to archive")
+    parser.add_argument("--sample", action="store_true", help="Run in sample mode")
+    parser.add_argument("--count", type=int, default=5, help="Number of conversations for sample mode")
+    parser.add_argument("--source", choices=[*SOURCE_NAMES, "all"], default="all",
+                        help="Which source to import (all: every configured export, read concurrently)")
+    parser.add_argument("--claude-api", action="store_true", help="Use Claude API for higher-quality summaries")
+    parser.add_argument("--claude-batch", action="store_true",
+                        help="Summarize with Claude through the Message Batches API (half price, not interactive); "
+                             "run again to collect batches still running")
+    parser.add_argument("--enrich-later", action="store_true",
+                        help="Write rule-based summaries marked 'summary: pending' right away; "
+                             "bin/enrich-archive.py upgrades them with Claude later")
+    parser.add_argument("--api-key", type=str, help="Anthropic API key (or set ANTHROPIC_API_KEY env var)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes for parsing and analysis (default: 1, 0 = all cores)")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-process every conversation, including ones unchanged since the last import")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted import from its last checkpoint")
+    parser.add_argument("--export", type=Path, metavar="PATH",
+                        help="Export to import instead of import_sources: conversations.json or the "
+                             "downloaded .zip (needs a single --source)")
+    args = parser.parse_args()
+
+    if args.workers < 0:
+        parser.error("--workers must be 0 or a positive number")
+    if args.claude_api and args.claude_batch:
+        parser.error("--claude-api and --claude-batch cannot be combined")
+    if args.enrich_later and (args.claude_api or args.claude_batch):
+        parser.error("--enrich-later writes rule-based summaries; it cannot be combined with "
+                     "--claude-api or --claude-batch")
+    if args.export and args.source == "all":
+        parser.error("--export needs a single --source, e.g. --source claude")
+
+    from .catalog import ArchiveCatalog, get_catalog_path, rebuild_catalog
+    from .context import load_context
+    from .duplicates import DuplicateIndex, get_duplicate_index_path, rebuild_duplicate_index
+    from .entries import ArchiveWriter, flush_index
+    from .exports import describe_export
+    from .manifest import ImportManifest, export_fingerprint
+    from .pipeline import import_streams
+    from .search import SearchIndex, get_search_index_path, iter_archive_files, rebuild_search_index
+    from .sources import SOURCES
+
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+
+    # Get API key
+    api_key_env = settings.CONFIG["anthropic"]["api_key_env"]
+    api_key = args.api_key or os.environ.get(api_key_env)
+    use_claude_api = args.claude_api
+
+    if use_claude_api or args.claude_batch:
+        flag = "--claude-api" if use_claude_api else "--claude-batch"
+        if not api_key:
+            print(f"Error: {flag} requires {api_key_env} environment variable or --api-key parameter")
+            sys.exit(1)
+        if not settings.ANTHROPIC_AVAILABLE:
+            print("Error: anthropic package not installed. Run: pip install anthropic")
+            sys.exit(1)
+        if args.claude_batch:
+            from .batches import get_batch_client
+
+            try:
+                batch_client = get_batch_client(api_key)
+            except RuntimeError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        print(f"Claude {'API' if use_claude_api else 'Message Batches'} enabled "
+              f"(using {settings.CONFIG['anthropic']['model']} for summaries)")
+
+    # Display configuration
+    print(f"Archive location: {settings.ARCHIVE_ROOT}")
+    print(f"Human OS integration: {'Enabled' if settings.CONFIG['human_os']['enabled'] else 'Disabled'}")
+    archive_options = settings.CONFIG["archive"]
+    if archive_options.get("transcripts", "inline") == "sidecar":
+        if archive_options.get("transcript_compression") == "zstd" and not settings.ZSTD_AVAILABLE:
+            print("Warning: archive.transcript_compression is zstd but zstandard is not installed "
+                  "(pip install zstandard); using gzip")
+        print("Transcripts: compressed sidecar files (read them with bin/archive-show.py)")
+
+    if settings.CONFIG["human_os"]["enabled"]:
+        print("Loading context from Human OS...")
+        context = load_context()
+        print(f"  Flagship: {context['sprint'].get('flagship', 'N/A')}")
+        print(f"  Domains loaded: {len(context['domains'])}")
+    else:
+        print("Skipping Human OS context (using fallback keyword detection)")
+        context = {"sprint": {}, "domains": {}, "active_domains": [], "sprint_priorities": []}
+
+    stats = Counter()
+    manifest = ImportManifest(settings.ARCHIVE_ROOT)
+    search_index = SearchIndex(get_search_index_path())
+    if len(search_index) == 0 and next(iter_archive_files(settings.ARCHIVE_ROOT), None):
+        print("Building search index for existing archive entries...")
+        print(f"  Indexed {rebuild_search_index(settings.ARCHIVE_ROOT, search_index)} entries")
+    catalog = ArchiveCatalog(get_catalog_path())
+    if len(catalog) == 0 and next(iter_archive_files(settings.ARCHIVE_ROOT), None):
+        print("Building catalog for existing archive entries...")
+        print(f"  Cataloged {rebuild_catalog(settings.ARCHIVE_ROOT, catalog, args.workers)} entries")
+    vector_index = None
+    if settings.CONFIG["embeddings"].get("enabled"):
+        if not settings.NUMPY_AVAILABLE:
+            print("Warning: embeddings.enabled is set but numpy is not installed (pip install numpy); skipping")
+        else:
+            from .vectors import open_vector_index, rebuild_vector_index
+
+            vector_index = open_vector_index()
+            if len(vector_index) == 0 and next(iter_archive_files(settings.ARCHIVE_ROOT), None):
+                print("Embedding existing archive entries...")
+                print(f"  Embedded {rebuild_vector_index(settings.ARCHIVE_ROOT, vector_index)} entries")
+    duplicate_index = None
+    if settings.CONFIG["duplicates"].get("enabled", False):
+        duplicate_index = DuplicateIndex(get_duplicate_index_path(), settings.CONFIG["duplicates"])
+        if len(duplicate_index) == 0 and next(iter_archive_files(settings.ARCHIVE_ROOT), None):
+            print("Computing near-duplicate signatures for existing archive entries...")
+            print(f"  Signed {rebuild_duplicate_index(settings.ARCHIVE_ROOT, duplicate_index, args.workers)} entries")
+
+    writer = ArchiveWriter(**settings.CONFIG["writer"])
+    batch_queue = None
+    if args.claude_batch:
+        from .batches import BatchQueue
+
+        batch_queue = BatchQueue(settings.ARCHIVE_ROOT)
+
+    # Every export is streamed at the same time into one conversion and write stage
+    streams = []
+    for name in (SOURCES if args.source == "all" else [args.source]):
+        adapter = SOURCES[name]
+        configured = args.export or settings.CONFIG["import_sources"].get(name)
+        if not configured:
+            continue
+        path = Path(configured).expanduser()
+        description = describe_export(path, adapter.members) if path.is_file() else None
+        if not description:
+            print(f"\n{adapter.label} export not found: {path}")
+            print(f"  (Check import_sources.{name} in config/config.yaml; a .zip must contain "
+                  f"{' or '.join(adapter.members)})")
+            continue
+        print(f"\nProcessing {adapter.label} exports from {description}...")
+
+        export = export_fingerprint(path)
+        start = manifest.resume_position(name, export) if args.resume else 0
+        if start:
+            print(f"  Resuming after conversation {start} (last checkpoint)")
+            stats["resumed"] += start
+        chats = adapter.iter_conversations(path, skip=start)
+        if args.sample:
+            chats = islice(chats, args.count)
+        streams.append((name, chats, export, start))
+
+    if streams:
+        stats.update(import_streams(streams, context, args, use_claude_api, api_key, manifest, search_index,
+                                    catalog, vector_index, duplicate_index, writer, batch_queue))
+
+    writer.close()
+    flush_index()
+    if batch_queue is not None:
+        from .batches import run_batches
+
+        def rewritten(path, content):
+            search_index.add(path, content)
+            catalog.refresh(path)
+            if vector_index is not None:
+                vector_index.add(path, content)
+
+        print("\nSummarizing with Claude Message Batches...")
+        try:
+            run_batches(batch_queue, batch_client, rewritten)
+        except KeyboardInterrupt:
+            print("  Interrupted; run with --claude-batch again to collect the batches still running")
+        stats.update(batch_queue.stats)
+        batch_queue.close()
+    manifest.close()
+    search_index.close()
+    catalog.close()
+    if vector_index is not None:
+        vector_index.close()
+    if duplicate_index is not None:
+        duplicate_index.close()
+
+    print(f"\n{'='*60}")
+    print("Import complete!")
+    print(f"  Imported: {stats['imported']}")
+    print(f"  Updated: {stats['updated']}")
+    print(f"  Unchanged (skipped): {stats['unchanged']}")
+    if args.resume:
+        print(f"  Before checkpoint (skipped): {stats['resumed']}")
+    if duplicate_index is not None:
+        action = "skipped" if settings.CONFIG["duplicates"].get("action", "flag") == "skip" else "flagged"
+        print(f"  Near-duplicates ({action}): {stats['near_duplicates']}")
+    print(f"  Errors: {stats['errors']}")
+    print(f"  Mode: {'Sample' if args.sample else 'Batch'}")
+    if args.claude_batch:
+        print(f"  Batch requests submitted: {stats['batch_requests']}")
+        print(f"  Entries summarized from batches: {stats['batch_rewritten']}")
+        print(f"  Batch tokens: {stats['input_tokens']} input, {stats['output_tokens']} output (billed at 50%)")
+        if stats['batch_failed']:
+            print(f"  Entries with failed batch requests (rule-based summary kept): {stats['batch_failed']}")
+        if stats['chunked_conversations']:
+            print(f"  Long conversations summarized in chunks: {stats['chunked_conversations']} "
+                  f"({stats['chunks_sent']} chunks sent, {stats['chunks_skipped']} skipped)")
+        if settings.CONFIG["anthropic"].get("cache", True):
+            print(f"  Summary cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+    if args.enrich_later:
+        print(f"  Pending enrichment: {stats['pending_enrichment']} "
+              f"(run bin/enrich-archive.py to summarize them with Claude)")
+    if use_claude_api:
+        print(f"  API requests: {stats['api_requests']}")
+        print(f"  API tokens: {stats['input_tokens']} input, {stats['output_tokens']} output")
+        if stats['imported']:
+            print(f"  API time per conversation: {stats['api_seconds'] / stats['imported']:.2f}s")
+        converted = stats['imported'] + stats['updated']
+        if converted:
+            budget = settings.CONFIG["anthropic"].get("token_budget", 20000)
+            print(f"  API tokens per conversation: "
+                  f"{(stats['input_tokens'] + stats['output_tokens']) / converted:.0f} average, "
+                  f"{stats['max_conversation_tokens']} max (budget {budget})")
+        if stats['chunked_conversations']:
+            print(f"  Long conversations summarized in chunks: {stats['chunked_conversations']} "
+                  f"({stats['chunks_sent']} chunks sent, {stats['chunks_skipped']} skipped)")
+        if settings.CONFIG["anthropic"].get("cache", True):
+            print(f"  Summary cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+    print(f"{'='*60}")
+
+    if args.sample:
+        print("\nPlease review the imported files and verify:")
+        print("  1. File naming makes sense")
+        print("  2. Topic extraction is accurate")
+        print("  3. Domain detection is correct")
+        print("  4. Tags are relevant")
+        print("\nIf satisfied, run without --sample to import all conversations.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Human OS context (sprint flagship, active projects per domain) for tagging."""
+
+import re
+from typing import Dict
+
+from . import settings
+from .settings import DerivedFileCache
+
+
+# ============================================================================
+# CONTEXT LOADING
+# ============================================================================
+
+def extract_sprint_fields(content: str) -> Dict:
+    """The fields tagging uses from Sprint.md: the flagship, if there is one."""
+    fields = {}
+    flagship_match = re.search(r'\*\*Flagship:\*\*\s*(.+)', content)
+    if flagship_match:
+        fields["flagship"] = flagship_match.group(1).strip()
+    return fields
+
+
+def extract_domain_fields(content: str) -> Dict:
+    """The fields tagging uses from an @domain-INDEX.md: projects in its NOW table."""
+    # Extract active projects from NOW section
+    now_match = re.search(r'## NOW\s*\n(.+?)##', content, re.DOTALL)
+    active_projects = []
+    if now_match:
+        for line in now_match.group(1).split('\n'):
+            if '|' in line and '**' in line:
+                project_match = re.search(r'\*\*(.+?)\*\*', line)
+                if project_match:
+                    active_projects.append(project_match.group(1).strip())
+    return {"active_projects": active_projects}
+
+
+def load_context() -> Dict:
+    """
+    Load context from Human OS for intelligent tagging.
+
+    Only the extracted fields are kept, not the documents. They are cached
+    in DERIVED_CACHE_PATH by path, mtime and size, so only files changed since
+    the last run are read and parsed.
+    """
+    context = {
+        "sprint": {},
+        "domains": {},
+        "active_domains": [],
+        "sprint_priorities": []
+    }
+
+    # Skip if Human OS is disabled
+    if not settings.CONFIG["human_os"]["enabled"] or not settings.HUMAN_OS_ROOT:
+        return context
+
+    cache = DerivedFileCache(settings.DERIVED_CACHE_PATH)
+
+    # Load Sprint.md
+    sprint = cache.get(settings.HUMAN_OS_ROOT / "SYSTEM/00-Index/Sprint.md", extract_sprint_fields)
+    if sprint is not None:
+        context["sprint"].update(sprint)
+
+    # Load domain INDEX files
+    domains_to_load = settings.CONFIG["human_os"].get("domains", [])
+    for domain_name in domains_to_load:
+        fields = cache.get(settings.HUMAN_OS_ROOT / f"@{domain_name}-INDEX.md", extract_domain_fields)
+        if fields is not None:
+            context["domains"][f"@{domain_name}"] = fields
+
+    cache.save()
+    return context
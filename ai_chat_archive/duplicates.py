@@ -0,0 +1,283 @@
+"""Near-duplicate detection with MinHash signatures and an LSH band index."""
+
+import json
+import random
+import re
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import settings
+from .search import iter_archive_files, parse_archive_entry
+from .parallel import batched, ordered_map, process_pool
+from .transcripts import read_archive_entry
+
+
+# ============================================================================
+# NEAR-DUPLICATE DETECTION
+# ============================================================================
+
+# Largest prime below 2**32: keeps MinHash values in 32 bits and (a * x + b) in 64
+MINHASH_PRIME = 4294967291
+# Fixed seed, so signatures from different runs and processes are comparable
+MINHASH_SEED = 1
+# Entries per task when rebuilding the duplicate index across processes
+DUPLICATE_BATCH_SIZE = 64
+
+_ROLE_LABEL_RE = re.compile(r'^\*\*[^*\n]{1,40}:\*\*', re.MULTILINE)
+
+
+def transcript_shingles(transcript: str, shingle_words: int = 5) -> List[int]:
+    """
+    32-bit hashes of the distinct word n-grams in a transcript.
+
+    Role labels (**Human:**, **User:**, **Assistant:**) and case are ignored,
+    so the same conversation exported from Claude and ChatGPT shingles alike.
+    """
+    import zlib
+
+    words = re.findall(r'\w+', _ROLE_LABEL_RE.sub(' ', transcript).lower())
+    if not words:
+        return []
+    if len(words) < shingle_words:
+        return [zlib.crc32(" ".join(words).encode('utf-8'))]
+    shingles = {" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)}
+    return [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles]
+
+
+def _minhash_permutations(num_perm: int) -> List[Tuple[int, int]]:
+    """The (a, b) pairs of the hash functions (a * x + b) mod MINHASH_PRIME."""
+    rng = random.Random(MINHASH_SEED)
+    return [(rng.randrange(1, MINHASH_PRIME), rng.randrange(0, MINHASH_PRIME)) for _ in range(num_perm)]
+
+
+def minhash_signature(transcript: str, num_perm: int = 128, shingle_words: int = 5) -> Optional[bytes]:
+    """
+    MinHash signature of a transcript's word shingles: num_perm little-endian
+    uint32 minimums, or None for an empty transcript. The fraction of equal
+    positions in two signatures estimates the Jaccard similarity of the
+    shingle sets. Vectorised with numpy when it is installed.
+    """
+    import struct
+
+    hashes = transcript_shingles(transcript, shingle_words)
+    if not hashes:
+        return None
+    permutations = _minhash_permutations(num_perm)
+    if settings.NUMPY_AVAILABLE:
+        import numpy as np
+
+        a, b = (np.array(column, dtype=np.uint64) for column in zip(*permutations))
+        x = np.array(hashes, dtype=np.uint64)
+        signature = np.empty(num_perm, dtype='<u4')
+        # Bounded blocks of permutations keep the (perms x shingles) product small
+        for start in range(0, num_perm, 16):
+            block = (a[start:start + 16, None] * x + b[start:start + 16, None]) % MINHASH_PRIME
+            signature[start:start + 16] = block.min(axis=1)
+        return signature.tobytes()
+    return struct.pack(f'<{num_perm}I', *(min([(a * x + b) % MINHASH_PRIME for x in hashes])
+                                          for a, b in permutations))
+
+
+def signature_similarity(first: bytes, second: bytes) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    import struct
+
+    count = len(first) // 4
+    pairs = zip(struct.unpack(f'<{count}I', first), struct.unpack(f'<{count}I', second))
+    return sum(x == y for x, y in pairs) / count
+
+
+class DuplicateIndex:
+    """
+    MinHash signatures of archive entries with an LSH band index, stored in
+    ARCHIVE_ROOT/.duplicates.sqlite.
+
+    Each signature is cut into `bands` bands; entries sharing any band are
+    candidates and are confirmed by comparing full signatures. A lookup costs
+    one indexed query per band regardless of archive size, and entries above
+    `threshold` similarity are found with high probability (with 128
+    permutations and 16 bands, ~99% at 0.8 and under 1% at 0.4).
+    """
+
+    COMMIT_EVERY = 500
+
+    def __init__(self, path: Path, config: Optional[Dict] = None):
+        import sqlite3
+
+        config = config or {}
+        self.path = path
+        self.num_perm = config.get("num_perm", 128)
+        self.bands = config.get("bands", 16)
+        self.shingle_words = config.get("shingle_words", 5)
+        self.threshold = config.get("threshold", 0.8)
+        if self.num_perm % self.bands:
+            raise ValueError(f"duplicates.num_perm ({self.num_perm}) must be a multiple of bands ({self.bands})")
+
+        self.db = sqlite3.connect(str(path), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS signatures (path TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, path TEXT NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (key)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS bands_path ON bands (path)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        layout = {"num_perm": str(self.num_perm), "bands": str(self.bands),
+                  "shingle_words": str(self.shingle_words), "seed": str(MINHASH_SEED)}
+        stored = dict(self.db.execute("SELECT key, value FROM meta"))
+        if any(key in stored and stored[key] != value for key, value in layout.items()):
+            # Signatures from other settings are not comparable; start over
+            self.clear()
+        self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", layout.items())
+        self.db.commit()
+        self._pending = 0
+
+    def signature(self, transcript: str) -> Optional[bytes]:
+        """MinHash signature of a transcript with this index's settings."""
+        return minhash_signature(transcript, self.num_perm, self.shingle_words)
+
+    def band_keys(self, signature: bytes) -> List[int]:
+        """One 64-bit key per band (band number included, so bands never collide with each other)."""
+        import hashlib
+
+        width = len(signature) // self.bands
+        return [int.from_bytes(hashlib.blake2b(bytes([band]) + signature[band * width:(band + 1) * width],
+                                               digest_size=8).digest(), 'little', signed=True)
+                for band in range(self.bands)]
+
+    def add(self, path: str, signature: bytes):
+        """Insert or replace the signature of the entry at path."""
+        self.db.execute("DELETE FROM bands WHERE path = ?", (path,))
+        self.db.execute("INSERT OR REPLACE INTO signatures VALUES (?, ?)", (path, signature))
+        self.db.executemany("INSERT INTO bands VALUES (?, ?)", [(key, path) for key in self.band_keys(signature)])
+        self._changed()
+
+    def remove(self, path: str):
+        self.db.execute("DELETE FROM signatures WHERE path = ?", (path,))
+        self.db.execute("DELETE FROM bands WHERE path = ?", (path,))
+        self._changed()
+
+    def clear(self):
+        self.db.execute("DELETE FROM signatures")
+        self.db.execute("DELETE FROM bands")
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.commit()
+
+    def find(self, signature: bytes, threshold: Optional[float] = None,
+             exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(path, similarity) of indexed entries at or above threshold, most similar first."""
+        threshold = self.threshold if threshold is None else threshold
+        keys = self.band_keys(signature)
+        rows = self.db.execute(
+            "SELECT path, signature FROM signatures WHERE path IN "
+            f"(SELECT path FROM bands WHERE key IN ({', '.join('?' * len(keys))}))", keys)
+        matches = [(path, signature_similarity(signature, other)) for path, other in rows if path != exclude]
+        return sorted((match for match in matches if match[1] >= threshold), key=lambda match: (-match[1], match[0]))
+
+    def clusters(self, threshold: Optional[float] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Groups of near-duplicate entries across the whole index.
+
+        Candidate pairs come from shared LSH buckets only, so the archive is
+        never compared pairwise. Each cluster is a list of (path, similarity
+        to the cluster's first entry), largest clusters first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        parent = {}
+
+        def root(path):
+            while parent.setdefault(path, path) != path:
+                parent[path] = parent[parent[path]]
+                path = parent[path]
+            return path
+
+        signatures = {}
+
+        def signature_of(path):
+            if path not in signatures:
+                signatures[path] = self.db.execute("SELECT signature FROM signatures WHERE path = ?",
+                                                   (path,)).fetchone()[0]
+            return signatures[path]
+
+        checked = set()
+        buckets = self.db.execute("SELECT group_concat(path, char(0)) FROM bands GROUP BY key HAVING count(*) > 1")
+        for (paths,) in buckets:
+            paths = sorted(paths.split("\0"))
+            for i, first in enumerate(paths):
+                for second in paths[i + 1:]:
+                    if (first, second) in checked or root(first) == root(second):
+                        continue
+                    checked.add((first, second))
+                    if signature_similarity(signature_of(first), signature_of(second)) >= threshold:
+                        parent[root(second)] = root(first)
+
+        groups = {}
+        for path in parent:
+            groups.setdefault(root(path), []).append(path)
+        clusters = []
+        for paths in groups.values():
+            if len(paths) > 1:
+                paths.sort()
+                clusters.append([(path, signature_similarity(signature_of(paths[0]), signature_of(path)))
+                                 for path in paths])
+        return sorted(clusters, key=lambda cluster: (-len(cluster), cluster[0][0]))
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT count(*) FROM signatures").fetchone()[0]
+
+    def commit(self):
+        self.db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+def get_duplicate_index_path() -> Path:
+    """Location of the archive's MinHash/LSH index."""
+    return settings.ARCHIVE_ROOT / ".duplicates.sqlite"
+
+
+def mark_duplicate(content: str, duplicate_of: str, similarity: float) -> str:
+    """Add duplicate_of / duplicate_similarity fields to an entry's frontmatter."""
+    head, separator, body = content.partition("\n---\n")
+    return f"{head}\nduplicate_of: {json.dumps(duplicate_of)}\nduplicate_similarity: {similarity:.2f}{separator}{body}"
+
+
+def _signatures_for_files(archive_root: Path, config: Dict, filepaths: List[Path]) -> List[Tuple]:
+    """(path, signature) for archive files (runs in worker processes)."""
+    rows = []
+    for filepath in filepaths:
+        entry = parse_archive_entry(read_archive_entry(filepath))
+        signature = minhash_signature(entry["transcript"], config.get("num_perm", 128),
+                                      config.get("shingle_words", 5))
+        if signature:
+            rows.append((str(filepath.relative_to(archive_root)), signature))
+    return rows
+
+
+def rebuild_duplicate_index(archive_root: Path, index: DuplicateIndex, workers: int = 1) -> int:
+    """Re-compute the signature of every markdown entry in the archive. Returns the number of entries."""
+    config = {"num_perm": index.num_perm, "shingle_words": index.shingle_words}
+    read_batch = partial(_signatures_for_files, archive_root, config)
+    batches = batched(iter_archive_files(archive_root), DUPLICATE_BATCH_SIZE)
+    index.clear()
+    count = 0
+    if workers <= 1:
+        for rows in map(read_batch, batches):
+            for path, signature in rows:
+                index.add(path, signature)
+            count += len(rows)
+    else:
+        with process_pool(workers) as pool:
+            for rows in ordered_map(pool, read_batch, batches, workers * 2):
+                for path, signature in rows:
+                    index.add(path, signature)
+                count += len(rows)
+    index.commit()
+    return count
@@ -0,0 +1,155 @@
+"""
+Two-phase imports: import-chats.py --enrich-later writes every entry right
+away with its rule-based summary and marks it `summary: pending`;
+bin/enrich-archive.py later upgrades pending entries in place with Claude
+summaries.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+from . import claude_api, settings
+from .claude_api import (analysis_max_tokens, analysis_prompt, complete_with_claude, parse_analysis_response,
+                         track_api_usage, transcript_for_prompt)
+from .entries import replace_entry_analysis
+from .parallel import ordered_map
+from .search import iter_archive_files, parse_archive_entry
+from .settings import write_text_atomic
+from .transcripts import read_archive_entry
+
+
+# ============================================================================
+# PENDING ENTRIES
+# ============================================================================
+
+# Frontmatter line of an entry whose summary and key outputs are still rule-based
+PENDING_MARKER = "summary: pending"
+
+# Bytes read from the start of an entry to find the end of its frontmatter
+FRONTMATTER_READ_BYTES = 4096
+
+# Entries rewritten between commits of the indexes
+ENRICH_COMMIT_EVERY = 50
+
+
+def mark_pending(content: str) -> str:
+    """Add the summary: pending field to an entry's frontmatter."""
+    head, separator, body = content.partition("\n---\n")
+    return f"{head}\n{PENDING_MARKER}{separator}{body}"
+
+
+def clear_pending(content: str) -> str:
+    """Drop the summary: pending field from an entry's frontmatter."""
+    head, separator, body = content.partition("\n---\n")
+    return head.replace(f"\n{PENDING_MARKER}", "", 1) + separator + body
+
+
+def is_pending(filepath: Path) -> bool:
+    """Whether an entry is marked summary: pending (reads only its frontmatter)."""
+    with open(filepath, "rb") as f:
+        head = f.read(FRONTMATTER_READ_BYTES)
+        # Frontmatter longer than the first read (very long tag lists)
+        while b"\n---\n" not in head[4:]:
+            more = f.read(FRONTMATTER_READ_BYTES)
+            if not more:
+                break
+            head += more
+    frontmatter = head[:head.find(b"\n---\n", 4) + 1] if head.startswith(b"---\n") else b""
+    return f"\n{PENDING_MARKER}\n".encode("utf-8") in frontmatter
+
+
+def iter_pending_entries(archive_root: Path) -> Iterator[Path]:
+    """Yield every archive entry still marked summary: pending, oldest first."""
+    for filepath in iter_archive_files(archive_root):
+        if is_pending(filepath):
+            yield filepath
+
+
+# ============================================================================
+# ENRICHMENT
+# ============================================================================
+
+def _analyze_entry(filepath: Path, api_key: str) -> Tuple:
+    """
+    Ask Claude for one pending entry's summary and key outputs (runs on a worker thread).
+
+    Returns (filepath, content read, summary, key outputs, API usage, error).
+    Errors are returned rather than raised so one failed entry does not stop
+    the others; it simply stays pending.
+    """
+    content = filepath.read_text(encoding="utf-8")
+    usage = track_api_usage()
+    try:
+        entry = parse_archive_entry(read_archive_entry(filepath, content))
+        domain = entry["domains"][0] if entry["domains"] else "@system"
+        preview = transcript_for_prompt(entry["title"], entry["transcript"], api_key)
+        reply = complete_with_claude("analysis", analysis_prompt(entry["title"], preview, domain),
+                                     analysis_max_tokens(), api_key)
+        summary, outputs = parse_analysis_response(reply)
+        if not (summary or outputs):
+            raise ValueError("reply has neither a summary nor key outputs")
+        return filepath, content, summary, outputs, dict(usage), None
+    except Exception as e:
+        return filepath, content, None, None, dict(usage), e
+    finally:
+        claude_api._api_usage.current = None
+
+
+def enrich_archive(archive_root: Path, api_key: str, rewritten: Optional[Callable[[str, str], None]] = None,
+                   limit: Optional[int] = None, threads: Optional[int] = None,
+                   commit: Optional[Callable[[], None]] = None) -> Counter:
+    """
+    Upgrade pending entries with Claude summaries. Returns counts for the report.
+
+    Up to `threads` entries (default anthropic.concurrency) are analyzed at a
+    time; the rate limits are the shared ClaudeScheduler's. Each entry is
+    rewritten in place as soon as its reply is back, with the marker removed,
+    and `rewritten(path, content)` is called for it (to update the indexes);
+    `commit()` is called every ENRICH_COMMIT_EVERY entries and at the end.
+
+    The marker in each file is the only state, so an interrupted run loses
+    at most the replies in flight: the next run starts with the entries that
+    are still pending. An entry whose request fails, or whose file changed
+    while its reply was pending (e.g. re-imported), is left for a later run.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from itertools import islice
+
+    if threads is None:
+        threads = settings.CONFIG["anthropic"].get("concurrency", 4)
+    threads = max(1, threads)
+    stats = Counter()
+    entries = islice(iter_pending_entries(archive_root), limit)
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="enrich") as pool:
+        try:
+            results = ordered_map(pool, lambda filepath: _analyze_entry(filepath, api_key), entries, threads * 2)
+            for filepath, content, summary, outputs, usage, error in results:
+                stats.update(usage)
+                relative_path = str(filepath.relative_to(archive_root))
+                if error is not None:
+                    stats["errors"] += 1
+                    print(f"  Error enriching {relative_path}: {error}")
+                    continue
+                if not filepath.exists() or filepath.read_text(encoding="utf-8") != content:
+                    stats["changed"] += 1
+                    continue
+                # A section missing from the reply keeps its rule-based text
+                updated = replace_entry_analysis(content, summary or None, outputs or None)
+                if updated is None:
+                    stats["errors"] += 1
+                    print(f"  Error enriching {relative_path}: no Summary and Key Outputs sections")
+                    continue
+                updated = clear_pending(updated)
+                write_text_atomic(filepath, updated)
+                if rewritten is not None:
+                    rewritten(relative_path, read_archive_entry(filepath, updated))
+                stats["enriched"] += 1
+                if stats["enriched"] % 100 == 1:
+                    print(f"  [{stats['enriched']}] {relative_path}")
+                if commit is not None and stats["enriched"] % ENRICH_COMMIT_EVERY == 0:
+                    commit()
+        finally:
+            if commit is not None:
+                commit()
+    return stats
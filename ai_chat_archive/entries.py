@@ -0,0 +1,344 @@
+"""Rendering and writing archive entries, and maintaining INDEX.md."""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import settings
+from .settings import MONTH_NAMES, write_text_atomic
+from .claude_api import analyze_with_claude, extract_key_outputs_with_claude, generate_summary_with_claude
+from .analysis import extract_key_outputs, generate_summary
+from .transcripts import remove_entry_files, write_entry_files
+
+
+# ============================================================================
+# ARCHIVE ENTRIES
+# ============================================================================
+
+def _entry_location(data: Dict) -> Tuple[Path, str]:
+    """Return (month folder, filename stem without duplicate suffix) for an entry."""
+    date = data["date"]
+    folder = settings.ARCHIVE_ROOT / str(date.year) / MONTH_NAMES[date.month]
+    return folder, f"{date.year:04d}-{date.month:02d}-{date.day:02d}-{data['topic']}"
+
+
+def resolve_entry_path(data: Dict) -> Path:
+    """Pick a free archive path for an entry, adding -1, -2, ... for duplicates."""
+    folder, stem = _entry_location(data)
+
+    # Create folder structure
+    folder.mkdir(parents=True, exist_ok=True)
+
+    # Generate filename
+    filepath = folder / f"{stem}.md"
+
+    # Handle duplicates
+    counter = 1
+    while filepath.exists():
+        filepath = folder / f"{stem}-{counter}.md"
+        counter += 1
+
+    return filepath
+
+
+def render_archive_entry(data: Dict, use_claude_api: bool = False, api_key: str = None) -> str:
+    """Render the markdown for an archive entry (summary, key outputs, transcript)."""
+    # Generate summary and key outputs
+    if use_claude_api and api_key and settings.CONFIG["anthropic"].get("combined_analysis", True):
+        summary, key_outputs = analyze_with_claude(data['title'], data['transcript'], data['domain'], api_key)
+    elif use_claude_api and api_key:
+        summary = generate_summary_with_claude(data['title'], data['transcript'], data['domain'], api_key)
+        key_outputs = extract_key_outputs_with_claude(data['transcript'], api_key, data['title'])
+    else:
+        summary = generate_summary(data['title'], data['transcript'], data['domain'])
+        key_outputs = extract_key_outputs(data['transcript'])
+    key_outputs_text = '\n'.join(key_outputs)
+
+    # Create markdown content
+    return f"""---
+date: {data['date'].strftime('%Y-%m-%d')}
+topic: {data['title']}
+domains: ["{data['domain']}"]
+tags: {json.dumps(data['tags'])}
+ai: {data['ai']}
+---
+
+# {data['title']}
+
+**Date:** {data['date'].strftime('%Y-%m-%d')}
+**Source:** {data['ai'].title()}
+
+## Summary
+{summary}
+
+## Key Outputs
+{key_outputs_text}
+
+## Transcript
+
+{data['transcript']}
+"""
+
+
+# The generated sections of a rendered entry, up to the transcript
+_ANALYSIS_SECTIONS_RE = re.compile(r'^## Summary\n(.*?)\n## Key Outputs\n(.*?)\n## Transcript\n',
+                                   re.DOTALL | re.MULTILINE)
+
+
+def replace_entry_analysis(content: str, summary: Optional[str], key_outputs: Optional[List[str]]) -> Optional[str]:
+    """
+    Swap the Summary and/or Key Outputs sections of rendered markdown.
+
+    None keeps a section as it is. Returns None if the entry has no such sections.
+    """
+    match = _ANALYSIS_SECTIONS_RE.search(content)
+    if not match:
+        return None
+    summary_text = f"{summary}\n" if summary is not None else match.group(1)
+    outputs_text = f"{chr(10).join(key_outputs)}\n" if key_outputs is not None else match.group(2)
+    sections = f"## Summary\n{summary_text}\n## Key Outputs\n{outputs_text}\n## Transcript\n"
+    return content[:match.start()] + sections + content[match.end():]
+
+
+def write_archive_entry(data: Dict, content: str, replace: Optional[Path] = None) -> Path:
+    """
+    Write rendered markdown for an entry to its archive path.
+
+    `replace` is the entry's previous file when a changed conversation is
+    re-imported. It is overwritten in place if the date and topic still match,
+    otherwise the entry gets a new path and the old file is removed. The
+    transcript is stored as archive.transcripts says (see transcripts).
+    """
+    if replace is not None and replace.exists():
+        folder, stem = _entry_location(data)
+        if replace.parent == folder and re.fullmatch(re.escape(stem) + r'(-\d+)?\.md', replace.name):
+            write_entry_files(replace, content, replacing=True)
+            return replace
+
+    filepath = resolve_entry_path(data)
+    write_entry_files(filepath, content)
+    if replace is not None and replace.exists():
+        remove_entry_files(replace)
+    return filepath
+
+
+class ArchiveWriter:
+    """
+    Writes archive entries for an import run from a bounded background thread pool.
+
+    File names are resolved in memory: each month folder is listed once (and
+    created if missing), and names handed out are added to that listing, so a
+    new entry costs one atomic write instead of a mkdir, a chain of exists()
+    calls and a write. Assumes nothing else adds files to the archive during
+    the run.
+
+    write() returns the entry's path right away. The file is written by a
+    worker thread; `done(filepath, error)` is called from the importing thread,
+    in submission order, once the write has finished (error is None on
+    success). At most `queue_depth` writes are pending at a time; call close()
+    to wait for the rest.
+    """
+
+    def __init__(self, threads: int = 4, queue_depth: int = 64):
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="archive-writer")
+        self.queue_depth = max(1, queue_depth)
+        self.pending = deque()
+        # Month folder -> names of the files in it
+        self.listings: Dict[Path, set] = {}
+
+    def _listing(self, folder: Path) -> set:
+        listing = self.listings.get(folder)
+        if listing is None:
+            try:
+                listing = set(os.listdir(folder))
+            except FileNotFoundError:
+                folder.mkdir(parents=True, exist_ok=True)
+                listing = set()
+            # Temporary files left by an interrupted write_text_atomic
+            for name in [name for name in listing if name.startswith(".") and name.endswith(".tmp")]:
+                (folder / name).unlink(missing_ok=True)
+                listing.discard(name)
+            self.listings[folder] = listing
+        return listing
+
+    def reserve(self, data: Dict) -> Path:
+        """Pick a free archive path for an entry, adding -1, -2, ... for duplicates."""
+        folder, stem = _entry_location(data)
+        listing = self._listing(folder)
+        name = f"{stem}.md"
+        counter = 1
+        while name in listing:
+            name = f"{stem}-{counter}.md"
+            counter += 1
+        listing.add(name)
+        return folder / name
+
+    def exists(self, filepath: Path) -> bool:
+        return filepath.name in self._listing(filepath.parent)
+
+    def write(self, data: Dict, content: str, replace: Optional[Path] = None,
+              done: Optional[Callable[[Path, Optional[Exception]], None]] = None,
+              journal: Optional[Callable[[Path], None]] = None) -> Path:
+        """
+        Queue an entry's markdown for writing; see write_archive_entry for `replace`.
+
+        `journal(filepath)` is called with the chosen path before the write starts.
+        """
+        if replace is not None and self.exists(replace):
+            folder, stem = _entry_location(data)
+            if replace.parent == folder and re.fullmatch(re.escape(stem) + r'(-\d+)?\.md', replace.name):
+                return self._submit(replace, content, None, done, journal, reserved=False)
+            # The old file is removed by the worker after the new one is written; its
+            # name stays taken until then, so no other entry is written over it
+        else:
+            replace = None
+        return self._submit(self.reserve(data), content, replace, done, journal, reserved=True)
+
+    def _submit(self, filepath: Path, content: str, remove: Optional[Path], done, journal, reserved: bool) -> Path:
+        # Earlier writes are reported once they reach the head of the queue (never this one, before write() returns)
+        while self.pending and (len(self.pending) >= self.queue_depth or self.pending[0][0].done()):
+            self._finish_oldest()
+        if journal is not None:
+            journal(filepath)
+        future = self.pool.submit(_write_entry_file, filepath, content, remove, not reserved)
+        self.pending.append((future, filepath, remove, reserved, done))
+        return filepath
+
+    def _finish_oldest(self):
+        future, filepath, remove, reserved, done = self.pending.popleft()
+        error = future.exception()
+        if error is not None:
+            # The new name is free again; the old file is still there
+            if reserved:
+                self.listings[filepath.parent].discard(filepath.name)
+        elif remove is not None:
+            self.listings[remove.parent].discard(remove.name)
+        if done is not None:
+            done(filepath, error)
+        elif error is not None:
+            raise error
+
+    def flush(self):
+        """Wait for every queued write and report it to its callback."""
+        while self.pending:
+            self._finish_oldest()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.shutdown()
+
+
+def _write_entry_file(filepath: Path, content: str, remove: Optional[Path], replacing: bool):
+    write_entry_files(filepath, content, replacing)
+    if remove is not None:
+        remove_entry_files(remove)
+
+
+def create_archive_entry(data: Dict, use_claude_api: bool = False, api_key: str = None) -> Path:
+    """Create a markdown file in the archive."""
+    content = render_archive_entry(data, use_claude_api, api_key)
+    return write_archive_entry(data, content)
+
+
+# INDEX.md rows: - **2026-01-16** — [Title](2026/01-January/2026-01-16-title.md) — tag1, tag2
+_INDEX_ROW_RE = re.compile(r'^- \*\*(\d{4})-(0[1-9]|1[0-2])-\d{2}\*\* — \[.*\]\((.+?)\)')
+_INDEX_YEAR_RE = re.compile(r'^## \d{4}\s*$', re.MULTILINE)
+_INDEX_YEAR_LINE_RE = re.compile(r'^## (\d{4})\s*$')
+_INDEX_MONTH_LINE_RE = re.compile(r'^### (\w+)\s*$')
+# Month heading name -> "01".."12"
+_INDEX_MONTHS = {name.split('-')[1]: f"{number:02d}" for number, name in MONTH_NAMES.items()}
+INDEX_HEADER = "# AI Chat Archive Index\n"
+
+
+def _strip_blank(lines: List[str]) -> List[str]:
+    """Lines without the blank ones at the start and end."""
+    start = next(i for i, line in enumerate(lines) if line)
+    end = len(lines) - next(i for i, line in enumerate(reversed(lines)) if line)
+    return lines[start:end]
+
+
+# Rows waiting to be written to INDEX.md, by archive path (None = remove)
+_index_updates: Dict[str, Optional[str]] = {}
+
+
+def update_index(entry: Dict, filepath: Path):
+    """Queue an INDEX.md row for an entry; flush_index() writes all queued rows at once."""
+    path = str(filepath.relative_to(settings.ARCHIVE_ROOT))
+    title = " ".join(entry['title'].split())
+    tags = f" — {', '.join(entry['tags'])}" if entry.get('tags') else ""
+    _index_updates[path] = f"- **{entry['date'].strftime('%Y-%m-%d')}** — [{title}]({path}){tags}"
+
+
+def remove_from_index(filepath: Path):
+    """Queue the removal of an entry's INDEX.md row (the entry moved or was deleted)."""
+    _index_updates[str(filepath.relative_to(settings.ARCHIVE_ROOT))] = None
+
+
+def flush_index() -> int:
+    """
+    Merge queued rows into INDEX.md with one read and one atomic write.
+
+    Rows are grouped under ## year and ### month headings, newest first. Text
+    before the first year heading is kept; the year sections are regenerated
+    from the existing rows plus the queued changes. Any other line in them
+    (notes, rows written by hand in another format) is kept at the end of
+    the year or month section it was in. INDEX.md is created if it does not
+    exist. Returns the number of rows changed.
+    """
+    if not _index_updates:
+        return 0
+
+    index_path = settings.ARCHIVE_ROOT / "INDEX.md"
+    content = index_path.read_text(encoding="utf-8") if index_path.exists() else INDEX_HEADER
+    first_year = _INDEX_YEAR_RE.search(content)
+    preamble = content[:first_year.start()] if first_year else content
+
+    rows = {}
+    # Other lines of the year sections, by (year, month or None for the year's own text)
+    notes: Dict[Tuple[str, Optional[str]], List[str]] = {}
+    if first_year:
+        year = month = None
+        for line in content[first_year.start():].split("\n"):
+            match = _INDEX_ROW_RE.match(line)
+            year_heading = _INDEX_YEAR_LINE_RE.match(line)
+            month_heading = _INDEX_MONTH_LINE_RE.match(line)
+            if match:
+                rows[match.group(3)] = line
+            elif year_heading:
+                year, month = year_heading.group(1), None
+            elif month_heading and month_heading.group(1) in _INDEX_MONTHS:
+                month = _INDEX_MONTHS[month_heading.group(1)]
+            elif line.strip() or notes.get((year, month), [""])[-1]:
+                # Runs of blank lines are kept as one
+                notes.setdefault((year, month), []).append(line.rstrip())
+    for path, row in _index_updates.items():
+        if row is None:
+            rows.pop(path, None)
+        else:
+            rows[path] = row
+
+    sections: Dict[Tuple[str, Optional[str]], List[str]] = {}
+    for row in rows.values():
+        sections.setdefault((row[4:8], row[9:11]), []).append(row)
+    keys = set(sections) | {key for key, text in notes.items() if any(text)}
+    lines = []
+    for year in sorted({year for year, _ in keys}, reverse=True):
+        lines += ["", f"## {year}"]
+        lines += ([""] + _strip_blank(notes[year, None])) if any(notes.get((year, None), [])) else []
+        for month in sorted({month for y, month in keys if y == year and month}, reverse=True):
+            lines += ["", f"### {MONTH_NAMES[int(month)].split('-')[1]}", ""]
+            lines += sorted(sections.get((year, month), []), key=lambda row: (row[4:14], row), reverse=True)
+            if any(notes.get((year, month), [])):
+                lines += ([""] if (year, month) in sections else []) + _strip_blank(notes[year, month])
+
+    write_text_atomic(index_path, preamble.rstrip("\n") + "\n" + "\n".join(lines) + "\n")
+    changed = len(_index_updates)
+    _index_updates.clear()
+    return changed
@@ -0,0 +1,435 @@
+"""Reading conversations.json exports and parsing Claude, ChatGPT and Grok conversations."""
+
+import json
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from . import settings
+from .analysis import ConversationAnalysis, detect_domain, generate_tags, sanitize_topic
+
+
+# ============================================================================
+# EXPORT READING
+# ============================================================================
+
+# Characters that change nesting depth or open a string
+_JSON_STRUCTURE_RE = re.compile(r'[\[\]{}"]')
+# Remainder of a JSON string after its opening quote (handles escapes)
+_JSON_STRING_END_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_JSON_SPACE_RE = re.compile(r'\s*')
+
+STREAM_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def _iter_json_array_pure(f, chunk_size: int = STREAM_CHUNK_SIZE, skip: int = 0,
+                          key: Optional[str] = None) -> Iterator:
+    """
+    Yield elements of a top-level JSON array from a text file object.
+
+    Scans the stream for structural characters only (strings are skipped in one
+    regex step), so just the element currently being read is held in memory.
+    Each complete element is handed to json.loads, except the first `skip`
+    elements, which are scanned past without being decoded.
+
+    With `key`, the document may also be an object, and the elements of the
+    array under that top-level key are yielded instead.
+    """
+    buffer = ""
+    pos = 0            # Next unscanned position in buffer
+    depth = 0          # Current nesting depth (1 = inside the top-level array or object)
+    item_depth = None  # Depth of the array being streamed, once it is found
+    awaiting = False   # Just read `key` at the top level of an object; its value comes next
+    start = None       # Start of the element being read
+    started = False    # Seen the opening '[' (or '{' with a key)
+    read_size = chunk_size
+
+    while True:
+        chunk = f.read(read_size)
+        if not chunk:
+            break
+
+        # Drop everything already consumed before appending the next chunk
+        keep_from = start if start is not None else pos
+        buffer = buffer[keep_from:] + chunk
+        pos -= keep_from
+        if start is not None:
+            start = 0
+            # Grow reads with the element so huge elements stay linear
+            read_size = max(chunk_size, len(buffer))
+        else:
+            read_size = chunk_size
+
+        while True:
+            match = _JSON_STRUCTURE_RE.search(buffer, pos)
+            if not match:
+                pos = len(buffer)
+                break
+
+            char = match.group()
+            index = match.start()
+
+            if not started:
+                if char not in ('[{' if key else '[') or buffer[pos:index].strip():
+                    raise json.JSONDecodeError("Expected a top-level JSON array", buffer, index)
+                started = True
+                depth = 1
+                item_depth = 1 if char == '[' else None
+                pos = index + 1
+                continue
+
+            if char == '"':
+                end = _JSON_STRING_END_RE.match(buffer, index + 1)
+                if not end:
+                    # String continues past the buffer; rescan it after the next read
+                    pos = index
+                    break
+                if item_depth is None and depth == 1:
+                    # A top-level key is followed by ':'; look past the whitespace
+                    colon = _JSON_SPACE_RE.match(buffer, end.end()).end()
+                    if colon == len(buffer):
+                        pos = index
+                        break
+                    awaiting = buffer[colon] == ':' and json.loads(buffer[index:end.end()]) == key
+                pos = end.end()
+                continue
+
+            pos = index + 1
+            if awaiting:
+                if char != '[':
+                    raise json.JSONDecodeError(f"Expected an array under {key!r}", buffer, index)
+                awaiting = False
+                depth = item_depth = 2
+                continue
+            if char in '[{':
+                if depth == item_depth:
+                    start = index
+                depth += 1
+            else:
+                depth -= 1
+                if depth == item_depth and start is not None:
+                    if skip:
+                        skip -= 1
+                    else:
+                        yield json.loads(buffer[start:pos])
+                    start = None
+                elif item_depth is not None and depth == item_depth - 1:
+                    return
+                elif depth == 0:
+                    raise json.JSONDecodeError(f"No {key!r} array in the top-level object", buffer, index)
+
+    if not started:
+        raise json.JSONDecodeError("Expected a top-level JSON array", buffer, 0)
+    raise json.JSONDecodeError("Unterminated JSON array", buffer, len(buffer))
+
+
+# File holding the conversations inside an export .zip
+EXPORT_MEMBER = "conversations.json"
+
+
+def find_export_member(path: Path, members: Tuple[str, ...] = (EXPORT_MEMBER,)) -> str:
+    """Name of the conversations file inside an export .zip (the shallowest one, if there are several)."""
+    import zipfile
+
+    with zipfile.ZipFile(path) as archive:
+        found = [name for name in archive.namelist() if name.rsplit("/", 1)[-1] in members]
+    if not found:
+        raise FileNotFoundError(f"No {' or '.join(members)} in {path}")
+    return min(found, key=lambda name: (name.count("/"), name))
+
+
+def describe_export(path: Path, members: Tuple[str, ...] = (EXPORT_MEMBER,)) -> Optional[str]:
+    """How to show an export in progress output, or None for a .zip without a conversations file."""
+    import zipfile
+
+    if not zipfile.is_zipfile(path):
+        return str(path)
+    try:
+        return f"{path} ({find_export_member(path, members)})"
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def open_export(path: Path, members: Tuple[str, ...] = (EXPORT_MEMBER,)) -> Iterator[BinaryIO]:
+    """
+    Open an export's conversations file for reading as bytes.
+
+    `path` is either the JSON file itself or the .zip the export was
+    downloaded as, in which case the first of `members` found inside is
+    opened. A member of a .zip is decompressed as it is read, so nothing is
+    extracted to disk.
+    """
+    import zipfile
+
+    if not zipfile.is_zipfile(path):
+        with open(path, 'rb') as f:
+            yield f
+        return
+    member = find_export_member(path, members)
+    with zipfile.ZipFile(path) as archive, archive.open(member) as f:
+        yield f
+
+
+def iter_conversations(path: Path, skip: int = 0, key: Optional[str] = None,
+                       members: Tuple[str, ...] = (EXPORT_MEMBER,)) -> Iterator[Dict]:
+    """
+    Stream conversation objects one at a time from an export's conversations.json.
+
+    Uses ijson when installed, otherwise a pure-Python incremental scanner.
+    Memory stays bounded by the largest single conversation, not the export size.
+    The first `skip` conversations (already imported, see --resume) are not yielded.
+    `path` may also be the export .zip (see open_export). With `key`, the
+    conversations are the array under that key of a top-level object (a
+    top-level array is still accepted).
+    """
+    if settings.IJSON_AVAILABLE:
+        import ijson
+        from itertools import islice
+
+        with open_export(path, members) as f:
+            prefix = "item"
+            if key:
+                # Peek at the first byte to tell a top-level array from an object
+                first = f.read(64).lstrip()[:1]
+                prefix = "item" if first == b"[" else f"{key}.item"
+                f.seek(0)
+            try:
+                yield from islice(ijson.items(f, prefix, use_float=True), skip, None)
+            except ijson.JSONError as e:
+                raise json.JSONDecodeError(str(e), "", 0)
+        return
+
+    import io
+
+    with open_export(path, members) as f:
+        yield from _iter_json_array_pure(io.TextIOWrapper(f, encoding='utf-8'), skip=skip, key=key)
+
+
+# ============================================================================
+# CONVERSION FUNCTIONS
+# ============================================================================
+
+def parse_claude_conversation(chat: Dict, context: Dict) -> Dict:
+    """Parse a Claude conversation from JSON."""
+    # Extract date
+    created_at = chat.get("created_at", "")
+    try:
+        if isinstance(created_at, str):
+            date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        else:
+            date = datetime.now()
+    except:
+        date = datetime.now()
+
+    # Extract title and content
+    title = chat.get("name", "Untitled")
+    messages = chat.get("chat_messages", [])
+
+    # Build transcript
+    transcript_parts = []
+    for msg in messages:
+        sender = msg.get("sender", "unknown")
+        text = msg.get("text", "")
+        if text:
+            transcript_parts.append(f"**{sender.title()}:** {text}")
+
+    transcript = "\n\n".join(transcript_parts)
+
+    # Generate metadata
+    topic = sanitize_topic(title)
+    analysis = ConversationAnalysis(title, transcript)
+    domain = detect_domain(transcript, title, analysis)
+    tags = generate_tags(transcript, title, context, analysis)
+
+    return {
+        "date": date,
+        "title": title,
+        "topic": topic,
+        "domain": domain,
+        "tags": tags,
+        "ai": "claude",
+        "transcript": transcript,
+        "analysis": analysis
+    }
+
+
+def _chatgpt_message_parts(node: Dict) -> List[str]:
+    """Transcript parts for the text message of one ChatGPT mapping node."""
+    message = node.get("message")
+    if not message:
+        return []
+    role = message.get("author", {}).get("role", "unknown")
+    content = message.get("content", {})
+    if content.get("content_type") != "text":
+        return []
+    return [f"**{role.title()}:** {part}" for part in content.get("parts", [])
+            if isinstance(part, str) and part.strip()]
+
+
+def chatgpt_active_branch(mapping: Dict, current_node: Optional[str]) -> List[str]:
+    """
+    Node ids of the branch shown in ChatGPT, from the root to current_node.
+
+    Follows parent links back from current_node, so edited or regenerated
+    messages on other branches are left out. Exports without current_node use
+    the last leaf in mapping order (the most recently created branch), and
+    flat mappings without parent/children links keep their mapping order.
+    """
+    if not any(node.get("parent") or node.get("children") for node in mapping.values()):
+        return list(mapping)
+
+    if current_node not in mapping:
+        leaves = [node_id for node_id, node in mapping.items() if not node.get("children")]
+        if not leaves:
+            return list(mapping)
+        current_node = leaves[-1]
+
+    branch = []
+    seen = set()
+    node_id = current_node
+    while node_id in mapping and node_id not in seen:
+        seen.add(node_id)
+        branch.append(node_id)
+        node_id = mapping[node_id].get("parent")
+    branch.reverse()
+    return branch
+
+
+def chatgpt_transcript_parts(mapping: Dict, current_node: Optional[str] = None,
+                             all_branches: bool = False) -> List[str]:
+    """
+    Transcript parts for a ChatGPT conversation tree, in conversation order.
+
+    By default only the active branch is exported. With all_branches, every
+    branch is exported depth-first: messages shared by several branches appear
+    once, and each alternative after a fork is introduced by a branch label.
+    Each node is visited once, so both modes are linear in the number of nodes.
+    """
+    if not all_branches:
+        return [part for node_id in chatgpt_active_branch(mapping, current_node)
+                for part in _chatgpt_message_parts(mapping[node_id])]
+
+    roots = [node_id for node_id, node in mapping.items() if node.get("parent") not in mapping]
+    parts = []
+    seen = set()
+    stack = [(node_id, None) for node_id in reversed(roots)]
+    while stack:
+        node_id, label = stack.pop()
+        if node_id in seen or node_id not in mapping:
+            continue
+        seen.add(node_id)
+        if label:
+            parts.append(label)
+        parts.extend(_chatgpt_message_parts(mapping[node_id]))
+
+        children = [child for child in mapping[node_id].get("children", []) if child in mapping]
+        for i in reversed(range(len(children))):
+            child_label = f"*[Branch {i + 1} of {len(children)}]*" if len(children) > 1 else None
+            stack.append((children[i], child_label))
+    return parts
+
+
+def parse_chatgpt_conversation(chat: Dict, context: Dict) -> Optional[Dict]:
+    """Parse a ChatGPT conversation from JSON."""
+    # ChatGPT format is complex - extract from mapping structure
+    title = chat.get("title", "Untitled")
+    create_time = chat.get("create_time", 0)
+
+    try:
+        date = datetime.fromtimestamp(create_time)
+    except:
+        return None
+
+    # Extract messages from the conversation tree
+    mapping = chat.get("mapping", {})
+    all_branches = settings.CONFIG["import_sources"].get("chatgpt_branches") == "all"
+    transcript_parts = chatgpt_transcript_parts(mapping, chat.get("current_node"), all_branches)
+
+    if not transcript_parts:
+        return None
+
+    transcript = "\n\n".join(transcript_parts)
+
+    # Generate metadata
+    topic = sanitize_topic(title)
+    analysis = ConversationAnalysis(title, transcript)
+    domain = detect_domain(transcript, title, analysis)
+    tags = generate_tags(transcript, title, context, analysis)
+
+    return {
+        "date": date,
+        "title": title,
+        "topic": topic,
+        "domain": domain,
+        "tags": tags,
+        "ai": "chatgpt",
+        "transcript": transcript,
+        "analysis": analysis
+    }
+
+
+def _grok_time(value) -> Optional[datetime]:
+    """Parse a Grok timestamp: ISO string, epoch milliseconds, or {"$date": ...} (MongoDB extended JSON)."""
+    if isinstance(value, dict):
+        value = value.get("$date")
+        if isinstance(value, dict):
+            value = value.get("$numberLong")
+    try:
+        if isinstance(value, str) and not value.isdigit():
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return datetime.fromtimestamp(int(value) / 1000)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def parse_grok_conversation(chat: Dict, context: Dict) -> Optional[Dict]:
+    """
+    Parse a Grok conversation from JSON.
+
+    Grok exports list {"conversation": {...}, "responses": [{"response": {...}}]}
+    items; each response has a sender ("human" or "assistant") and a message.
+    """
+    conversation = chat.get("conversation", chat)
+    title = conversation.get("title") or "Untitled"
+    date = _grok_time(conversation.get("create_time"))
+
+    responses = [item.get("response", item) for item in chat.get("responses", [])]
+    times = [_grok_time(response.get("create_time")) for response in responses]
+    if all(times):
+        # Responses are not always listed in the order they were sent
+        order = sorted(range(len(responses)), key=lambda i: times[i].timestamp())
+        responses = [responses[i] for i in order]
+    if date is None:
+        date = min(times, key=datetime.timestamp) if times and all(times) else None
+    if date is None:
+        return None
+
+    transcript_parts = []
+    for response in responses:
+        text = response.get("message", "")
+        if isinstance(text, str) and text.strip():
+            transcript_parts.append(f"**{str(response.get('sender', 'unknown')).lower().title()}:** {text}")
+    if not transcript_parts:
+        return None
+
+    transcript = "\n\n".join(transcript_parts)
+
+    # Generate metadata
+    topic = sanitize_topic(title)
+    analysis = ConversationAnalysis(title, transcript)
+    domain = detect_domain(transcript, title, analysis)
+    tags = generate_tags(transcript, title, context, analysis)
+
+    return {
+        "date": date,
+        "title": title,
+        "topic": topic,
+        "domain": domain,
+        "tags": tags,
+        "ai": "grok",
+        "transcript": transcript,
+        "analysis": analysis
+    }
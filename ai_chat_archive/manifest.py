@@ -0,0 +1,118 @@
+"""Record of imported conversations for incremental re-imports."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# ============================================================================
+# IMPORT STATE
+# ============================================================================
+
+def conversation_fingerprint(source: str, chat: Dict) -> Tuple[str, str]:
+    """Return (conversation id, content hash) for a raw exported conversation."""
+    import hashlib
+
+    from .sources import SOURCES
+
+    raw = json.dumps(chat, sort_keys=True, ensure_ascii=False)
+    content_hash = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    # Conversations without an id are tracked by content alone
+    conversation_id = SOURCES[source].conversation_id(chat) or content_hash
+    return str(conversation_id), content_hash
+
+
+def export_fingerprint(path: Path) -> str:
+    """Identify an export file by path, size and modification time (a checkpoint only applies to the same file)."""
+    stat = path.stat()
+    return json.dumps([str(path.resolve()), stat.st_size, stat.st_mtime_ns])
+
+
+class ImportManifest:
+    """
+    Record of imported conversations, stored in ARCHIVE_ROOT/.import-state.
+
+    Maps (source, conversation id) to the content hash that was imported and
+    the archive file it produced, so re-imports can skip unchanged
+    conversations and update changed ones in place.
+
+    Records are committed together with a checkpoint of the position reached
+    in each export (see checkpoint()), so after a crash the manifest, INDEX.md
+    and the indexes agree up to the last checkpoint. Paths handed out since
+    then are kept in an append-only journal; opening the manifest after a
+    crash marks those conversations as changed, so the next run rewrites
+    their files in place instead of adding -1 copies.
+    """
+
+    def __init__(self, archive_root: Path):
+        import sqlite3
+
+        self.root = archive_root
+        state_dir = archive_root / ".import-state"
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(state_dir / "manifest.sqlite"), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS conversations "
+                        "(source TEXT NOT NULL, conversation_id TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                        "path TEXT, imported_at TEXT NOT NULL, PRIMARY KEY (source, conversation_id))")
+        self.db.execute("CREATE TABLE IF NOT EXISTS checkpoints "
+                        "(source TEXT PRIMARY KEY, export TEXT NOT NULL, position INTEGER NOT NULL, "
+                        "saved_at TEXT NOT NULL)")
+        self.journal_path = state_dir / "journal"
+        self._replay_journal()
+        self.journal_file = open(self.journal_path, "a", encoding="utf-8")
+
+    def _replay_journal(self):
+        if not self.journal_path.exists():
+            return
+        for line in self.journal_path.read_text(encoding="utf-8").splitlines():
+            try:
+                source, conversation_id, path = json.loads(line)
+            except ValueError:
+                # The last line of a crashed run may be cut short
+                continue
+            # An empty hash never matches, so the conversation is converted again and written to `path`
+            self.db.execute("INSERT OR REPLACE INTO conversations VALUES (?, ?, '', ?, ?)",
+                            (source, conversation_id, path, datetime.now().isoformat(timespec='seconds')))
+        self.db.commit()
+        self.journal_path.write_text("")
+
+    def lookup(self, source: str, conversation_id: str) -> Optional[Tuple[str, Optional[Path]]]:
+        """Return (content hash, archive path) recorded for a conversation, if any."""
+        row = self.db.execute("SELECT content_hash, path FROM conversations WHERE source = ? AND conversation_id = ?",
+                              (source, conversation_id)).fetchone()
+        if row is None:
+            return None
+        return row[0], (self.root / row[1]) if row[1] else None
+
+    def journal(self, source: str, conversation_id: str, filepath: Path):
+        """Note the path an entry is about to be written to (before the write starts)."""
+        self.journal_file.write(json.dumps([source, conversation_id, str(filepath.relative_to(self.root))]) + "\n")
+        self.journal_file.flush()
+
+    def record(self, source: str, conversation_id: str, content_hash: str, filepath: Optional[Path]):
+        """Remember what a conversation was imported as (filepath None = skipped by the parser)."""
+        path = str(filepath.relative_to(self.root)) if filepath else None
+        self.db.execute("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?)",
+                        (source, conversation_id, content_hash, path, datetime.now().isoformat(timespec='seconds')))
+
+    def checkpoint(self, source: str, export: str, position: int):
+        """Commit the records so far, with every conversation before `position` in the export done."""
+        self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                        (source, export, position, datetime.now().isoformat(timespec='seconds')))
+        self.db.commit()
+        self.journal_file.truncate(0)
+
+    def resume_position(self, source: str, export: str) -> int:
+        """Position to resume an export from (0 if there is no checkpoint for this exact file)."""
+        row = self.db.execute("SELECT position FROM checkpoints WHERE source = ? AND export = ?",
+                              (source, export)).fetchone()
+        return row[0] if row else 0
+
+    def close(self):
+        self.db.commit()
+        self.journal_file.truncate(0)
+        self.journal_file.close()
+        self.db.close()
@@ -0,0 +1,98 @@
+"""Bounded helpers for feeding iterators to thread and process pools."""
+
+from itertools import islice
+from typing import Iterator, List
+
+
+def batched(iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def process_pool(workers: int, **options):
+    """
+    A ProcessPoolExecutor whose workers are not forked from this process.
+
+    The importer runs reader and writer threads while its pool starts, and a
+    child forked while one of them holds a lock can deadlock. Workers start
+    from a fork server where the platform has one, and are spawned otherwise.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method), **options)
+
+
+def ordered_map(executor, fn, iterable, window: int) -> Iterator:
+    """Like executor.map, but with at most `window` tasks in flight at once."""
+    from collections import deque
+
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def interleave(iterables: List, read_ahead: int) -> Iterator:
+    """
+    Yield (index, item) from several iterables in turn, each read ahead on its own thread.
+
+    Takes one item from each iterable in turn, skipping exhausted ones, so the
+    merged order is the same on every run. Up to `read_ahead` items per
+    iterable are buffered. An exception raised by an iterable is re-raised
+    here when its turn comes.
+    """
+    if len(iterables) == 1:
+        for item in iterables[0]:
+            yield 0, item
+        return
+
+    import queue
+    import threading
+
+    end = object()
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=read_ahead) for _ in iterables]
+
+    def put(q, value):
+        while not stop.is_set():
+            try:
+                q.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read(iterable, q):
+        try:
+            for item in iterable:
+                if not put(q, (item, None)):
+                    return
+            put(q, (end, None))
+        except BaseException as e:
+            put(q, (end, e))
+
+    for iterable, q in zip(iterables, queues):
+        threading.Thread(target=read, args=(iterable, q), daemon=True).start()
+    active = list(range(len(iterables)))
+    try:
+        while active:
+            for index in list(active):
+                item, error = queues[index].get()
+                if item is end:
+                    active.remove(index)
+                    if error is not None:
+                        raise error
+                    continue
+                yield index, item
+    finally:
+        stop.set()
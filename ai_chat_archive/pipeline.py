@@ -0,0 +1,384 @@
+"""
+The import pipeline: convert conversations (optionally across processes)
+and write them to the archive and its indexes.
+"""
+
+import json
+from collections import Counter
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import claude_api, settings
+from .catalog import ArchiveCatalog
+from .claude_api import track_api_usage
+from .duplicates import DuplicateIndex, mark_duplicate, minhash_signature
+from .enrich import mark_pending
+from .entries import ArchiveWriter, flush_index, remove_from_index, render_archive_entry, update_index
+from .manifest import ImportManifest, conversation_fingerprint
+from .parallel import batched, interleave, ordered_map, process_pool
+from .search import SearchIndex
+from .sources import SOURCES
+
+if TYPE_CHECKING:
+    # Only imported when embeddings are enabled (it needs numpy)
+    from .vectors import VectorIndex
+    # Only imported with --claude-batch
+    from .batches import BatchQueue
+
+
+# ============================================================================
+# IMPORT PIPELINE
+# ============================================================================
+
+# Conversations sent to a worker per task
+WORKER_BATCH_SIZE = 8
+
+# Conversations read ahead per export when several are imported at once
+STREAM_READ_AHEAD = 32
+
+# Seconds between import checkpoints
+CHECKPOINT_INTERVAL = 30.0
+
+# Per-process settings for pool workers (set by _init_worker)
+_worker_state: Dict = {}
+
+
+def convert_conversation(source: str, chat: Dict, context: Dict,
+                         use_claude_api: bool = False, api_key: str = None) -> Optional[Tuple[Dict, str]]:
+    """Parse and render one conversation. Returns (data, markdown) or None if skipped."""
+    data = SOURCES[source].parse(chat, context)
+    if not data:
+        return None
+    if not use_claude_api:
+        content = render_archive_entry(data)
+    else:
+        usage = track_api_usage()
+        try:
+            content = render_archive_entry(data, use_claude_api, api_key)
+        finally:
+            claude_api._api_usage.current = None
+        data["api_usage"] = dict(usage)
+
+    # Cached analysis values are no longer needed (and not worth sending between processes)
+    data.pop("analysis", None)
+    duplicates = settings.CONFIG["duplicates"]
+    if duplicates.get("enabled", False):
+        data["minhash"] = minhash_signature(data["transcript"], duplicates.get("num_perm", 128),
+                                            duplicates.get("shingle_words", 5))
+    return data, content
+
+
+def _convert_one(item: Tuple[str, Dict], context: Dict,
+                 use_claude_api: bool, api_key: Optional[str]) -> Tuple:
+    """Convert one (source, chat) pair, capturing errors as (None, message)."""
+    source, chat = item
+    try:
+        return convert_conversation(source, chat, context, use_claude_api, api_key), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _convert_batch(batch: List[Tuple[str, Dict]], context: Dict,
+                   use_claude_api: bool, api_key: Optional[str]) -> List[Tuple]:
+    """Convert a batch of (source, chat) pairs, capturing per-conversation errors."""
+    if use_claude_api:
+        # API calls are I/O bound: overlap them on threads within the batch
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(batch)) as threads:
+            return list(threads.map(
+                lambda item: _convert_one(item, context, use_claude_api, api_key), batch))
+    return [_convert_one(item, context, use_claude_api, api_key) for item in batch]
+
+
+def _init_worker(context: Dict, use_claude_api: bool, api_key: Optional[str], workers: int, resolved: Dict):
+    """Store shared settings once per worker process."""
+    # Workers start from a fresh interpreter: use the importing process's settings, not config.yaml again
+    vars(settings).update(resolved)
+    _worker_state.update(context=context, use_claude_api=use_claude_api, api_key=api_key)
+    # Every worker has its own API scheduler, so split the rate budgets between them
+    claude_api._api_budget_share = workers
+
+
+def _convert_batch_in_worker(batch: List[Tuple[str, Dict]]) -> List[Tuple]:
+    """Pool entry point for _convert_batch."""
+    return _convert_batch(batch, **_worker_state)
+
+
+def convert_conversations(items, context: Dict, use_claude_api: bool = False,
+                          api_key: str = None, workers: int = 1) -> Iterator[Tuple]:
+    """
+    Parse and render (source, chat) pairs, optionally across a process pool.
+
+    Yields (result, error) in input order, where result is (data, markdown) or
+    None for skipped conversations. Results are ordered so that the parent
+    process can assign filenames (including -1, -2 duplicate suffixes)
+    deterministically regardless of the worker count. Only a bounded number
+    of tasks is in flight, so streamed exports stay streamed.
+
+    With use_claude_api, up to anthropic.concurrency conversations per process
+    wait on the API at the same time.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    concurrency = max(1, settings.CONFIG["anthropic"].get("concurrency", 4))
+
+    if workers <= 1:
+        if not use_claude_api:
+            for item in items:
+                yield _convert_one(item, context, use_claude_api, api_key)
+            return
+        with ThreadPoolExecutor(max_workers=concurrency) as threads:
+            yield from ordered_map(
+                threads, lambda item: _convert_one(item, context, use_claude_api, api_key),
+                items, concurrency * 2)
+        return
+
+    batch_size = concurrency if use_claude_api else WORKER_BATCH_SIZE
+    resolved = {name: getattr(settings, name) for name in settings._LAZY_SETTINGS}
+    with process_pool(workers, initializer=_init_worker,
+                      initargs=(context, use_claude_api, api_key, workers, resolved)) as pool:
+        batches = ordered_map(pool, _convert_batch_in_worker, batched(items, batch_size), workers * 2)
+        for results in batches:
+            yield from results
+
+
+def _guard_stream(chats) -> Iterator[Tuple[Optional[Dict], Optional[json.JSONDecodeError]]]:
+    """Yield (chat, None) pairs, ending with (None, error) if the export is not valid JSON."""
+    try:
+        for chat in chats:
+            yield chat, None
+    except json.JSONDecodeError as e:
+        yield None, e
+
+
+def import_conversations(source: str, chats, context: Dict, args,
+                         use_claude_api: bool = False, api_key: str = None,
+                         manifest: Optional[ImportManifest] = None,
+                         search_index: Optional[SearchIndex] = None,
+                         catalog: Optional[ArchiveCatalog] = None,
+                         vector_index: Optional["VectorIndex"] = None,
+                         duplicate_index: Optional[DuplicateIndex] = None,
+                         writer: Optional[ArchiveWriter] = None,
+                         export: Optional[str] = None, start: int = 0,
+                         batch_queue: Optional["BatchQueue"] = None) -> Counter:
+    """Convert and write conversations from one source (see import_streams)."""
+    return import_streams([(source, chats, export, start)], context, args, use_claude_api, api_key, manifest,
+                          search_index, catalog, vector_index, duplicate_index, writer, batch_queue)
+
+
+def import_streams(streams: List[Tuple[str, Iterable, Optional[str], int]], context: Dict, args,
+                   use_claude_api: bool = False, api_key: str = None,
+                   manifest: Optional[ImportManifest] = None,
+                   search_index: Optional[SearchIndex] = None,
+                   catalog: Optional[ArchiveCatalog] = None,
+                   vector_index: Optional["VectorIndex"] = None,
+                   duplicate_index: Optional[DuplicateIndex] = None,
+                   writer: Optional[ArchiveWriter] = None,
+                   batch_queue: Optional["BatchQueue"] = None) -> Counter:
+    """
+    Convert and write conversations from one or more exports. Returns counts for the import report.
+
+    `streams` are (source, chats, export, start) tuples. With several, each
+    export is read on its own thread and their conversations are taken in
+    turn into one conversion stage (one process pool with --workers) and one
+    write stage, so file names do not depend on thread timing.
+
+    With a manifest, conversations whose content is unchanged since the last
+    import are skipped before parsing (unless args.full is set), and changed
+    ones replace their previous archive file instead of adding a -1 copy.
+    Every written entry is also added to the search index, catalog and vector
+    index, if given.
+
+    With a duplicate index, a conversation whose transcript is a near-duplicate
+    of an archived entry is flagged in its frontmatter (duplicates.action
+    "flag") or not written at all ("skip").
+
+    Files are written by `writer` (a new ArchiveWriter if not given) in the
+    background; the indexes and manifest are updated as each write finishes.
+    With a batch queue (--claude-batch), each written entry is also queued
+    for a Claude summary through the Message Batches API. With
+    args.enrich_later, entries are marked summary: pending for
+    bin/enrich-archive.py to summarize later (see enrich).
+
+    With a manifest and a stream's `export` (see export_fingerprint), a
+    checkpoint is saved every CHECKPOINT_INTERVAL seconds and when the run
+    stops, even on Ctrl-C. A checkpoint never moves past a conversation that
+    failed to convert or write, so resuming tries it again; the conversations
+    after it that were imported are skipped as unchanged. `start` is the
+    position in the export of the first chat in `chats`, when resuming from a
+    checkpoint.
+    """
+    import time
+    from collections import deque
+
+    stats = Counter()
+    enrich_later = getattr(args, "enrich_later", False)
+    # (stream, position, conversation id, content hash, previous path) for each chat sent to conversion
+    pending = deque()
+    # Per stream: positions read from the export but not finished yet (converting, or waiting to be written)
+    outstanding = [set() for _ in streams]
+    # Per stream: positions whose conversion or write failed; checkpoints stay before them so --resume retries
+    failed = [set() for _ in streams]
+    # Per stream: position of the next chat to read from the export
+    positions = [start for _, _, _, start in streams]
+
+    def tag(k, i):
+        return f"{SOURCES[streams[k][0]].label} {i+1}" if len(streams) > 1 else str(i + 1)
+
+    def select(merged):
+        for k, (chat, error) in merged:
+            source = streams[k][0]
+            if error is not None:
+                print(f"  Error parsing {SOURCES[source].label} JSON: {error}")
+                continue
+            i = positions[k]
+            positions[k] += 1
+            if manifest is None:
+                pending.append((k, i, None, None, None))
+                yield source, chat
+                continue
+
+            conversation_id, content_hash = conversation_fingerprint(source, chat)
+            previous = manifest.lookup(source, conversation_id)
+            if previous and previous[0] == content_hash and not getattr(args, "full", False):
+                stats["unchanged"] += 1
+                continue
+            pending.append((k, i, conversation_id, content_hash, previous[1] if previous else None))
+            outstanding[k].add(i)
+            yield source, chat
+
+    def checkpoint():
+        """Make everything finished so far durable, then save the positions to resume from."""
+        writer.flush()
+        flush_index()
+        for index in (search_index, catalog, duplicate_index, batch_queue):
+            if index is not None:
+                index.commit()
+        if vector_index is not None:
+            vector_index.flush()
+        for k, (source, _, export, _) in enumerate(streams):
+            if export is not None:
+                manifest.checkpoint(source, export, min(outstanding[k] | failed[k], default=positions[k]))
+
+    def finish(k, i, data, content, signature, conversation_id, content_hash, previous, filepath, error):
+        """Update INDEX.md, the indexes and the manifest once an entry's file is written."""
+        outstanding[k].discard(i)
+        relative_path = str(filepath.relative_to(settings.ARCHIVE_ROOT))
+        try:
+            if error:
+                if duplicate_index is not None and signature:
+                    duplicate_index.remove(relative_path)
+                raise error
+            moved_from = str(previous.relative_to(settings.ARCHIVE_ROOT)) if previous not in (None, filepath) else None
+            if moved_from:
+                remove_from_index(previous)
+            update_index(data, filepath)
+            if search_index is not None:
+                if moved_from:
+                    search_index.remove(moved_from)
+                search_index.add(relative_path, content)
+            if catalog is not None:
+                if moved_from:
+                    catalog.remove(moved_from)
+                catalog.record(relative_path, data, content)
+            if vector_index is not None:
+                if moved_from:
+                    vector_index.remove(moved_from)
+                vector_index.add(relative_path, content)
+            if duplicate_index is not None and signature and moved_from:
+                duplicate_index.remove(moved_from)
+            if batch_queue is not None:
+                batch_queue.add(relative_path, data["title"], data["domain"], data["transcript"])
+            if manifest is not None:
+                manifest.record(streams[k][0], conversation_id, content_hash, filepath)
+
+            usage = Counter(data.get("api_usage", {}))
+            if args.sample or i % 100 == 0:
+                print(f"  [{tag(k, i)}] {data['title'][:50]} -> {relative_path}")
+                if args.sample and usage:
+                    print(f"    API tokens: {usage['input_tokens']} input, {usage['output_tokens']} output"
+                          + (f" ({usage['chunks_sent']} of {usage['chunks_sent'] + usage['chunks_skipped']} "
+                             f"chunks)" if usage["chunked_conversations"] else ""))
+
+            stats["updated" if previous else "imported"] += 1
+            if enrich_later:
+                stats["pending_enrichment"] += 1
+            stats.update(usage)
+            if usage:
+                stats["max_conversation_tokens"] = max(stats["max_conversation_tokens"],
+                                                       usage["input_tokens"] + usage["output_tokens"])
+        except Exception as e:
+            failed[k].add(i)
+            stats["errors"] += 1
+            if args.sample:
+                print(f"  Error processing chat {tag(k, i)}: {e}")
+
+    if writer is None:
+        writer = ArchiveWriter(**settings.CONFIG["writer"])
+        owns_writer = True
+    else:
+        owns_writer = False
+    checkpoints = manifest is not None and any(export is not None for _, _, export, _ in streams)
+    last_checkpoint = time.monotonic()
+    merged = interleave([_guard_stream(chats) for _, chats, _, _ in streams], STREAM_READ_AHEAD)
+    results = convert_conversations(select(merged), context, use_claude_api, api_key, args.workers)
+    try:
+        for result, error in results:
+            k, i, conversation_id, content_hash, previous = pending.popleft()
+            source = streams[k][0]
+            queued = False
+            if checkpoints and time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                checkpoint()
+                last_checkpoint = time.monotonic()
+            try:
+                if error:
+                    raise ValueError(error)
+                if not result:
+                    if manifest is not None:
+                        manifest.record(source, conversation_id, content_hash, None)
+                    outstanding[k].discard(i)
+                    continue
+
+                data, content = result
+                if enrich_later:
+                    content = mark_pending(content)
+                signature = data.pop("minhash", None)
+                if duplicate_index is not None and signature:
+                    own_path = str(previous.relative_to(settings.ARCHIVE_ROOT)) if previous else None
+                    matches = duplicate_index.find(signature, exclude=own_path)
+                    if matches:
+                        stats["near_duplicates"] += 1
+                        # Entries already in the archive are flagged rather than left orphaned
+                        if settings.CONFIG["duplicates"].get("action", "flag") == "skip" and previous is None:
+                            if args.sample:
+                                print(f"  [{tag(k, i)}] {data['title'][:50]} -> skipped, near-duplicate of "
+                                      f"{matches[0][0]} ({matches[0][1]:.0%})")
+                            if manifest is not None:
+                                manifest.record(source, conversation_id, content_hash, None)
+                            outstanding[k].discard(i)
+                            continue
+                        content = mark_duplicate(content, *matches[0])
+
+                journal = partial(manifest.journal, source, conversation_id) if manifest is not None else None
+                filepath = writer.write(data, content, replace=previous, journal=journal, done=partial(
+                    finish, k, i, data, content, signature, conversation_id, content_hash, previous))
+                queued = True
+                # Signed right away, so near-duplicates still waiting to be written are found too
+                if duplicate_index is not None and signature:
+                    duplicate_index.add(str(filepath.relative_to(settings.ARCHIVE_ROOT)), signature)
+            except Exception as e:
+                if not queued:
+                    outstanding[k].discard(i)
+                    failed[k].add(i)
+                stats["errors"] += 1
+                if args.sample:
+                    print(f"  Error processing chat {tag(k, i)}: {e}")
+    finally:
+        if checkpoints:
+            checkpoint()
+        if owns_writer:
+            writer.close()
+        else:
+            writer.flush()
+
+    return stats
@@ -0,0 +1,211 @@
+"""Reading archive entries back and the SQLite FTS5 full-text search index."""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import settings
+from .transcripts import read_archive_entry
+
+
+# ============================================================================
+# SEARCH INDEX
+# ============================================================================
+
+def _entry_section_re(name: str):
+    return re.compile(rf'^## {name}[ \t]*$', re.MULTILINE)
+
+
+_ENTRY_SECTIONS = (
+    ("summary", _entry_section_re("Summary")),
+    ("key_outputs", _entry_section_re("Key Outputs")),
+    ("transcript", _entry_section_re("Transcript")),
+)
+_ENTRY_TITLE_RE = re.compile(r'^# (.+)$', re.MULTILINE)
+
+
+def parse_archive_entry(content: str) -> Dict:
+    """
+    Split archive markdown back into its frontmatter fields and sections.
+
+    Returns date, topic, domains, tags and ai from the frontmatter, plus title,
+    summary, key_outputs and transcript from the body (empty when missing).
+    """
+    entry = {"domains": [], "tags": [], "title": "", "summary": "", "key_outputs": "", "transcript": ""}
+    body = content
+    if content.startswith("---\n"):
+        end = content.find("\n---", 4)
+        if end != -1:
+            for line in content[4:end].split("\n"):
+                key, sep, value = line.partition(":")
+                if sep:
+                    entry[key.strip()] = value.strip()
+            body = content[end + 4:]
+    for field in ("domains", "tags"):
+        if isinstance(entry[field], str):
+            try:
+                entry[field] = json.loads(entry[field])
+            except json.JSONDecodeError:
+                entry[field] = [item.strip(' "\'') for item in entry[field].strip("[]").split(",") if item.strip()]
+
+    # Sections appear in a fixed order; the transcript runs to the end of the file
+    starts = []
+    pos = 0
+    for name, pattern in _ENTRY_SECTIONS:
+        match = pattern.search(body, pos)
+        if match:
+            starts.append((name, match.start(), match.end()))
+            pos = match.end()
+    for i, (name, _, content_start) in enumerate(starts):
+        content_end = starts[i + 1][1] if i + 1 < len(starts) else len(body)
+        entry[name] = body[content_start:content_end].strip()
+
+    title = _ENTRY_TITLE_RE.search(body, 0, starts[0][1] if starts else len(body))
+    entry["title"] = title.group(1).strip() if title else entry.get("topic", "")
+    return entry
+
+
+def build_search_query(text: str) -> Tuple[str, List[str]]:
+    """
+    Turn a free-form query into an FTS5 MATCH expression and a list of domains.
+
+    Words and "quoted phrases" must all match unless joined by OR. @domain
+    words filter by domain instead of being searched for.
+    """
+    terms = []
+    domains = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if word.startswith("@") and len(word) > 1:
+            domains.append(word.lower())
+        elif word == "OR":
+            if terms and terms[-1] != "OR":
+                terms.append("OR")
+        elif phrase.strip() or word:
+            # Quote every term so punctuation is never read as FTS5 syntax
+            terms.append('"' + (phrase or word).replace('"', '') + '"')
+    while terms and terms[-1] == "OR":
+        terms.pop()
+    return " ".join(terms), domains
+
+
+class SearchIndex:
+    """
+    Full-text index of archive entries, stored in ARCHIVE_ROOT/.search-index.sqlite.
+
+    An SQLite FTS5 table over title, summary, key outputs and transcript,
+    ranked with BM25. The importer adds each entry as it is written, so
+    queries never have to scan the markdown files.
+    """
+
+    # BM25 column weights: title, summary, key_outputs, transcript
+    WEIGHTS = (10.0, 4.0, 4.0, 1.0)
+    COMMIT_EVERY = 500
+
+    def __init__(self, path: Path):
+        import sqlite3
+
+        self.path = path
+        self.db = sqlite3.connect(str(path), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries "
+                        "(id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, date TEXT, title TEXT, domain TEXT)")
+        self.db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5"
+                        "(title, summary, key_outputs, transcript, tokenize='porter unicode61')")
+        self.db.commit()
+        self._pending = 0
+
+    def _delete(self, path: str):
+        row = self.db.execute("SELECT id FROM entries WHERE path = ?", (path,)).fetchone()
+        if row:
+            self.db.execute("DELETE FROM entries_fts WHERE rowid = ?", row)
+            self.db.execute("DELETE FROM entries WHERE id = ?", row)
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.commit()
+
+    def add(self, path: str, content: str):
+        """Index (or re-index) the archive entry at path, relative to the archive root."""
+        entry = parse_archive_entry(content)
+        self._delete(path)
+        domain = entry["domains"][0] if entry["domains"] else ""
+        cursor = self.db.execute("INSERT INTO entries (path, date, title, domain) VALUES (?, ?, ?, ?)",
+                                 (path, entry.get("date", ""), entry["title"], domain))
+        self.db.execute("INSERT INTO entries_fts (rowid, title, summary, key_outputs, transcript) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (cursor.lastrowid, entry["title"], entry["summary"], entry["key_outputs"],
+                         entry["transcript"]))
+        self._changed()
+
+    def remove(self, path: str):
+        """Drop the entry at path from the index."""
+        self._delete(path)
+        self._changed()
+
+    def search(self, query: str, limit: int = 10, domains: Optional[List[str]] = None,
+               paths: Optional[List[str]] = None) -> List[Dict]:
+        """Return the best-matching entries for query, best first (only among paths, if given)."""
+        match, query_domains = build_search_query(query)
+        domains = [d.lower() for d in (domains or [])] + query_domains
+        if not match and not domains:
+            return []
+
+        sql = "SELECT e.path, e.date, e.title, e.domain"
+        params = []
+        if match:
+            weights = ", ".join(str(w) for w in self.WEIGHTS)
+            sql += (f", bm25(entries_fts, {weights}) AS score,"
+                    " snippet(entries_fts, -1, '[', ']', '...', 12)"
+                    " FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid WHERE entries_fts MATCH ?")
+            params.append(match)
+        else:
+            sql += ", 0 AS score, '' FROM entries e WHERE 1"
+        if domains:
+            sql += f" AND lower(e.domain) IN ({', '.join('?' * len(domains))})"
+            params += domains
+        if paths is not None:
+            sql += " AND e.path IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(paths)))
+        sql += " ORDER BY score, e.date DESC LIMIT ?"
+        params.append(limit)
+
+        return [{"path": path, "date": date, "title": title, "domain": domain, "score": score, "snippet": snippet}
+                for path, date, title, domain, score, snippet in self.db.execute(sql, params)]
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def commit(self):
+        self.db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+def get_search_index_path() -> Path:
+    """Location of the archive's full-text search index."""
+    return settings.ARCHIVE_ROOT / ".search-index.sqlite"
+
+
+def iter_archive_files(archive_root: Path) -> Iterator[Path]:
+    """Yield every archive entry (YYYY/MM-Month/*.md) under archive_root."""
+    for year_dir in sorted(archive_root.iterdir()):
+        if year_dir.is_dir() and year_dir.name.isdigit():
+            yield from sorted(year_dir.glob("*/*.md"))
+
+
+def rebuild_search_index(archive_root: Path, index: SearchIndex) -> int:
+    """Index every markdown entry already in the archive. Returns the number indexed."""
+    count = 0
+    index.db.execute("DELETE FROM entries_fts")
+    index.db.execute("DELETE FROM entries")
+    for filepath in iter_archive_files(archive_root):
+        index.add(str(filepath.relative_to(archive_root)), read_archive_entry(filepath))
+        count += 1
+    index.commit()
+    return count
@@ -0,0 +1,267 @@
+"""
+Configuration for the AI chat archive: defaults, config.yaml and environment
+variables, plus the paths derived from them.
+
+Nothing is read at import time. CONFIG, ARCHIVE_ROOT, IMPORT_ROOT,
+HUMAN_OS_ROOT and DOMAIN_KEYWORDS are resolved on first access (see
+__getattr__), and other modules read them as settings.X, so tests and tools
+can replace them here.
+"""
+
+import json
+import os
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Dict, Optional
+
+# Optional dependencies: checked without importing them; each is imported where it is used
+ANTHROPIC_AVAILABLE = find_spec("anthropic") is not None
+YAML_AVAILABLE = find_spec("yaml") is not None
+IJSON_AVAILABLE = find_spec("ijson") is not None
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+ZSTD_AVAILABLE = find_spec("zstandard") is not None
+
+
+# ============================================================================
+# CONFIGURATION SYSTEM
+# ============================================================================
+
+# The process umask (os.umask can only be read by setting it)
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def write_text_atomic(path: Path, text: str):
+    """Write a file via a temporary file, fsync and rename, so readers never see a partial file."""
+    write_bytes_atomic(path, text.encode("utf-8"))
+
+
+def write_bytes_atomic(path: Path, data: bytes):
+    """Binary version of write_text_atomic."""
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file 0600; give it the permissions open() would
+        # (os.fchmod is missing on Windows before Python 3.13, where modes don't apply)
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, 0o666 & ~_UMASK)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Extracted config and Human OS fields, reused between runs (see DerivedFileCache)
+DERIVED_CACHE_PATH = Path(__file__).parent.parent / "config" / ".derived-cache.json"
+
+
+class DerivedFileCache:
+    """
+    Fields extracted from text files, kept in a JSON file between runs.
+
+    Entries are keyed by file path and validated against the file's mtime and
+    size, so a file is only read and parsed again after it changes. Only the
+    extracted fields are stored, never the file text.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files = {}
+        self.dirty = False
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION:
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def get(self, path: Path, extract) -> Optional[Dict]:
+        """Return extract(text of path), from the cache while the file is unchanged (None if missing)."""
+        key = str(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            if self.files.pop(key, None) is not None:
+                self.dirty = True
+            return None
+        stamp = [stat.st_mtime_ns, stat.st_size, extract.__name__]
+        cached = self.files.get(key)
+        if cached and cached["stamp"] == stamp:
+            return cached["fields"]
+        fields = extract(path.read_text(encoding="utf-8"))
+        self.files[key] = {"stamp": stamp, "fields": fields}
+        self.dirty = True
+        return fields
+
+    def save(self):
+        """Write the cache if anything changed. A cache that can't be written is skipped."""
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(self.path, json.dumps({"version": self.VERSION, "files": self.files}))
+            self.dirty = False
+        except (OSError, TypeError, ValueError):
+            pass
+
+
+def _parse_config_yaml(text: str) -> Dict:
+    import yaml
+
+    return yaml.safe_load(text) or {}
+
+
+def load_config() -> Dict:
+    """
+    Load configuration with priority: env vars → config.yaml → defaults
+
+    Priority order:
+    1. Environment variables (ARCHIVE_PATH, IMPORT_ROOT, HUMAN_OS_ROOT, etc.)
+    2. config/config.yaml (if exists)
+    3. Hardcoded defaults
+    """
+    config = {
+        "archive": {"path": "~/AI-CHAT-ARCHIVE", "transcripts": "inline", "transcript_compression": "gzip"},
+        "import_sources": {
+            "claude": "~/RAW-AI-CHAT-IMPORT/claude export/conversations.json",
+            "chatgpt": "~/RAW-AI-CHAT-IMPORT/CHAT GPT Archive/conversations.json",
+            "grok": "~/RAW-AI-CHAT-IMPORT/grok/prod-grok-backend.json",
+            "chatgpt_branches": "active"
+        },
+        "human_os": {
+            "enabled": True,
+            "path": "~/Human",
+            "domains": ["brent", "gal", "loopwalker", "pulsekeeper", "shadow-institute", "unlimited-band"]
+        },
+        "domains": {
+            "default": "system",
+            "custom": {
+                "@loopwalker": ["music", "song", "loopwalker", "shadow work", "frequency", "audio", "lyrics", "melody"],
+                "@pulsekeeper": ["heart", "coherence", "adhd", "2e", "frequency", "nervous system", "regulation"],
+                "@shadow-institute": ["dyslexia", "twice-exceptional", "2e", "gifted", "neurodivergent", "learning difference"],
+                "@unlimited-band": ["band", "collaboration", "music group", "bandmate"],
+                "@brent": ["hyperfocus", "dyslexia", "pattern recognition", "brand", "positioning", "website"],
+                "@gal": ["connection", "outreach", "networking", "crm", "warm", "dm", "comment"],
+                "@system": ["sprint", "workflow", "process", "system", "automation", "skill"]
+            }
+        },
+        "anthropic": {
+            "api_key_env": "ANTHROPIC_API_KEY",
+            "model": "claude-3-haiku-20240307",
+            "max_tokens_summary": 200,
+            "max_tokens_outputs": 300,
+            "combined_analysis": True,
+            "long_transcripts": "map_reduce",
+            "token_budget": 20000,
+            "chunk_tokens": 3000,
+            "max_tokens_chunk_notes": 150,
+            "chunk_min_relevance": 1,
+            "cache": True,
+            "cache_path": None,
+            "cache_max_mb": 100,
+            "base_url": None,
+            "concurrency": 4,
+            "requests_per_minute": 50,
+            "tokens_per_minute": 50000,
+            "max_retries": 5,
+            "batch_size": 10000,
+            "batch_poll_seconds": 60
+        },
+        "embeddings": {
+            "enabled": False,
+            "embedder": "hashing",
+            "model": None,
+            "dimensions": 384,
+            "dtype": "float32",
+            "chunk_chars": 2000,
+            "max_chunks": 64,
+            "ivf_min_chunks": 100000,
+            "ivf_probe": 8
+        },
+        "duplicates": {
+            "enabled": False,
+            "action": "flag",
+            "threshold": 0.8,
+            "num_perm": 128,
+            "bands": 16,
+            "shingle_words": 5
+        },
+        "writer": {
+            "threads": 4,
+            "queue_depth": 64
+        }
+    }
+
+    # 1. Try to load from config.yaml (parsed once per change, see DerivedFileCache)
+    config_path = Path(__file__).parent.parent / "config" / "config.yaml"
+    if config_path.exists() and YAML_AVAILABLE:
+        try:
+            cache = DerivedFileCache(DERIVED_CACHE_PATH)
+            user_config = cache.get(config_path, _parse_config_yaml)
+            cache.save()
+            if user_config:
+                # Deep merge user config with defaults
+                for section in user_config:
+                    if section in config and isinstance(config[section], dict):
+                        config[section].update(user_config[section])
+                    else:
+                        config[section] = user_config[section]
+        except Exception as e:
+            print(f"Warning: Error loading config.yaml: {e}")
+
+    # 2. Override with environment variables
+    if os.environ.get("ARCHIVE_PATH"):
+        config["archive"]["path"] = os.environ["ARCHIVE_PATH"]
+    if os.environ.get("IMPORT_ROOT"):
+        import_root = Path(os.environ["IMPORT_ROOT"])
+        config["import_sources"]["claude"] = str(import_root / "claude export/conversations.json")
+        config["import_sources"]["chatgpt"] = str(import_root / "CHAT GPT Archive/conversations.json")
+        config["import_sources"]["grok"] = str(import_root / "grok/prod-grok-backend.json")
+    if os.environ.get("HUMAN_OS_ROOT"):
+        config["human_os"]["path"] = os.environ["HUMAN_OS_ROOT"]
+    if os.environ.get("HUMAN_OS_ENABLED"):
+        config["human_os"]["enabled"] = os.environ["HUMAN_OS_ENABLED"].lower() == "true"
+
+    return config
+
+
+# Month names for folder structure
+MONTH_NAMES = {
+    1: "01-January", 2: "02-February", 3: "03-March", 4: "04-April",
+    5: "05-May", 6: "06-June", 7: "07-July", 8: "08-August",
+    9: "09-September", 10: "10-October", 11: "11-November", 12: "12-December"
+}
+
+# Settings resolved from the configuration on first access
+_LAZY_SETTINGS = ("CONFIG", "ARCHIVE_ROOT", "IMPORT_ROOT", "HUMAN_OS_ROOT", "DOMAIN_KEYWORDS")
+
+
+def resolve_settings(config: Dict) -> Dict:
+    """Paths and keyword tables derived from a loaded configuration."""
+    return {
+        "CONFIG": config,
+        # Expand paths (handle ~)
+        "ARCHIVE_ROOT": Path(config["archive"]["path"]).expanduser(),
+        "IMPORT_ROOT": Path(config["import_sources"]["claude"]).parent.parent,  # Get parent of claude export/
+        "HUMAN_OS_ROOT": Path(config["human_os"]["path"]).expanduser() if config["human_os"]["enabled"] else None,
+        # Domain keywords from config
+        "DOMAIN_KEYWORDS": config["domains"]["custom"],
+    }
+
+
+def __getattr__(name: str):
+    """Load the configuration the first time one of the _LAZY_SETTINGS is used."""
+    if name not in _LAZY_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    config = globals().get("CONFIG") or load_config()
+    for key, value in resolve_settings(config).items():
+        # Values assigned before first use (tests, tools) win
+        globals().setdefault(key, value)
+    return globals()[name]
@@ -0,0 +1,68 @@
+"""Export formats the importer understands (source adapters)."""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from .exports import (EXPORT_MEMBER, iter_conversations, parse_chatgpt_conversation, parse_claude_conversation,
+                      parse_grok_conversation)
+
+
+# ============================================================================
+# SOURCE ADAPTERS
+# ============================================================================
+
+class SourceAdapter:
+    """
+    How to read and parse one kind of export.
+
+    `name` is the --source value, the import_sources key and the manifest
+    key; `label` is shown in progress output. `parse(chat, context)` returns
+    entry data, or None to skip the conversation, and `conversation_id(chat)`
+    the export's stable id for it (None to track it by content). The
+    conversations are streamed from the array under `array_key` (None = a
+    top-level array) of the first of `members` found in an export .zip.
+
+    Adapters are looked up by name in worker processes, so register custom
+    ones at import time of a module the workers also import.
+    """
+
+    def __init__(self, name: str, label: str, parse: Callable[[Dict, Dict], Optional[Dict]],
+                 conversation_id: Callable[[Dict], Optional[str]], array_key: Optional[str] = None,
+                 members: Tuple[str, ...] = (EXPORT_MEMBER,)):
+        self.name = name
+        self.label = label
+        self.parse = parse
+        self.conversation_id = conversation_id
+        self.array_key = array_key
+        self.members = members
+
+    def iter_conversations(self, path: Path, skip: int = 0) -> Iterator[Dict]:
+        """Stream this source's conversations from an export file or .zip."""
+        return iter_conversations(path, skip, self.array_key, self.members)
+
+
+# Registered adapters by name, in --source all order
+SOURCES: Dict[str, SourceAdapter] = {}
+
+
+def register_source(adapter: SourceAdapter):
+    """Add (or replace) a source adapter."""
+    SOURCES[adapter.name] = adapter
+
+
+def _claude_id(chat: Dict) -> Optional[str]:
+    return chat.get("uuid") or chat.get("conversation_id")
+
+
+def _chatgpt_id(chat: Dict) -> Optional[str]:
+    return chat.get("id") or chat.get("conversation_id")
+
+
+def _grok_id(chat: Dict) -> Optional[str]:
+    return chat.get("conversation", chat).get("id")
+
+
+register_source(SourceAdapter("claude", "Claude", parse_claude_conversation, _claude_id))
+register_source(SourceAdapter("chatgpt", "ChatGPT", parse_chatgpt_conversation, _chatgpt_id))
+register_source(SourceAdapter("grok", "Grok", parse_grok_conversation, _grok_id, array_key="conversations",
+                              members=("prod-grok-backend.json", EXPORT_MEMBER)))
@@ -0,0 +1,154 @@
+"""
+Where entry transcripts are stored: inline in the markdown (the default) or,
+with archive.transcripts "sidecar", in a compressed file next to it that is
+only read when the full entry is needed.
+"""
+
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+
+from . import settings
+from .settings import write_bytes_atomic, write_text_atomic
+
+
+# ============================================================================
+# TRANSCRIPT SIDECARS
+# ============================================================================
+
+# Sidecar file suffix per archive.transcript_compression
+SIDECAR_SUFFIXES = {"gzip": ".transcript.gz", "zstd": ".transcript.zst"}
+
+# The start of an entry's transcript: the Transcript heading after Key Outputs
+_TRANSCRIPT_START_RE = re.compile(r'^## Key Outputs\n.*?\n## Transcript\n', re.DOTALL | re.MULTILINE)
+
+# What the Transcript section of an entry holds when its transcript is in a sidecar
+_SIDECAR_LINK_RE = re.compile(r'\n\[Transcript: ([^\]/]+)\]\(\1\)\n\Z')
+
+
+def transcript_compression() -> str:
+    """The configured sidecar compression, falling back to gzip when zstandard is not installed."""
+    compression = settings.CONFIG["archive"].get("transcript_compression", "gzip")
+    if compression == "zstd" and not settings.ZSTD_AVAILABLE:
+        return "gzip"
+    return compression if compression in SIDECAR_SUFFIXES else "gzip"
+
+
+def sidecar_path(filepath: Path, compression: str) -> Path:
+    """The sidecar of the entry at filepath, e.g. 2026-01-16-topic.transcript.gz."""
+    return filepath.with_name(filepath.name[:-len(filepath.suffix)] + SIDECAR_SUFFIXES[compression])
+
+
+def _compress(text: str, compression: str) -> bytes:
+    data = text.encode("utf-8")
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    import gzip
+
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(data: bytes, name: str) -> str:
+    if name.endswith(SIDECAR_SUFFIXES["zstd"]):
+        if not settings.ZSTD_AVAILABLE:
+            raise RuntimeError(f"{name} is zstd-compressed; install zstandard to read it (pip install zstandard)")
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8", errors="replace")
+    import gzip
+
+    return gzip.decompress(data).decode("utf-8", errors="replace")
+
+
+def split_transcript(content: str) -> Optional[Tuple[str, str]]:
+    """
+    Split rendered markdown into (everything up to the Transcript heading, the rest).
+
+    Returns None if the entry has no Transcript section. The two parts
+    concatenated are the original content.
+    """
+    match = _TRANSCRIPT_START_RE.search(content)
+    if not match:
+        return None
+    return content[:match.end()], content[match.end():]
+
+
+def write_entry_files(filepath: Path, content: str, replacing: bool = False, storage: Optional[str] = None):
+    """
+    Write an entry's rendered markdown, storing its transcript as configured.
+
+    `storage` overrides archive.transcripts ("inline" or "sidecar"). With
+    `replacing`, a sidecar left by the entry's previous version in another
+    mode or compression is removed; new files skip those checks.
+    """
+    if storage is None:
+        storage = settings.CONFIG["archive"].get("transcripts", "inline")
+    compression = transcript_compression()
+    parts = split_transcript(content) if storage == "sidecar" else None
+    kept = None
+    if parts is not None:
+        head, transcript = parts
+        sidecar = sidecar_path(filepath, compression)
+        # The sidecar goes first, so a markdown file never links to a missing one
+        write_bytes_atomic(sidecar, _compress(transcript, compression))
+        write_text_atomic(filepath, f"{head}\n[Transcript: {sidecar.name}]({sidecar.name})\n")
+        kept = compression
+    else:
+        write_text_atomic(filepath, content)
+    if replacing:
+        for other in SIDECAR_SUFFIXES:
+            if other != kept:
+                sidecar_path(filepath, other).unlink(missing_ok=True)
+
+
+def remove_entry_files(filepath: Path):
+    """Delete an entry's markdown file and any transcript sidecar."""
+    filepath.unlink(missing_ok=True)
+    for compression in SIDECAR_SUFFIXES:
+        sidecar_path(filepath, compression).unlink(missing_ok=True)
+
+
+def read_archive_entry(filepath: Path, markdown: Optional[str] = None) -> str:
+    """
+    An entry's full markdown, with its transcript read back from its sidecar if it has one.
+
+    `markdown` is the file's content, if it was already read. The result is
+    what the importer rendered, so it can be parsed and indexed the same way
+    whichever way the transcript is stored. A missing sidecar leaves the link.
+    """
+    if markdown is None:
+        markdown = filepath.read_text(encoding="utf-8", errors="replace")
+    match = _SIDECAR_LINK_RE.search(markdown)
+    if not match:
+        return markdown
+    sidecar = filepath.with_name(match.group(1))
+    try:
+        data = sidecar.read_bytes()
+    except FileNotFoundError:
+        return markdown
+    return markdown[:match.start()] + _decompress(data, sidecar.name)
+
+
+def convert_transcripts(archive_root: Path, storage: str) -> int:
+    """
+    Rewrite every archive entry whose transcript is not stored as `storage`. Returns the number rewritten.
+
+    The full content of each entry stays the same, so the indexes need no
+    update.
+    """
+    from .search import iter_archive_files
+
+    compression = transcript_compression()
+    count = 0
+    for filepath in iter_archive_files(archive_root):
+        markdown = filepath.read_text(encoding="utf-8", errors="replace")
+        match = _SIDECAR_LINK_RE.search(markdown)
+        if storage == "inline" and not match:
+            continue
+        if storage == "sidecar" and match and match.group(1) == sidecar_path(filepath, compression).name:
+            continue
+        write_entry_files(filepath, read_archive_entry(filepath, markdown), replacing=True, storage=storage)
+        count += 1
+    return count
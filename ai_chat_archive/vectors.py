@@ -0,0 +1,349 @@
+"""
+Local embedding index for semantic search over archive entries.
+
+Needs numpy; only imported when embeddings are enabled or --semantic is used.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import settings
+from .search import iter_archive_files, parse_archive_entry
+from .transcripts import read_archive_entry
+
+
+# ============================================================================
+# VECTOR INDEX
+# ============================================================================
+
+# Chunks embedded per batch while importing
+EMBED_BATCH_SIZE = 64
+# Matrix rows scored per block, to bound the float32 working set on int8 indexes
+SCORE_BLOCK_ROWS = 65536
+
+
+class HashingEmbedder:
+    """
+    Dependency-free local embedder: signed feature hashing of words, word
+    bigrams and character trigrams, log-scaled and L2-normalised.
+
+    It is lexical rather than truly semantic, but trigrams let word variants
+    ("positioning", "position") match, and it needs no model or network. Use
+    the sentence-transformers embedder for real semantic similarity.
+    """
+
+    def __init__(self, dimensions: int = 384):
+        self.dim = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        import zlib
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = re.findall(r'\w+', text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            features += [f"#{word[j:j + 3]}" for word in words if len(word) > 3 for j in range(len(word) - 2)]
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(f.encode('utf-8')) for f in features), dtype=np.uint32,
+                                 count=len(features))
+            signs = np.where(hashes >> 31, -1.0, 1.0)
+            vectors[i] = np.bincount(hashes % self.dim, weights=signs, minlength=self.dim)
+
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model on CPU (embeddings.model is a model name or path)."""
+
+    def __init__(self, model: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{model}"
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        vectors = self.model.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+
+def get_embedder(config: Dict):
+    """
+    Create the embedder named by embeddings.embedder.
+
+    "hashing" (default) and "sentence-transformers" are built in. Anything else
+    is read as "module:factory"; factory(config) must return an object with
+    name, dim and embed(texts) -> float32 array of unit-length rows.
+    """
+    embedder = config.get("embedder", "hashing")
+    if embedder == "hashing":
+        return HashingEmbedder(config.get("dimensions", 384))
+    if embedder == "sentence-transformers":
+        return SentenceTransformerEmbedder(config.get("model") or "all-MiniLM-L6-v2")
+
+    import importlib
+
+    module_name, _, factory = embedder.partition(":")
+    if not factory:
+        raise ValueError(f"unknown embedder {embedder!r} (expected hashing, sentence-transformers or module:factory)")
+    return getattr(importlib.import_module(module_name), factory)(config)
+
+
+def chunk_transcript(transcript: str, chunk_chars: int) -> List[str]:
+    """Split a transcript into chunks of up to chunk_chars, on paragraph (message) boundaries where possible."""
+    chunks = []
+    current = ""
+    for paragraph in transcript.split("\n\n"):
+        while len(paragraph) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:chunk_chars])
+            paragraph = paragraph[chunk_chars:]
+        if current and len(current) + len(paragraph) + 2 > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+class VectorIndex:
+    """
+    Embeddings of archive entry chunks, stored in ARCHIVE_ROOT/.vectors/.
+
+    vectors.bin is a row-major float32 (or int8) matrix that new rows are
+    appended to and that queries memory-map; chunks.sqlite maps each row to
+    its entry path. Re-imported entries mark their old rows deleted instead of
+    rewriting the matrix. Past ivf_min_chunks rows, queries only score the
+    rows in the IVF lists whose centroids are closest to the query.
+    """
+
+    def __init__(self, directory: Path, embedder, config: Optional[Dict] = None):
+        import sqlite3
+
+        config = config or {}
+        self.directory = directory
+        self.embedder = embedder
+        self.dtype = np.dtype(config.get("dtype", "float32"))
+        if self.dtype not in (np.dtype("float32"), np.dtype("int8")):
+            raise ValueError(f"embeddings.dtype must be float32 or int8, not {self.dtype}")
+        self.chunk_chars = config.get("chunk_chars", 2000)
+        self.max_chunks = config.get("max_chunks", 64)
+        self.ivf_min_chunks = config.get("ivf_min_chunks", 100000)
+        self.ivf_probe = config.get("ivf_probe", 8)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = directory / "vectors.bin"
+        self.ivf_path = directory / "ivf.npy"
+        self.lists_path = directory / "ivf-lists.bin"
+        self.db = sqlite3.connect(str(directory / "chunks.sqlite"), timeout=30)
+        self.db.execute("CREATE TABLE IF NOT EXISTS chunks "
+                        "(row INTEGER PRIMARY KEY, path TEXT NOT NULL, kind TEXT, chunk INTEGER, "
+                        "deleted INTEGER NOT NULL DEFAULT 0)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS chunks_path ON chunks (path)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        layout = {"embedder": embedder.name, "dim": str(embedder.dim), "dtype": self.dtype.name}
+        stored = dict(self.db.execute("SELECT key, value FROM meta"))
+        for key, value in layout.items():
+            if key in stored and stored[key] != value:
+                raise ValueError(f"vector index at {directory} was built with {key}={stored[key]}, not {value}; "
+                                 "rebuild it with archive-search.py --rebuild-vectors")
+        self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", layout.items())
+        self.db.commit()
+
+        # chunks.sqlite is authoritative: drop matrix rows from an append that never committed
+        self.rows = self.db.execute("SELECT coalesce(max(row) + 1, 0) FROM chunks").fetchone()[0]
+        self._truncate(self.vectors_path, self.rows * self.row_bytes)
+        if self.lists_path.exists():
+            self._truncate(self.lists_path, self.rows * 4)
+        self._pending = []
+
+    @property
+    def row_bytes(self) -> int:
+        return self.embedder.dim * self.dtype.itemsize
+
+    @staticmethod
+    def _truncate(path: Path, size: int):
+        if not path.exists():
+            path.touch()
+        if path.stat().st_size != size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+
+    def entry_chunks(self, content: str) -> List[Tuple[str, int, str]]:
+        """(kind, chunk number, text) for the title, summary and transcript chunks of an entry."""
+        entry = parse_archive_entry(content)
+        chunks = [("title", 0, entry["title"]),
+                  ("summary", 0, f"{entry['summary']}\n{entry['key_outputs']}")]
+        transcript_chunks = chunk_transcript(entry["transcript"], self.chunk_chars)
+        if len(transcript_chunks) > self.max_chunks:
+            # Evenly spaced, so the end of a long conversation is represented too
+            step = len(transcript_chunks) / self.max_chunks
+            transcript_chunks = [transcript_chunks[int(i * step)] for i in range(self.max_chunks)]
+        chunks += [("transcript", i, text) for i, text in enumerate(transcript_chunks)]
+        return [chunk for chunk in chunks if chunk[2].strip()]
+
+    def add(self, path: str, content: str):
+        """Queue the chunks of the entry at path for embedding, replacing any earlier version."""
+        self.remove(path)
+        self._pending += [(path, kind, number, text) for kind, number, text in self.entry_chunks(content)]
+        if len(self._pending) >= EMBED_BATCH_SIZE:
+            self.flush()
+
+    def remove(self, path: str):
+        """Mark the rows of the entry at path deleted."""
+        self._pending = [item for item in self._pending if item[0] != path]
+        self.db.execute("UPDATE chunks SET deleted = 1 WHERE path = ?", (path,))
+
+    def flush(self):
+        """Embed queued chunks and append them to the matrix."""
+        if not self._pending:
+            self.db.commit()
+            return
+        pending, self._pending = self._pending, []
+        vectors = self.embedder.embed([text for _, _, _, text in pending])
+        if self.dtype == np.int8:
+            vectors = np.clip(np.rint(vectors * 127), -127, 127)
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+
+        centroids = self._centroids()
+        if centroids is not None:
+            with open(self.lists_path, "ab") as f:
+                f.write(self._assign(vectors, centroids).tobytes())
+
+        first = self.rows
+        self.db.executemany("INSERT INTO chunks (row, path, kind, chunk) VALUES (?, ?, ?, ?)",
+                            [(first + i, path, kind, number) for i, (path, kind, number, _) in enumerate(pending)])
+        self.db.commit()
+        self.rows += len(pending)
+
+    def _matrix(self) -> "np.ndarray":
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self.rows, self.embedder.dim))
+
+    def _centroids(self) -> Optional["np.ndarray"]:
+        return np.load(self.ivf_path) if self.ivf_path.exists() else None
+
+    @staticmethod
+    def _assign(vectors: "np.ndarray", centroids: "np.ndarray") -> "np.ndarray":
+        return np.argmax(np.asarray(vectors, dtype=np.float32) @ centroids.T, axis=1).astype(np.int32)
+
+    def train_ivf(self, iterations: int = 10) -> int:
+        """Cluster the matrix into ~sqrt(rows) IVF lists (spherical k-means). Returns the list count."""
+        self.flush()
+        matrix = self._matrix()
+        lists = max(1, int(self.rows ** 0.5))
+        rng = np.random.default_rng(0)
+        sample = np.asarray(matrix[np.sort(rng.choice(self.rows, min(self.rows, lists * 64), replace=False))],
+                            dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), lists, replace=False)]
+        for _ in range(iterations):
+            assignment = self._assign(sample, centroids)
+            for i in range(lists):
+                members = sample[assignment == i]
+                if len(members):
+                    centroids[i] = members.sum(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        with open(self.lists_path, "wb") as f:
+            for start in range(0, self.rows, SCORE_BLOCK_ROWS):
+                f.write(self._assign(matrix[start:start + SCORE_BLOCK_ROWS], centroids).tobytes())
+        np.save(self.ivf_path, centroids)
+        return lists
+
+    def search(self, query: str, limit: int = 10, paths: Optional[List[str]] = None) -> List[Dict]:
+        """Return the entries with the most similar chunks, best first, with the best chunk for each."""
+        self.flush()
+        if self.rows == 0:
+            return []
+        if self.rows >= self.ivf_min_chunks and not self.ivf_path.exists():
+            self.train_ivf()
+
+        query_vector = self.embedder.embed([query])[0].astype(np.float32)
+        matrix = self._matrix()
+        candidates = None
+        centroids = self._centroids()
+        if centroids is not None and self.rows >= self.ivf_min_chunks:
+            probe = np.argsort(centroids @ query_vector)[-self.ivf_probe:]
+            lists = np.memmap(self.lists_path, dtype=np.int32, mode="r", shape=(self.rows,))
+            candidates = np.flatnonzero(np.isin(lists, probe))
+        if paths is not None:
+            allowed = np.fromiter((row for (row,) in self.db.execute(
+                "SELECT row FROM chunks WHERE path IN (SELECT value FROM json_each(?))", (json.dumps(list(paths)),))),
+                dtype=np.int64)
+            candidates = allowed if candidates is None else np.intersect1d(candidates, allowed)
+
+        if candidates is None:
+            scores = np.concatenate([np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32) @ query_vector
+                                     for start in range(0, self.rows, SCORE_BLOCK_ROWS)])
+            rows = np.arange(self.rows)
+        else:
+            rows = np.sort(candidates)
+            scores = np.asarray(matrix[rows], dtype=np.float32) @ query_vector if len(rows) else np.zeros(0)
+        if self.dtype == np.int8:
+            scores = scores / 127
+
+        deleted = np.fromiter((row for (row,) in self.db.execute("SELECT row FROM chunks WHERE deleted = 1")),
+                              dtype=np.int64)
+        scores[np.isin(rows, deleted)] = -np.inf
+
+        # Best chunks first; several may belong to one entry, so take more than limit
+        top = min(len(rows), limit * 20)
+        best = np.argpartition(-scores, top - 1)[:top] if top else np.zeros(0, dtype=np.int64)
+        best = best[np.argsort(-scores[best])]
+
+        results = {}
+        for i in best:
+            if not np.isfinite(scores[i]):
+                break
+            path, kind, chunk = self.db.execute("SELECT path, kind, chunk FROM chunks WHERE row = ?",
+                                                (int(rows[i]),)).fetchone()
+            if path not in results:
+                results[path] = {"path": path, "score": float(scores[i]), "kind": kind, "chunk": chunk}
+                if len(results) >= limit:
+                    break
+        return list(results.values())
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT count(DISTINCT path) FROM chunks WHERE deleted = 0").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def get_vector_index_path() -> Path:
+    """Location of the archive's embedding index."""
+    return settings.ARCHIVE_ROOT / ".vectors"
+
+
+def open_vector_index(reset: bool = False) -> VectorIndex:
+    """Open the archive's vector index with the configured embedder (reset = start empty)."""
+    import shutil
+
+    directory = get_vector_index_path()
+    if reset and directory.exists():
+        shutil.rmtree(directory)
+    config = settings.CONFIG["embeddings"]
+    return VectorIndex(directory, get_embedder(config), config)
+
+
+def rebuild_vector_index(archive_root: Path, index: VectorIndex) -> int:
+    """Embed every markdown entry already in the archive. Returns the number of entries."""
+    count = 0
+    for filepath in iter_archive_files(archive_root):
+        index.add(str(filepath.relative_to(archive_root)), read_archive_entry(filepath))
+        count += 1
+    index.flush()
+    return count
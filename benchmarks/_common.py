@@ -0,0 +1,46 @@
+"""Shared helpers for benchmark scripts."""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def load_importer():
+    """The ai_chat_archive package (settings are changed on ``load_importer().settings``)."""
+    import ai_chat_archive
+
+    return ai_chat_archive
+
+
+WORDS = ("song lyrics brand positioning workflow sprint python code audio melody "
+         "decided will plan finalized heart coherence dyslexia website outreach").split()
+
+
+def write_synthetic_export(path: Path, size_mb: int) -> int:
+    """Write a Claude-format conversations.json of roughly size_mb megabytes."""
+    target = size_mb * 1024 * 1024
+    rng = random.Random(42)
+    written = 0
+    count = 0
+    with open(path, 'w') as f:
+        f.write("[")
+        while written < target:
+            messages = []
+            for m in range(rng.randint(4, 40)):
+                text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 400)))
+                messages.append({"sender": "human" if m % 2 == 0 else "assistant", "text": text})
+            chat = {
+                "uuid": f"conv-{count}",
+                "name": f"Synthetic conversation {count}",
+                "created_at": "2025-06-01T12:00:00Z",
+                "chat_messages": messages,
+            }
+            blob = ("," if count else "") + json.dumps(chat)
+            f.write(blob)
+            written += len(blob)
+            count += 1
+        f.write("]")
+    return count
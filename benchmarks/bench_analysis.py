@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Time and peak memory of the rule-based analysis for one large transcript,
+with and without a shared ConversationAnalysis.
+
+Usage:
+    python3 benchmarks/bench_analysis.py --transcript-mb 1 4 16
+
+"independent" calls each analysis function on its own, the way the importer
+did before ConversationAnalysis (every call lowercases, scans or splits the
+transcript again). "shared" passes one analysis object to all of them.
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+
+def make_transcript(size_mb: float) -> str:
+    rng = random.Random(3)
+    prose = ("the and for with that this from have were about into over then when would could "
+             "should there their which because through between answer question example").split()
+    parts = []
+    size = 0
+    turn = 0
+    while size < size_mb * 1024 * 1024:
+        speaker = "Human" if turn % 2 == 0 else "Assistant"
+        lines = [" ".join(rng.choice(WORDS) if rng.random() < 0.05 else rng.choice(prose)
+                          for _ in range(rng.randint(5, 25))) for _ in range(rng.randint(1, 8))]
+        part = f"**{speaker}:** " + "\n".join(lines)
+        parts.append(part)
+        size += len(part) + 2
+        turn += 1
+    return "\n\n".join(parts)
+
+
+def independent(importer, title, transcript, context):
+    domain = importer.detect_domain(transcript, title)
+    tags = importer.generate_tags(transcript, title, context)
+    summary = importer.generate_summary(title, transcript, domain)
+    outputs = importer.extract_key_outputs(transcript)
+    return domain, tags, summary, outputs
+
+
+def shared(importer, title, transcript, context):
+    analysis = importer.ConversationAnalysis(title, transcript)
+    domain = importer.detect_domain(transcript, title, analysis)
+    tags = importer.generate_tags(transcript, title, context, analysis)
+    summary = importer.generate_summary(title, transcript, domain)
+    outputs = importer.extract_key_outputs(transcript)
+    return domain, tags, summary, outputs
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transcript-mb", type=float, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    importer = load_importer()
+    context = {"sprint": {}, "domains": {}}
+
+    for size_mb in args.transcript_mb:
+        transcript = make_transcript(size_mb)
+        results = {}
+        line = f"  {size_mb:5.1f} MB transcript:"
+        for name, fn in (("independent", independent), ("shared", shared)):
+            results[name], elapsed, peak = measure(fn, importer, "Benchmark", transcript, context)
+            line += f"  {name} {elapsed * 1000:7.1f} ms, peak +{peak / 1024 / 1024:6.1f} MB"
+        same = "same result" if results["independent"] == results["shared"] else "RESULTS DIFFER"
+        print(f"{line}  ({same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Backfill cost and round trips: --claude-api (one request per prompt) vs. --claude-batch.
+
+Usage:
+    python3 benchmarks/bench_batches.py --conversations 500 --latency 0.5
+
+Imports a synthetic export twice against in-process stubs (no API key
+needed), reporting ~4 characters per input token: once with synchronous
+Messages calls that each take --latency seconds (anthropic.concurrency at a
+time), and once through the Message Batches queue, whose stub batches end
+on their first poll. Reports HTTP round trips, billed tokens (batches are
+billed at 50%) and local wall time. Real batches take minutes to hours to
+end; the wall time here is only what the importer itself spends.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+def reply_for(prompt: str) -> str:
+    return "SUMMARY:\nStub summary.\n\nKEY OUTPUTS:\n- First" if "SUMMARY:" in prompt else "- Stub notes"
+
+
+def message(prompt: str, max_tokens: int) -> Namespace:
+    text = reply_for(prompt)
+    usage = Namespace(input_tokens=len(prompt) // 4, output_tokens=min(max_tokens, len(text) // 4))
+    return Namespace(content=[Namespace(text=text)], usage=usage)
+
+
+class StubMessages:
+    """messages.create with a fixed latency, plus in-process Message Batches endpoints."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+        self.batches = {}
+        self.batches_api = Namespace(create=self.create_batch, retrieve=self.retrieve_batch, results=self.results)
+
+    def create(self, **request):
+        self.round_trips += 1
+        time.sleep(self.latency)
+        return message(request["messages"][0]["content"], request["max_tokens"])
+
+    def create_batch(self, requests):
+        self.round_trips += 1
+        batch_id = f"msgbatch_{len(self.batches)}"
+        self.batches[batch_id] = requests
+        return Namespace(id=batch_id)
+
+    def retrieve_batch(self, batch_id):
+        self.round_trips += 1
+        return Namespace(processing_status="ended")
+
+    def results(self, batch_id):
+        self.round_trips += 1
+        for request in self.batches[batch_id]:
+            params = request["params"]
+            yield Namespace(custom_id=request["custom_id"], result=Namespace(
+                type="succeeded", message=message(params["messages"][0]["content"], params["max_tokens"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per synchronous request")
+    args = parser.parse_args()
+
+    importer = load_importer()
+    importer.settings.ANTHROPIC_AVAILABLE = True
+    options = importer.CONFIG["anthropic"]
+    options.update(cache=False, requests_per_minute=0, tokens_per_minute=0)
+    context = {"sprint": {}, "domains": {}}
+    importer.CONFIG["duplicates"]["enabled"] = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "conversations.json"
+        write_synthetic_export(export, args.conversations * 48 // 1024 + 1)
+
+        for mode in ("--claude-api", "--claude-batch"):
+            stub = StubMessages(args.latency)
+            scheduler = importer.ClaudeScheduler(Namespace(messages=stub), concurrency=options["concurrency"])
+            importer.claude_api.get_claude_scheduler = lambda api_key: scheduler
+            importer.settings.ARCHIVE_ROOT = Path(tmp) / mode.strip("-")
+            chats = importer.islice(importer.iter_conversations(export), args.conversations)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if mode == "--claude-api":
+                    stats = importer.import_conversations("claude", chats, context,
+                                                          Namespace(sample=False, workers=1), True, "stub-key")
+                    billed = stats["input_tokens"] + stats["output_tokens"]
+                else:
+                    queue = importer.batches.BatchQueue(importer.settings.ARCHIVE_ROOT)
+                    stats = importer.import_conversations("claude", chats, context,
+                                                          Namespace(sample=False, workers=1), batch_queue=queue)
+                    client = Namespace(messages=Namespace(batches=stub.batches_api))
+                    importer.batches.run_batches(queue, client, poll_seconds=0)
+                    stats.update(queue.stats)
+                    queue.close()
+                    billed = (stats["input_tokens"] + stats["output_tokens"]) / 2
+            elapsed = time.perf_counter() - start
+            print(f"  {mode:14} {stats['imported']:>5} chats  {stub.round_trips:>6} round trips  "
+                  f"{billed / max(1, stats['imported']):8.0f} billed tokens/chat  {elapsed:7.2f}s local wall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Domain/month/tag filtering: catalog lookups vs. grepping frontmatter, and catalog rebuild time.
+
+Usage:
+    python3 benchmarks/bench_catalog.py --entries 50000 --workers 1 4
+
+Uses the same synthetic archive as bench_search.py, with domains and tags
+varied so filters select a fraction of the entries.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer  # noqa: E402
+from bench_search import build_archive  # noqa: E402
+
+DOMAINS = ["@loopwalker", "@brent", "@gal", "@system", "@pulsekeeper"]
+TAGS = ["music", "code", "website", "positioning", "2e"]
+
+
+def scan(root: Path, domain: str, month: str, tag: str):
+    """Entries whose frontmatter matches, read file by file (what the archive-query skill did)."""
+    matches = []
+    for path in root.glob("*/*/*.md"):
+        head = path.read_text().split("\n---", 1)[0]
+        if f'"{domain}"' in head and f"date: {month}" in head and f'"{tag}"' in head:
+            matches.append(path)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    importer = load_importer()
+    rng = random.Random(13)
+    render = importer.render_archive_entry
+
+    def varied_render(data, *rest):
+        data["domain"] = rng.choice(DOMAINS)
+        data["tags"] = rng.sample(TAGS, 2)
+        return render(data, *rest)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        importer.settings.ARCHIVE_ROOT = root
+        importer.render_archive_entry = varied_render
+        build_archive(importer, root, args.entries)
+
+        catalog = importer.ArchiveCatalog(root / ".catalog.sqlite")
+        for workers in args.workers:
+            start = time.perf_counter()
+            count = importer.rebuild_catalog(root, catalog, workers)
+            print(f"  rebuild-catalog, {workers} worker(s): {count} entries in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        entries = catalog.query(domains=["@loopwalker"], month="2024-12", tags=["music"])
+        lookup_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        matches = scan(root, "@loopwalker", "2024-12", "music")
+        scan_ms = (time.perf_counter() - start) * 1000
+        print(f"  @loopwalker 2024-12 #music: catalog {lookup_ms:.1f} ms ({len(entries)} entries), "
+              f"frontmatter scan {scan_ms:.0f} ms ({len(matches)} files)")
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
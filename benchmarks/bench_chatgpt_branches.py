@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+ChatGPT transcripts for heavily regenerated conversations: mapping order vs. tree traversal.
+
+Usage:
+    python3 benchmarks/bench_chatgpt_branches.py --turns 500 --regenerations 3
+
+Each user turn gets several assistant replies (regenerations); the last one is
+continued. "mapping order" is how the importer read the mapping before it
+followed parent/children links: every regeneration ends up in the transcript,
+interleaved in whatever order the export lists them.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+
+def make_mapping(turns: int, regenerations: int):
+    rng = random.Random(5)
+
+    def text(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    def node(role, parent):
+        return {"message": {"author": {"role": role},
+                            "content": {"content_type": "text", "parts": [text(40 if role == "user" else 200)]}},
+                "parent": parent, "children": []}
+
+    mapping = {"root": {"message": None, "parent": None, "children": []}}
+    parent = "root"
+    for turn in range(turns):
+        question = f"q{turn}"
+        mapping[question] = node("user", parent)
+        mapping[parent]["children"].append(question)
+        for regen in range(regenerations):
+            answer = f"a{turn}-{regen}"
+            mapping[answer] = node("assistant", question)
+            mapping[question]["children"].append(answer)
+        parent = answer
+
+    # Exports do not list nodes in conversation order
+    items = list(mapping.items())
+    rng.shuffle(items)
+    return dict(items), parent
+
+
+def mapping_order_parts(mapping):
+    """Transcript parts the way the importer built them before following the tree."""
+    parts = []
+    for node in mapping.values():
+        message = node.get("message")
+        if message and message["content"].get("content_type") == "text":
+            role = message["author"].get("role", "unknown")
+            parts.extend(f"**{role.title()}:** {part}" for part in message["content"]["parts"]
+                         if isinstance(part, str) and part.strip())
+    return parts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--regenerations", type=int, default=3)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    mapping, current_node = make_mapping(args.turns, args.regenerations)
+    print(f"  {len(mapping)} nodes, {args.turns} turns x {args.regenerations} replies")
+
+    runs = (
+        ("mapping order", lambda: mapping_order_parts(mapping)),
+        ("active branch", lambda: importer.chatgpt_transcript_parts(mapping, current_node)),
+        ("all branches", lambda: importer.chatgpt_transcript_parts(mapping, current_node, all_branches=True)),
+    )
+    for name, fn in runs:
+        start = time.perf_counter()
+        transcript = "\n\n".join(fn())
+        elapsed = time.perf_counter() - start
+        print(f"  {name:14}: {len(transcript) / 1024:8.1f} KB transcript, ~{len(transcript) // 4:7} tokens, "
+              f"{elapsed * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
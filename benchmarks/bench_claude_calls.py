@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+API requests, input tokens and wall time: separate vs. combined Claude analysis.
+
+Usage:
+    python3 benchmarks/bench_claude_calls.py --conversations 200 --latency 0.5
+
+Runs the real scheduler and prompts against a stub client that simulates a
+fixed response latency and reports ~4 characters per input token, so no API
+key is needed. For real numbers, run an import with --claude-api: the final
+report prints requests, tokens and API time per conversation.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+class StubMessages:
+    """messages.create stand-in returning a combined-format reply."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, **request):
+        time.sleep(self.latency)
+        chars = sum(len(m["content"]) for m in request["messages"])
+        text = "SUMMARY:\nStub summary.\n\nKEY OUTPUTS:\n- First\n- Second"
+        usage = Namespace(input_tokens=chars // 4, output_tokens=len(text) // 4)
+        return Namespace(content=[Namespace(text=text)], usage=usage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=200, help="Conversations to import")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per request")
+    args = parser.parse_args()
+
+    importer = load_importer()
+    importer.settings.ANTHROPIC_AVAILABLE = True
+    settings = importer.CONFIG["anthropic"]
+    settings.update(requests_per_minute=0, tokens_per_minute=0)
+    scheduler = importer.ClaudeScheduler(
+        Namespace(messages=StubMessages(args.latency)), concurrency=settings["concurrency"])
+    importer.claude_api.get_claude_scheduler = lambda api_key: scheduler
+    context = {"sprint": {}, "domains": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "conversations.json"
+        # Synthetic conversations average ~34 KB; write enough for the requested count
+        write_synthetic_export(export, args.conversations * 48 // 1024 + 1)
+
+        for combined in (False, True):
+            settings["combined_analysis"] = combined
+            importer.settings.ARCHIVE_ROOT = Path(tmp) / f"archive-{combined}"
+            chats = importer.islice(importer.iter_conversations(export), args.conversations)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = importer.import_conversations(
+                    "claude", chats, context, Namespace(sample=False, workers=1), True, "stub-key")
+            elapsed = time.perf_counter() - start
+
+            label = "combined" if combined else "separate"
+            per_chat = max(1, stats["imported"])
+            print(f"  {label:<9} {stats['imported']:>5} chats  {stats['api_requests']:>6} requests  "
+                  f"{stats['input_tokens'] / per_chat:8.0f} input tokens/chat  "
+                  f"{elapsed:7.2f}s wall  ({elapsed / per_chat * 1000:.0f} ms/chat)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Human OS context loading: parsing every document vs. the derived-context cache.
+
+Usage:
+    python3 benchmarks/bench_context.py --domains 30 --index-mb 2
+
+Writes a synthetic Human OS tree (Sprint.md plus one large @domain-INDEX.md
+per domain) and times load_context() with an empty cache, with a warm cache,
+and after one index file changed. Also reports the size of the loaded context.
+"""
+
+import argparse
+import pickle
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+
+def write_tree(root: Path, domains: int, index_mb: float, rng: random.Random):
+    (root / "SYSTEM/00-Index").mkdir(parents=True)
+    (root / "SYSTEM/00-Index/Sprint.md").write_text("# Sprint\n\n**Flagship:** Brand Positioning\n")
+    for d in range(domains):
+        rows = [f"| **Project {d}-{i}** | active |" for i in range(20)]
+        filler = []
+        size = 0
+        while size < index_mb * 1024 * 1024:
+            line = " ".join(rng.choice(WORDS) for _ in range(20))
+            filler.append(line)
+            size += len(line) + 1
+        (root / f"@domain{d}-INDEX.md").write_text(
+            f"# @domain{d}\n\n## NOW\n" + "\n".join(rows) + "\n\n## LOG\n" + "\n".join(filler) + "\n")
+
+
+def timed(importer):
+    start = time.perf_counter()
+    context = importer.load_context()
+    return context, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--domains", type=int, default=30)
+    parser.add_argument("--index-mb", type=float, default=2)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "Human"
+        write_tree(root, args.domains, args.index_mb, random.Random(3))
+        importer.settings.HUMAN_OS_ROOT = root
+        importer.settings.DERIVED_CACHE_PATH = Path(tmp) / "cache.json"
+        importer.CONFIG["human_os"] = {"enabled": True, "domains": [f"domain{d}" for d in range(args.domains)]}
+
+        context, cold_ms = timed(importer)
+        _, warm_ms = timed(importer)
+        changed = root / "@domain0-INDEX.md"
+        changed.write_text(changed.read_text() + "one more line\n")
+        _, one_changed_ms = timed(importer)
+
+        # What the old loader kept resident: every document's text
+        raw_mb = sum(path.stat().st_size for path in root.rglob("*.md")) / 1024 / 1024
+        print(f"  {args.domains} domains x {args.index_mb} MB: cold {cold_ms:.0f} ms, warm {warm_ms:.1f} ms, "
+              f"one file changed {one_changed_ms:.1f} ms")
+        print(f"  context size: {len(pickle.dumps(context)) / 1024:.1f} KB (raw documents: {raw_mb:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
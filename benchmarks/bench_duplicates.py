@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection: LSH lookups vs. comparing every signature, and cluster report time.
+
+Usage:
+    python3 benchmarks/bench_duplicates.py --entries 20000 --duplicates 200
+
+Signs synthetic transcripts (a share of them light edits of earlier ones),
+then times finding the near-duplicates of new transcripts through the LSH
+bands against comparing with every stored signature, and the archive-wide
+cluster report.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+
+def transcripts(count: int, duplicates: int, rng: random.Random):
+    vocabulary = WORDS + [f"w{i}" for i in range(5000)]
+    texts = []
+    for i in range(count):
+        if i >= duplicates and rng.random() < duplicates / count:
+            # Light edit of an earlier transcript: a few words changed
+            words = rng.choice(texts).split()
+            for _ in range(len(words) // 40):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            texts.append(" ".join(words))
+        else:
+            texts.append(" ".join(rng.choice(vocabulary) for _ in range(rng.randint(100, 600))))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--duplicates", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    rng = random.Random(5)
+    texts = transcripts(args.entries, args.duplicates, rng)
+
+    numpy_available = importer.NUMPY_AVAILABLE
+    for numpy in (True, False):
+        if numpy and not numpy_available:
+            continue
+        importer.settings.NUMPY_AVAILABLE = numpy
+        start = time.perf_counter()
+        for text in texts[:500]:
+            importer.minhash_signature(text)
+        print(f"  signature ({'numpy' if numpy else 'pure Python'}): "
+              f"{(time.perf_counter() - start) / 500 * 1000:.2f} ms per transcript")
+    importer.settings.NUMPY_AVAILABLE = numpy_available
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = importer.DuplicateIndex(Path(tmp) / "duplicates.sqlite")
+        start = time.perf_counter()
+        signatures = [index.signature(text) for text in texts]
+        for i, signature in enumerate(signatures):
+            index.add(f"entry-{i}.md", signature)
+        index.commit()
+        print(f"  signed and indexed {args.entries} entries in {time.perf_counter() - start:.1f}s")
+
+        queries = [index.signature(text + " thanks") for text in rng.sample(texts, args.queries)]
+        start = time.perf_counter()
+        found = [index.find(signature) for signature in queries]
+        lsh_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        start = time.perf_counter()
+        for signature in queries[:20]:
+            [i for i, other in enumerate(signatures)
+             if importer.signature_similarity(signature, other) >= index.threshold]
+        scan_ms = (time.perf_counter() - start) / 20 * 1000
+        print(f"  lookup per new conversation: LSH {lsh_ms:.2f} ms "
+              f"({sum(map(bool, found))}/{len(queries)} found their source), all pairs {scan_ms:.0f} ms")
+
+        start = time.perf_counter()
+        clusters = index.clusters()
+        print(f"  cluster report: {len(clusters)} clusters, {sum(map(len, clusters))} entries "
+              f"in {time.perf_counter() - start:.2f}s")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
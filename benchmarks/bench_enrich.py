@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Time to a searchable archive: --claude-api (summaries inline) vs. --enrich-later plus bin/enrich-archive.py.
+
+Usage:
+    python3 benchmarks/bench_enrich.py --conversations 200 --latency 0.5
+
+Imports a synthetic export against an in-process stub client (no API key
+needed) whose requests each take --latency seconds. With --claude-api every
+entry waits for its summary before it is written; with --enrich-later every
+entry is written and indexed with its rule-based summary first, then
+enrich_archive upgrades them in place. Reports when the whole archive was
+searchable, when every entry had a Claude summary, and the requests made.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+class StubMessages:
+    """messages.create with a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+
+    def create(self, **request):
+        self.requests += 1
+        time.sleep(self.latency)
+        text = "SUMMARY:\nStub summary.\n\nKEY OUTPUTS:\n- First"
+        usage = Namespace(input_tokens=len(request["messages"][0]["content"]) // 4, output_tokens=len(text) // 4)
+        return Namespace(content=[Namespace(text=text)], usage=usage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per request")
+    args = parser.parse_args()
+
+    importer = load_importer()
+    importer.settings.ANTHROPIC_AVAILABLE = True
+    options = importer.CONFIG["anthropic"]
+    options.update(cache=False, requests_per_minute=0, tokens_per_minute=0, long_transcripts="truncate")
+    importer.CONFIG["duplicates"]["enabled"] = False
+    context = {"sprint": {}, "domains": {}}
+    print(f"  {args.conversations} conversations, {args.latency:g}s per request, "
+          f"anthropic.concurrency={options['concurrency']}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "conversations.json"
+        write_synthetic_export(export, args.conversations * 48 // 1024 + 1)
+
+        for mode in ("--claude-api", "--enrich-later"):
+            stub = StubMessages(args.latency)
+            scheduler = importer.ClaudeScheduler(Namespace(messages=stub), concurrency=options["concurrency"])
+            importer.claude_api.get_claude_scheduler = lambda api_key: scheduler
+            root = Path(tmp) / mode.strip("-")
+            importer.settings.ARCHIVE_ROOT = root
+            root.mkdir()
+            index = importer.SearchIndex(root / ".search-index.sqlite")
+            chats = importer.islice(importer.iter_conversations(export), args.conversations)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if mode == "--claude-api":
+                    importer.import_conversations("claude", chats, context, Namespace(sample=False, workers=1),
+                                                  True, "stub-key", search_index=index)
+                    searchable = summarized = time.perf_counter() - start
+                else:
+                    importer.import_conversations("claude", chats, context,
+                                                  Namespace(sample=False, workers=1, enrich_later=True),
+                                                  search_index=index)
+                    searchable = time.perf_counter() - start
+                    importer.enrich.enrich_archive(root, "stub-key", index.add)
+                    summarized = time.perf_counter() - start
+            pending = sum(1 for _ in importer.enrich.iter_pending_entries(root))
+            print(f"  {mode:14} searchable after {searchable:7.2f}s  all summarized after {summarized:7.2f}s  "
+                  f"{stub.requests:>5} requests  {len(index)} indexed, {pending} pending")
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
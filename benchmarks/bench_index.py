@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+INDEX.md maintenance: rewriting it per imported entry vs. one buffered merge per run.
+
+Usage:
+    python3 benchmarks/bench_index.py --existing 5000 --new 500
+
+"per entry" flushes after every update_index call, which is what a direct
+fix of the old stub (read, insert, rewrite) would cost. "buffered" queues all
+rows and flushes once, as the importer does.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer  # noqa: E402
+
+
+def entries(importer, count: int, start: datetime, prefix: str):
+    for i in range(count):
+        date = start + timedelta(hours=i * 7)
+        data = {"date": date, "title": f"{prefix} conversation {i}", "tags": ["music", "code"]}
+        folder = importer.ARCHIVE_ROOT / str(date.year) / importer.MONTH_NAMES[date.month]
+        yield data, folder / f"{date:%Y-%m-%d}-{prefix}-{i}.md"
+
+
+def run(importer, root: Path, existing: int, new: int, per_entry: bool) -> float:
+    importer.settings.ARCHIVE_ROOT = root
+    (root / "INDEX.md").unlink(missing_ok=True)
+    for data, filepath in entries(importer, existing, datetime(2020, 1, 1), "old"):
+        importer.update_index(data, filepath)
+    importer.flush_index()
+
+    start = time.perf_counter()
+    for data, filepath in entries(importer, new, datetime(2026, 1, 1), "new"):
+        importer.update_index(data, filepath)
+        if per_entry:
+            importer.flush_index()
+    importer.flush_index()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--existing", type=int, default=5000)
+    parser.add_argument("--new", type=int, default=500)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        buffered = run(importer, root, args.existing, args.new, per_entry=False)
+        buffered_index = (root / "INDEX.md").read_text()
+        per_entry = run(importer, root, args.existing, args.new, per_entry=True)
+        same = "same INDEX.md" if (root / "INDEX.md").read_text() == buffered_index else "INDEX.md DIFFERS"
+        print(f"  {args.new} new rows into {args.existing}: per entry {per_entry:.2f}s, "
+              f"buffered {buffered * 1000:.0f} ms  ({same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+extract_key_outputs on long transcripts: the old per-marker, lines.index() scan vs. the single pass.
+
+Usage:
+    python3 benchmarks/bench_key_outputs.py --lines 10000 100000
+
+Two shapes are timed. "fallback" has no decision markers and no usable
+assistant lines, so both implementations scan the whole transcript and the
+old one calls lines.index() for every assistant line. "early" has decisions
+near the top, where the single pass stops after three hits.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer  # noqa: E402
+
+
+def reference_extract_key_outputs(transcript: str):
+    """extract_key_outputs as it was before the single pass (markers as substrings)."""
+    outputs = []
+    decision_markers = [r"decided to", r"will", r"going to", r"plan to", r"final(?:ized|ized)?"]
+
+    lines = transcript.split('\n')
+    for line in lines:
+        line_lower = line.lower()
+        for marker in decision_markers:
+            if marker in line_lower and len(line) < 200:
+                cleaned = re.sub(r'\*\*(.+?):\*\*', '', line).strip()
+                if len(cleaned) > 10 and len(cleaned) < 150:
+                    outputs.append(f"- {cleaned[:100]}")
+                    if len(outputs) >= 3:
+                        break
+        if len(outputs) >= 3:
+            break
+
+    if not outputs:
+        for line in lines:
+            if "**Assistant:**" in line or "**assistant**:" in line.lower():
+                idx = lines.index(line)
+                for next_line in lines[idx+1:idx+4]:
+                    if next_line.strip() and not next_line.startswith("**"):
+                        cleaned = next_line.strip()
+                        if len(cleaned) > 20 and len(cleaned) < 150:
+                            outputs.append(f"- {cleaned[:100]}")
+                            if len(outputs) >= 3:
+                                break
+                if len(outputs) >= 3:
+                    break
+
+    return outputs[:3] if outputs else ["- [Key decisions or outputs from this conversation]"]
+
+
+def make_transcript(num_lines: int, shape: str) -> str:
+    lines = []
+    for i in range(num_lines):
+        if i % 2 == 0:
+            lines.append(f"**Human:** question {i}")
+        else:
+            # Distinct assistant lines so lines.index() has to walk to each one
+            lines.append(f"**Assistant:** reply {i}")
+    if shape == "early":
+        lines[5] = "We decided to split the importer into stages"
+        lines[9] = "Going to add a checkpoint after each batch"
+        lines[13] = "The plan is to ship it and it will be finalized Friday"
+    return "\n".join(lines)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    importer = load_importer()
+
+    for num_lines in args.lines:
+        for shape in ("fallback", "early"):
+            transcript = make_transcript(num_lines, shape)
+            old, old_seconds = timed(reference_extract_key_outputs, transcript)
+            new, new_seconds = timed(importer.extract_key_outputs, transcript)
+            same = "same result" if old == new else "RESULTS DIFFER"
+            print(f"  {num_lines:>7} lines, {shape:8}: old {old_seconds * 1000:9.1f} ms, "
+                  f"single pass {new_seconds * 1000:7.1f} ms  ({same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+detect_domain + generate_tags: per-keyword substring scans vs. the one-pass matcher.
+
+Usage:
+    python3 benchmarks/bench_keywords.py --transcript-kb 1024 --extra-keywords 500
+
+The reference implementation below is the substring scan the importer used
+before KeywordMatcher. Both must produce the same domain and tags.
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+
+def reference_analysis(importer, content: str, title: str):
+    """detect_domain and generate_tags as substring scans (one pass per keyword)."""
+    def detect(content, title):
+        combined = f"{title} {content}".lower()
+        scores = {}
+        for domain, keywords in importer.DOMAIN_KEYWORDS.items():
+            score = sum(1 for kw in keywords if kw.lower() in combined)
+            if score > 0:
+                scores[domain] = score
+        return max(scores, key=scores.get) if scores else "@system"
+
+    domain = detect(content, title)
+    combined = f"{title} {content}".lower()
+    tags = {detect(content, title).replace("@", "")}
+    for tag, keywords in importer.TOPIC_TAG_KEYWORDS.items():
+        if any(kw in combined for kw in keywords):
+            tags.add(tag)
+    return domain, sorted(tags)[:5]
+
+
+def current_analysis(importer, content: str, title: str):
+    context = {"sprint": {}, "domains": {}}
+    analysis = importer.ConversationAnalysis(title, content)
+    return (importer.detect_domain(content, title, analysis),
+            importer.generate_tags(content, title, context, analysis))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transcript-kb", type=int, default=1024, help="Transcript size (default: 1024)")
+    parser.add_argument("--extra-keywords", type=int, nargs="+", default=[0, 200, 1000],
+                        help="Random custom keywords to add to the domain table")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    importer.CONFIG["human_os"]["enabled"] = False
+    rng = random.Random(1)
+    # Mostly ordinary prose with a keyword every ~20 words
+    prose = ("the and for with that this from have were about into over then when would could "
+             "should there their which because through between answer question example").split()
+    words = [rng.choice(WORDS) if rng.random() < 0.05 else rng.choice(prose)
+             for _ in range(args.transcript_kb * 1024 // 6)]
+    transcript = " ".join(words)
+    base_keywords = {domain: list(kws) for domain, kws in importer.DOMAIN_KEYWORDS.items()}
+
+    for extra in args.extra_keywords:
+        importer.DOMAIN_KEYWORDS.clear()
+        importer.DOMAIN_KEYWORDS.update({domain: list(kws) for domain, kws in base_keywords.items()})
+        for i in range(extra):
+            domain = f"@custom-{i % 20}"
+            word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+            importer.DOMAIN_KEYWORDS.setdefault(domain, []).append(word)
+        importer.analysis._keyword_matcher = None
+        total = sum(len(kws) for kws in importer.DOMAIN_KEYWORDS.values()) + \
+            sum(len(kws) for kws in importer.TOPIC_TAG_KEYWORDS.values())
+
+        timings = {}
+        results = {}
+        for name, analyze in (("substring scan", reference_analysis), ("one-pass matcher", current_analysis)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results[name] = analyze(importer, transcript, "Benchmark")
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+
+        same = "same result" if len(set(map(repr, results.values()))) == 1 else "RESULTS DIFFER"
+        print(f"  {total:>5} keywords, {len(transcript) // 1024} KB:  "
+              + "  ".join(f"{name} {t * 1000:7.1f} ms" for name, t in timings.items())
+              + f"  ({same})")
+
+
+if __name__ == "__main__":
+    main()
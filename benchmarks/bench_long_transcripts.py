@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Long conversations: truncated previews vs. map-reduce summarization within token budgets.
+
+Usage:
+    python3 benchmarks/bench_long_transcripts.py --conversations 20 --tokens 100000
+
+Builds synthetic conversations of about --tokens estimated tokens each, with
+the decision that settles the conversation in its last message, and runs
+analyze_with_claude against a stub client (no API key needed) that reports
+estimate_tokens() of each prompt as its input tokens. For anthropic
+.long_transcripts "truncate" and for "map_reduce" at several token_budget
+values, reports requests and tokens per conversation, and how many final
+prompts contained the closing decision.
+"""
+
+import argparse
+import random
+import sys
+import time
+from argparse import Namespace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+CONCLUSION = "We decided to ship the rebrand on Friday"
+
+
+class StubMessages:
+    """messages.create stand-in: notes for chunk prompts, a combined analysis reply otherwise."""
+
+    def __init__(self, importer):
+        self.importer = importer
+        self.final_prompts = []
+
+    def create(self, **request):
+        prompt = request["messages"][0]["content"]
+        if "SUMMARY:" in prompt:
+            self.final_prompts.append(prompt)
+            text = "SUMMARY:\nStub summary.\n\nKEY OUTPUTS:\n- First"
+        else:
+            # Notes carry a chunk's decisions forward, as a real reply would
+            text = "\n".join(f"- {line[:80]}" for line in prompt.splitlines() if "decided" in line) or "- Chatted."
+        usage = Namespace(input_tokens=self.importer.estimate_tokens(prompt),
+                          output_tokens=min(request["max_tokens"], self.importer.estimate_tokens(text)))
+        return Namespace(content=[Namespace(text=text)], usage=usage)
+
+
+def conversation(importer, rng: random.Random, tokens: int) -> str:
+    messages = []
+    size = 0
+    while size < tokens:
+        speaker = "Human" if len(messages) % 2 == 0 else "Assistant"
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 400)))
+        messages.append(f"**{speaker}:** {text}")
+        size += importer.estimate_tokens(messages[-1])
+    messages.append(f"**Assistant:** {CONCLUSION}.")
+    return "\n\n".join(messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=100000, help="Estimated tokens per conversation")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[8000, 20000, 50000])
+    args = parser.parse_args()
+
+    importer = load_importer()
+    importer.settings.ANTHROPIC_AVAILABLE = True
+    options = importer.CONFIG["anthropic"]
+    options.update(cache=False, requests_per_minute=0, tokens_per_minute=0)
+    stub = StubMessages(importer)
+    scheduler = importer.ClaudeScheduler(Namespace(messages=stub))
+    importer.claude_api.get_claude_scheduler = lambda api_key: scheduler
+
+    rng = random.Random(3)
+    transcripts = [conversation(importer, rng, args.tokens) for _ in range(args.conversations)]
+    print(f"  {args.conversations} conversations of ~{args.tokens} estimated tokens")
+
+    for mode, budget in [("truncate", None)] + [("map_reduce", budget) for budget in args.budgets]:
+        options["long_transcripts"] = mode
+        if budget:
+            options["token_budget"] = budget
+        stub.final_prompts.clear()
+        spent = []
+        requests = 0
+        start = time.perf_counter()
+        for transcript in transcripts:
+            usage = importer.track_api_usage()
+            importer.analyze_with_claude("Rebrand", transcript, "@system", "stub-key")
+            spent.append(usage["input_tokens"] + usage["output_tokens"])
+            requests += usage["api_requests"]
+        elapsed = time.perf_counter() - start
+        importer.claude_api._api_usage.current = None
+        reached = sum(CONCLUSION in prompt for prompt in stub.final_prompts)
+        label = mode if budget is None else f"{mode} budget={budget}"
+        print(f"  {label:24} {requests / len(transcripts):5.1f} requests  "
+              f"{sum(spent) / len(spent):7.0f} tokens/chat (max {max(spent)})  "
+              f"conclusion reached the model in {reached}/{len(transcripts)}  "
+              f"{elapsed / len(transcripts) * 1000:.0f} ms/chat locally")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Restarting a killed import: --resume vs. a plain re-run vs. starting over.
+
+Usage:
+    python3 benchmarks/bench_resume.py --size-mb 40 --kill-at 0.6
+
+Imports a synthetic Claude export once to time a full run, then starts the
+same import into a fresh archive and kills it with SIGKILL part way through
+(no chance to clean up). The crashed archive is copied, and the import is
+finished once with --resume and once without. Reports the time of each, and
+checks that neither left temporary files or -1 duplicates behind.
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import write_synthetic_export  # noqa: E402
+
+REPO = Path(__file__).resolve().parent.parent
+# bin/import-chats.py, with checkpoints every second so the kill lands after a few
+DRIVER = ("import sys; sys.path.insert(0, {repo!r}); import ai_chat_archive.pipeline as p; "
+          "p.CHECKPOINT_INTERVAL = 1.0; from ai_chat_archive.cli import main; main()")
+
+
+def start_import(archive: Path, import_root: Path, *args):
+    env = dict(os.environ, ARCHIVE_PATH=str(archive), IMPORT_ROOT=str(import_root), HUMAN_OS_ENABLED="false")
+    return subprocess.Popen([sys.executable, "-c", DRIVER.format(repo=str(REPO)), "--source", "claude", *args],
+                            env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+
+def timed_import(archive: Path, import_root: Path, *args) -> float:
+    start = time.perf_counter()
+    process = start_import(archive, import_root, *args)
+    output, _ = process.communicate()
+    if process.returncode != 0:
+        raise SystemExit(output[-2000:])
+    return time.perf_counter() - start
+
+
+def check(archive: Path, label: str, count: int):
+    """Every synthetic conversation has a distinct title, so any entry beyond `count` is a -1 copy."""
+    entries = len(list(archive.glob("*/*/*.md")))
+    leftovers = len(list(archive.glob("*/*/.*.tmp")))
+    print(f"  {label}: {entries} entries, {entries - count} -1 copies, {leftovers} temporary files")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=40)
+    parser.add_argument("--kill-at", type=float, default=0.6, help="Fraction of the full run time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        export = tmp / "in" / "claude export" / "conversations.json"
+        export.parent.mkdir(parents=True)
+        count = write_synthetic_export(export, args.size_mb)
+
+        full = timed_import(tmp / "full", tmp / "in")
+        print(f"  full import of {count} conversations: {full:.1f}s")
+        check(tmp / "full", "full run", count)
+
+        process = start_import(tmp / "crashed", tmp / "in")
+        time.sleep(full * args.kill_at)
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+        written = len(list((tmp / "crashed").glob("*/*/*.md")))
+        print(f"  killed after {full * args.kill_at:.1f}s with {written} entries written")
+        shutil.copytree(tmp / "crashed", tmp / "crashed-copy")
+
+        resumed = timed_import(tmp / "crashed", tmp / "in", "--resume")
+        rerun = timed_import(tmp / "crashed-copy", tmp / "in")
+        print(f"  finish with --resume: {resumed:.1f}s, plain re-run: {rerun:.1f}s, "
+              f"start over: {full:.1f}s")
+        check(tmp / "crashed", "--resume", count)
+        check(tmp / "crashed-copy", "re-run", count)
+
+
+if __name__ == "__main__":
+    main()
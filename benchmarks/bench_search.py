@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Query latency of the archive search index vs. scanning every markdown file.
+
+Usage:
+    python3 benchmarks/bench_search.py --entries 50000
+
+Builds a synthetic archive of rendered entries in a temporary directory,
+indexes it with SearchIndex, then times the same queries against the index
+and against a grep-style scan of the files (what the archive-query skill did).
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+QUERIES = ['"brand positioning"', "melody", "dyslexia workflow", "zebra"]
+
+
+def build_archive(importer, root: Path, entries: int):
+    rng = random.Random(11)
+    # Mostly filler from a larger vocabulary, so terms are not in every entry
+    filler = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(20000)]
+
+    def words(n):
+        return " ".join(rng.choice(WORDS) if rng.random() < 0.02 else rng.choice(filler) for _ in range(n))
+
+    start = datetime(2024, 1, 1)
+    for i in range(entries):
+        title = words(4).title()
+        transcript = "\n\n".join(f"**{'Human' if turn % 2 == 0 else 'Assistant'}:** {words(40)}"
+                                 for turn in range(6))
+        data = {"date": start + timedelta(hours=i), "title": title, "topic": importer.sanitize_topic(title),
+                "domain": "@system", "tags": ["system"], "ai": "claude", "transcript": transcript}
+        importer.write_archive_entry(data, importer.render_archive_entry(data))
+
+
+def scan(root: Path, query: str):
+    """Files containing every query term (case-insensitive), like chained grep -ril."""
+    terms = [t.lower() for t in re.findall(r'"([^"]+)"|(\S+)', query) for t in t if t]
+    return [path for path in root.glob("*/*/*.md")
+            if all(term in path.read_text().lower() for term in terms)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50000)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        importer.settings.ARCHIVE_ROOT = root
+
+        start = time.perf_counter()
+        build_archive(importer, root, args.entries)
+        print(f"  wrote {args.entries} entries in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        index = importer.SearchIndex(root / ".search-index.sqlite")
+        importer.rebuild_search_index(root, index)
+        size_mb = (root / ".search-index.sqlite").stat().st_size / 1024 / 1024
+        print(f"  indexed in {time.perf_counter() - start:.1f}s ({size_mb:.0f} MB)")
+
+        for query in QUERIES:
+            start = time.perf_counter()
+            results = index.search(query, limit=10)
+            indexed_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            matches = scan(root, query)
+            scan_ms = (time.perf_counter() - start) * 1000
+            print(f"  {query:22} index {indexed_ms:7.1f} ms (top {len(results)}), "
+                  f"file scan {scan_ms:9.1f} ms ({len(matches)} files)")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Mixed-source imports: one export after another vs. all of them at once (--source all).
+
+Usage:
+    python3 benchmarks/bench_sources.py --size-mb 30 --workers 1 4
+
+Writes synthetic Claude, ChatGPT and Grok exports of the same size, imports
+each on its own, then imports them one after another and with import_streams
+(every export read on its own thread into one conversion and write stage).
+Reports conversations per second for each and checks that the sequential and
+concurrent runs write the same files.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+def write_exports(folder: Path, size_mb: int) -> dict:
+    """One export per source with the same conversations, titled by source so the file names do not collide."""
+    claude = folder / "claude.json"
+    write_synthetic_export(claude, size_mb)
+    chats = json.loads(claude.read_text())
+    created = datetime(2025, 6, 1, 12).timestamp()
+    for chat in chats:
+        chat["name"] = f"Claude {chat['name']}"
+    claude.write_text(json.dumps(chats))
+
+    mappings = [{str(m): {"message": {"author": {"role": "user" if message["sender"] == "human" else "assistant"},
+                                      "content": {"content_type": "text", "parts": [message["text"]]}}}
+                 for m, message in enumerate(chat["chat_messages"])} for chat in chats]
+    chatgpt = folder / "chatgpt.json"
+    chatgpt.write_text(json.dumps([{"id": chat["uuid"], "title": chat["name"].replace("Claude", "ChatGPT"),
+                                    "create_time": created, "mapping": mapping}
+                                   for chat, mapping in zip(chats, mappings)]))
+
+    grok = folder / "grok.json"
+    grok.write_text(json.dumps({"conversations": [
+        {"conversation": {"id": chat["uuid"], "title": chat["name"].replace("Claude", "Grok"),
+                          "create_time": chat["created_at"]},
+         "responses": [{"response": {"sender": message["sender"], "message": message["text"]}}
+                       for message in chat["chat_messages"]]}
+        for chat in chats]}))
+    return {"claude": claude, "chatgpt": chatgpt, "grok": grok}
+
+
+def timed(importer, root: Path, streams, workers: int):
+    """(seconds, conversations imported) for one import_streams run into `root`."""
+    importer.settings.ARCHIVE_ROOT = root
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = importer.import_streams(streams, {"sprint": {}, "domains": {}},
+                                        Namespace(sample=False, workers=workers))
+    return time.perf_counter() - start, stats["imported"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=30, help="Size of each synthetic export (default: 30)")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    importer = load_importer()
+    sources = importer.sources.SOURCES
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        exports = write_exports(tmp, args.size_mb)
+        print(f"  3 exports of {args.size_mb} MB, {os.cpu_count()} CPUs")
+
+        for workers in args.workers:
+            alone = {}
+            for name, path in exports.items():
+                alone[name] = timed(importer, tmp / f"{name}-{workers}",
+                                    [(name, sources[name].iter_conversations(path), None, 0)], workers)
+            print(f"  workers={workers}: " + ", ".join(f"{name} {count / seconds:.0f} chats/s"
+                                                      for name, (seconds, count) in alone.items()))
+
+            sequential = tmp / f"sequential-{workers}"
+            seconds = 0.0
+            for name, path in exports.items():
+                seconds += timed(importer, sequential, [(name, sources[name].iter_conversations(path), None, 0)],
+                                 workers)[0]
+            total = sum(count for _, count in alone.values())
+            print(f"    one after another: {seconds:6.1f}s, {total / seconds:5.0f} chats/s")
+
+            concurrent = tmp / f"concurrent-{workers}"
+            seconds, count = timed(importer, concurrent, [(name, sources[name].iter_conversations(path), None, 0)
+                                                         for name, path in exports.items()], workers)
+            same = sorted(p.relative_to(sequential) for p in sequential.glob("*/*/*.md")) == \
+                sorted(p.relative_to(concurrent) for p in concurrent.glob("*/*/*.md"))
+            print(f"    all at once:       {seconds:6.1f}s, {count / seconds:5.0f} chats/s "
+                  f"({'same files' if same else 'FILES DIFFER'})")
+
+
+if __name__ == "__main__":
+    main()
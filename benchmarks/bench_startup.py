@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Cold start of bin/import-chats.py for --help and a --sample run, with -X importtime.
+
+Usage:
+    python3 benchmarks/bench_startup.py --runs 5
+    python3 benchmarks/bench_startup.py --script /tmp/old-import-chats.py   # compare another version
+
+Each run is a fresh interpreter. Reports the median wall time, the total
+import time, and the largest imports. Exits with status 1 if anthropic is
+imported by a run that does not use --claude-api.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT = Path(__file__).parent.parent / "bin" / "import-chats.py"
+HEAVY = ("anthropic", "yaml", "numpy", "ijson", "sqlite3")
+IMPORT_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def run(script: Path, args, env):
+    """(wall seconds, {top-level module: cumulative microseconds}) for one fresh interpreter."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", str(script), *args], env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"{script} {' '.join(args)} failed:\n{result.stdout}\n{result.stderr[-2000:]}")
+    imports = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE_RE.match(line)
+        if match and not match.group(3).strip(" ") and len(match.group(3)) == 1:
+            imports[match.group(4)] = int(match.group(2))
+    return wall, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--script", type=Path, default=SCRIPT)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "in" / "claude export" / "conversations.json"
+        export.parent.mkdir(parents=True)
+        export.write_text(json.dumps([
+            {"uuid": f"uuid-{i}", "name": f"Song idea {i}", "created_at": "2026-01-16T10:00:00Z",
+             "chat_messages": [{"sender": "human", "text": "Lyrics and a melody for the chorus"},
+                               {"sender": "assistant", "text": "We decided to lift the chorus a fifth."}]}
+            for i in range(5)]))
+        env = dict(os.environ, IMPORT_ROOT=str(Path(tmp) / "in"), HUMAN_OS_ENABLED="false")
+
+        for label, cli_args in (("--help", ["--help"]), ("--sample", ["--sample", "--source", "claude"])):
+            walls = []
+            for i in range(args.runs):
+                # A new archive each time, so every --sample run imports all five conversations
+                env["ARCHIVE_PATH"] = str(Path(tmp) / f"archive-{label}-{i}")
+                wall, imports = run(args.script, cli_args, env)
+                walls.append(wall)
+            total_ms = sum(imports.values()) / 1000
+            top = sorted(imports.items(), key=lambda item: -item[1])[:5]
+            heavy = [name for name in HEAVY if name in imports]
+            print(f"  {label:9} median {statistics.median(walls) * 1000:6.0f} ms, imports {total_ms:6.0f} ms; "
+                  f"optional deps imported: {', '.join(heavy) or 'none'}")
+            print(f"            largest: {', '.join(f'{name} {us / 1000:.0f} ms' for name, us in top)}")
+            failed |= "anthropic" in imports
+    if failed:
+        print("  anthropic was imported without --claude-api")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Peak memory of json.load vs. streaming iter_conversations on a synthetic export.
+
+Usage:
+    python3 benchmarks/bench_stream_memory.py --size-mb 1024
+
+Each reader runs in its own subprocess so ru_maxrss reflects only that reader.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+def run_reader(mode: str, path: Path) -> None:
+    """Consume the export with the given reader and print stats as JSON."""
+    importer = load_importer()
+
+    start = time.perf_counter()
+    if mode == "json.load":
+        with open(path) as f:
+            count = sum(1 for _ in json.load(f))
+    else:
+        count = sum(1 for _ in importer.iter_conversations(path))
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "count": count, "seconds": elapsed, "peak_mb": peak_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024, help="Synthetic export size (default: 1024)")
+    parser.add_argument("--export", type=Path, help="Use an existing conversations.json instead")
+    parser.add_argument("--reader", choices=["json.load", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.reader:
+        run_reader(args.reader, args.export)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = args.export
+        if export is None:
+            export = Path(tmp) / "conversations.json"
+            print(f"Writing ~{args.size_mb} MB synthetic export...")
+            count = write_synthetic_export(export, args.size_mb)
+            print(f"  {count} conversations, {export.stat().st_size / 1024 / 1024:.0f} MB")
+
+        for mode in ("stream", "json.load"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--reader", mode, "--export", str(export)],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"  {mode:<10} {result['count']:>8} chats  {result['seconds']:7.1f}s  "
+                  f"peak RSS {result['peak_mb']:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
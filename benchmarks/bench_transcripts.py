@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Transcript storage: inline in the markdown vs. compressed sidecar files (archive.transcripts).
+
+Usage:
+    python3 benchmarks/bench_transcripts.py --size-mb 30
+
+Imports a synthetic export once per storage mode and reports the archive's
+size on disk, import time, the time to scan every markdown file for a word
+in its summary (what grep over the archive does) and how much it read,
+and the time to read entries back in full with read_archive_entry (what
+archive-show.py does). The synthetic transcripts repeat a small vocabulary,
+so they compress better than real conversations.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+def disk_usage(root: Path) -> int:
+    """Bytes used by the entries (markdown plus sidecars), in whole filesystem blocks."""
+    return sum(p.stat().st_blocks * 512 for p in root.glob("*/*/*") if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=30, help="Size of the synthetic export (default: 30)")
+    parser.add_argument("--compression", choices=["gzip", "zstd"], default="gzip")
+    args = parser.parse_args()
+
+    importer = load_importer()
+    importer.CONFIG["duplicates"]["enabled"] = False
+    importer.CONFIG["archive"]["transcript_compression"] = args.compression
+    context = {"sprint": {}, "domains": {}}
+    summary_word = re.compile(r"^## Summary\n.*\bsynthetic\b", re.MULTILINE | re.IGNORECASE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "conversations.json"
+        count = write_synthetic_export(export, args.size_mb)
+        print(f"  {count} conversations, {os.path.getsize(export) / 1e6:.0f} MB export")
+
+        for storage in ("inline", "sidecar"):
+            importer.CONFIG["archive"]["transcripts"] = storage
+            root = Path(tmp) / storage
+            importer.settings.ARCHIVE_ROOT = root
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                importer.import_conversations("claude", importer.iter_conversations(export), context,
+                                              Namespace(sample=False, workers=1))
+            imported = time.perf_counter() - start
+            files = list(importer.iter_archive_files(root))
+
+            start = time.perf_counter()
+            texts = [path.read_text(encoding="utf-8") for path in files]
+            matches = sum(1 for text in texts if summary_word.search(text))
+            scanned = time.perf_counter() - start
+            read = sum(len(text) for text in texts)
+
+            start = time.perf_counter()
+            for path in files:
+                importer.read_archive_entry(path)
+            shown = time.perf_counter() - start
+
+            print(f"  {storage:8} {disk_usage(root) / 1e6:8.1f} MB on disk  import {imported:6.1f}s  "
+                  f"summary scan {scanned * 1000:7.1f} ms over {read / 1e6:5.1f} MB ({matches} matches)  "
+                  f"full read {shown / len(files) * 1000:.2f} ms/entry")
+
+
+if __name__ == "__main__":
+    main()
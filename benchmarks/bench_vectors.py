@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Vector index query latency: exact blockwise top-k vs. IVF lists, and append cost.
+
+Usage:
+    python3 benchmarks/bench_vectors.py --chunks 100000 300000 --dtype float32 int8
+
+Uses random unit vectors instead of a real embedder, so the numbers are for
+the matrix scan and bookkeeping only (add the embedder's own per-query cost).
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer  # noqa: E402
+
+ENTRY = """---
+date: 2026-01-16
+topic: Benchmark
+---
+
+# Benchmark
+
+## Summary
+s
+
+## Key Outputs
+- k
+
+## Transcript
+
+t
+"""
+
+
+class RandomEmbedder:
+    name = "random-384"
+    dim = 384
+
+    def __init__(self):
+        self.rng = np.random.default_rng(1)
+
+    def embed(self, texts):
+        vectors = self.rng.standard_normal((len(texts), self.dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100000, 300000])
+    parser.add_argument("--dtype", nargs="+", default=["float32", "int8"])
+    args = parser.parse_args()
+
+    importer = load_importer()
+    for dtype in args.dtype:
+        for chunks in args.chunks:
+            with tempfile.TemporaryDirectory() as tmp:
+                config = {"dtype": dtype, "ivf_min_chunks": 10 ** 12}
+                index = importer.VectorIndex(Path(tmp), RandomEmbedder(), config)
+                start = time.perf_counter()
+                for i in range(chunks // 3):  # title, summary and one transcript chunk per entry
+                    index.add(f"entry-{i}.md", ENTRY)
+                index.flush()
+                append_s = time.perf_counter() - start
+
+                timings = {}
+                for mode in ("exact", "ivf"):
+                    if mode == "ivf":
+                        lists = index.train_ivf()
+                        index.ivf_min_chunks = 0
+                    index.search("warm-up")
+                    start = time.perf_counter()
+                    for _ in range(5):
+                        index.search("query", limit=10)
+                    timings[mode] = (time.perf_counter() - start) / 5 * 1000
+                size_mb = index.vectors_path.stat().st_size / 1024 / 1024
+                index.close()
+            print(f"  {dtype:7} {index.rows:>8} chunks ({size_mb:5.0f} MB): append {append_s:5.1f}s, "
+                  f"exact top-10 {timings['exact']:6.1f} ms, IVF ({lists} lists) {timings['ivf']:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
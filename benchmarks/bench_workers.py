@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Import throughput for different --workers settings on a synthetic export.
+
+Usage:
+    python3 benchmarks/bench_workers.py --size-mb 100 --workers 1 2 4 8
+
+Each run imports into a fresh temporary archive and checks that the written
+files are identical to the single-process run.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=100, help="Synthetic export size (default: 100)")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count() or 1}), help="Worker counts to compare")
+    args = parser.parse_args()
+
+    importer = load_importer()
+    context = {"sprint": {}, "domains": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "conversations.json"
+        count = write_synthetic_export(export, args.size_mb)
+        print(f"Synthetic export: {count} conversations, {args.size_mb} MB, {os.cpu_count()} CPUs")
+
+        baseline = None
+        for workers in args.workers:
+            importer.settings.ARCHIVE_ROOT = Path(tmp) / f"archive-{workers}"
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = importer.import_conversations(
+                    "claude", importer.iter_conversations(export), context,
+                    Namespace(sample=False, workers=workers))
+            elapsed = time.perf_counter() - start
+            imported, errors = stats["imported"], stats["errors"]
+
+            files = sorted(p.relative_to(importer.ARCHIVE_ROOT) for p in importer.ARCHIVE_ROOT.rglob("*.md"))
+            if baseline is None:
+                baseline = (elapsed, files)
+            same = "same files" if files == baseline[1] else "FILES DIFFER"
+            print(f"  workers={workers:<3} {imported:>7} imported {errors:>4} errors  "
+                  f"{elapsed:7.2f}s  {imported / elapsed:8.0f} chats/s  "
+                  f"speedup {baseline[0] / elapsed:4.2f}x  ({same})")
+
+
+if __name__ == "__main__":
+    main()
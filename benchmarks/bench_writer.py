@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Archive write throughput: one entry at a time vs. the ArchiveWriter.
+
+Usage:
+    python3 benchmarks/bench_writer.py --entries 5000
+    python3 benchmarks/bench_writer.py --dir /mnt/nfs/tmp      # a network filesystem
+    python3 benchmarks/bench_writer.py --latency-ms 1           # simulate one
+
+Writes the same rendered entries (many sharing a title, so -1, -2 suffixes
+come into play) with write_archive_entry, which does a mkdir, a chain of
+exists() calls and a write per entry, and with ArchiveWriter. --latency-ms
+adds a delay to every filesystem call to stand in for network round trips.
+Reports files per second and filesystem calls per entry.
+"""
+
+import argparse
+import builtins
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import WORDS, load_importer  # noqa: E402
+
+# Calls pathlib and the writer make for an entry (Path.exists is os.stat, write_text is io.open)
+FS_CALLS = (("os", os, "stat"), ("os", os, "mkdir"), ("os", os, "listdir"), ("os", os, "unlink"),
+            ("io", io, "open"))
+
+
+@contextmanager
+def counted_fs_calls(latency: float):
+    """Count (and optionally slow down) filesystem calls while the block runs."""
+    counts = Counter()
+    originals = []
+    for _, module, name in FS_CALLS:
+        original = getattr(module, name)
+        originals.append((module, name, original))
+
+        def wrapper(*args, _original=original, _name=name, **kwargs):
+            counts[_name] += 1
+            if latency:
+                time.sleep(latency)
+            return _original(*args, **kwargs)
+
+        setattr(module, name, wrapper)
+        if name == "open":
+            builtins.open = wrapper
+    try:
+        yield counts
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
+        builtins.open = io.open
+
+
+def entries(importer, count: int):
+    rng = random.Random(7)
+    titles = [" ".join(rng.choice(WORDS) for _ in range(3)).title() for _ in range(count // 4)]
+    start = datetime(2025, 1, 1)
+    result = []
+    for i in range(count):
+        title = rng.choice(titles)
+        data = {"date": start + timedelta(days=rng.randrange(60)), "title": title,
+                "topic": importer.sanitize_topic(title), "domain": "@system", "tags": ["system"],
+                "ai": "claude", "transcript": " ".join(rng.choice(WORDS) for _ in range(300))}
+        result.append((data, importer.render_archive_entry(data)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--dir", type=Path, help="Directory to write in (default: a temporary directory)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added delay per filesystem call")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--queue-depth", type=int, default=64)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    batch = entries(importer, args.entries)
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        # Half the entries exist before the timed run, like an incremental import into a live archive
+        results = {}
+        for mode in ("one at a time", "ArchiveWriter"):
+            importer.settings.ARCHIVE_ROOT = Path(tmp) / mode.replace(" ", "-")
+            for data, content in batch[:len(batch) // 2]:
+                importer.write_archive_entry(data, content)
+            with counted_fs_calls(args.latency_ms / 1000) as counts:
+                start = time.perf_counter()
+                if mode == "ArchiveWriter":
+                    writer = importer.ArchiveWriter(args.threads, args.queue_depth)
+                    paths = [writer.write(data, content) for data, content in batch[len(batch) // 2:]]
+                    writer.close()
+                else:
+                    paths = [importer.write_archive_entry(data, content) for data, content in batch[len(batch) // 2:]]
+                elapsed = time.perf_counter() - start
+            results[mode] = sorted(str(path.relative_to(importer.settings.ARCHIVE_ROOT)) for path in paths)
+            written = len(paths)
+            print(f"  {mode:14} {written / elapsed:8.0f} files/s, "
+                  f"{sum(counts.values()) / written:5.1f} filesystem calls per entry "
+                  f"({', '.join(f'{name} {n / written:.1f}' for name, n in sorted(counts.items()))})")
+            shutil.rmtree(importer.settings.ARCHIVE_ROOT)
+        if results["one at a time"] != results["ArchiveWriter"]:
+            print("  file names differ between the two modes")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Reading an export .zip: extract conversations.json first vs. stream it out of the archive.
+
+Usage:
+    python3 benchmarks/bench_zip.py --size-mb 500
+
+Zips a synthetic Claude export, then reads every conversation with
+iter_conversations after extracting it (what import_sources required
+before) and straight from the .zip. Reports time, bytes written to disk and
+peak Python memory for each (tracemalloc slows both runs down equally).
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import load_importer, write_synthetic_export  # noqa: E402
+
+
+def read_all(importer, path: Path):
+    """(conversations, seconds, peak MB) for one pass over an export."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(1 for _ in importer.iter_conversations(path))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    importer = load_importer()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        export = tmp / "conversations.json"
+        write_synthetic_export(export, args.size_mb)
+        download = tmp / "data-export.zip"
+        with zipfile.ZipFile(download, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.write(export, "data-export/conversations.json")
+        export.unlink()
+        print(f"  export: {args.size_mb} MB of JSON, {download.stat().st_size / 1024 / 1024:.0f} MB zipped")
+
+        for ijson in sorted({importer.settings.IJSON_AVAILABLE, False}, reverse=True):
+            importer.settings.IJSON_AVAILABLE = ijson
+            parser_name = "ijson" if ijson else "pure Python"
+
+            start = time.perf_counter()
+            with zipfile.ZipFile(download) as archive:
+                extracted = Path(archive.extract("data-export/conversations.json", tmp / "extracted"))
+            extract_s = time.perf_counter() - start
+            count, read_s, peak = read_all(importer, extracted)
+            written = extracted.stat().st_size / 1024 / 1024
+            extracted.unlink()
+            print(f"  {parser_name:11} extract + read: {extract_s + read_s:5.1f}s "
+                  f"({extract_s:.1f}s extracting), {written:.0f} MB written, peak {peak:.1f} MB")
+
+            count_zip, zip_s, peak = read_all(importer, download)
+            assert count_zip == count
+            print(f"  {parser_name:11} stream from zip: {zip_s:5.1f}s, 0 MB written, peak {peak:.1f} MB "
+                  f"({count} conversations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+AI Chat Archive Search
+
+Query the full-text index and metadata catalog that import-chats.py keeps
+alongside the archive. Text queries are ranked with BM25 over title, summary,
+key outputs and transcript; domain, tag, month and date filters are catalog
+lookups. --semantic ranks by embedding similarity instead (needs numpy and
+embeddings.enabled in config.yaml). --duplicates lists clusters of
+near-duplicate entries from the MinHash/LSH index.
+
+Usage:
+    python3 bin/archive-search.py "brand positioning"
+    python3 bin/archive-search.py @loopwalker "trap beats" --limit 20
+    python3 bin/archive-search.py @loopwalker --month December
+    python3 bin/archive-search.py --semantic "feeling stuck on the chorus"
+    python3 bin/archive-search.py --duplicates --threshold 0.7
+    python3 bin/archive-search.py --rebuild --rebuild-catalog
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def report_duplicates(duplicates_path: Path, catalog_path: Path, args):
+    """Print near-duplicate clusters, with dates and titles from the catalog when there is one."""
+    from ai_chat_archive import settings
+    from ai_chat_archive.catalog import ArchiveCatalog
+    from ai_chat_archive.duplicates import DuplicateIndex
+
+    archive_root = settings.ARCHIVE_ROOT
+    start = time.perf_counter()
+    duplicates = DuplicateIndex(duplicates_path, settings.CONFIG["duplicates"])
+    clusters = duplicates.clusters(args.threshold)
+    duplicates.close()
+    elapsed = time.perf_counter() - start
+    catalog = ArchiveCatalog(catalog_path) if catalog_path.exists() else None
+
+    for number, cluster in enumerate(clusters, 1):
+        members = []
+        for path, similarity in cluster:
+            entry = catalog.get(path) if catalog else None
+            members.append({"path": path, "similarity": round(similarity, 2),
+                            "date": entry["date"] if entry else "", "title": entry["topic"] if entry else ""})
+        if args.json:
+            for member in members:
+                member["path"] = str(archive_root / member["path"])
+            print(json.dumps({"cluster": number, "entries": members}, ensure_ascii=False))
+            continue
+        print(f"Cluster {number} ({len(members)} entries)")
+        for member in members:
+            print(f"  {member['similarity']:.2f}  {member['date']:<10}  {member['title'] or member['path']}")
+            print(f"        {archive_root / member['path']}")
+    if catalog:
+        catalog.close()
+    if not args.json:
+        print(f"\n{len(clusters)} cluster(s) in {elapsed * 1000:.1f} ms")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search the AI chat archive")
+    parser.add_argument("query", nargs="*", help='Words, "quoted phrases", OR, and @domain filters')
+    parser.add_argument("--limit", type=int, default=10, help="Maximum number of results (default: 10)")
+    parser.add_argument("--domain", action="append", default=[], help="Only return entries from this domain")
+    parser.add_argument("--tag", action="append", default=[], help="Only return entries with this tag")
+    parser.add_argument("--month", help='Only return entries from this month ("2025-12", "December")')
+    parser.add_argument("--since", help="Only return entries on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Only return entries on or before this date (YYYY-MM-DD)")
+    parser.add_argument("--ai", choices=["claude", "chatgpt", "grok"], help="Only return entries from this source")
+    parser.add_argument("--semantic", action="store_true",
+                        help="Rank by embedding similarity instead of keywords (vector index)")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="List clusters of near-duplicate entries instead of searching")
+    parser.add_argument("--threshold", type=float,
+                        help="Similarity for --duplicates (default: duplicates.threshold in config.yaml)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every markdown entry in the archive")
+    parser.add_argument("--rebuild-catalog", action="store_true",
+                        help="Re-create the metadata catalog from the markdown entries in the archive")
+    parser.add_argument("--rebuild-vectors", action="store_true",
+                        help="Re-embed every markdown entry in the archive into the vector index")
+    parser.add_argument("--rebuild-duplicates", action="store_true",
+                        help="Re-compute near-duplicate signatures for every markdown entry in the archive")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processes for --rebuild-catalog and --rebuild-duplicates (default: 0 = all cores)")
+    args = parser.parse_intermixed_args()
+
+    from ai_chat_archive import settings
+    from ai_chat_archive.catalog import ArchiveCatalog, get_catalog_path, parse_month, rebuild_catalog
+    from ai_chat_archive.duplicates import DuplicateIndex, get_duplicate_index_path, rebuild_duplicate_index
+    from ai_chat_archive.search import SearchIndex, build_search_query, get_search_index_path, rebuild_search_index
+
+    archive_root = settings.ARCHIVE_ROOT
+    index_path = get_search_index_path()
+    catalog_path = get_catalog_path()
+
+    if args.month:
+        try:
+            parse_month(args.month)
+        except ValueError as e:
+            parser.error(f"--month: {e}")
+
+    if (args.semantic or args.rebuild_vectors) and not settings.NUMPY_AVAILABLE:
+        print("Error: the vector index needs numpy. Run: pip install numpy")
+        sys.exit(1)
+    rebuilding = args.rebuild or args.rebuild_catalog or args.rebuild_vectors or args.rebuild_duplicates
+    if rebuilding and not archive_root.exists():
+        print(f"Archive not found: {archive_root}")
+        sys.exit(1)
+    if args.rebuild:
+        start = time.perf_counter()
+        index = SearchIndex(index_path)
+        count = rebuild_search_index(archive_root, index)
+        index.close()
+        print(f"Indexed {count} entries in {time.perf_counter() - start:.1f}s -> {index_path}")
+    if args.rebuild_catalog:
+        start = time.perf_counter()
+        catalog = ArchiveCatalog(catalog_path)
+        count = rebuild_catalog(archive_root, catalog, args.workers or os.cpu_count() or 1)
+        catalog.close()
+        print(f"Cataloged {count} entries in {time.perf_counter() - start:.1f}s -> {catalog_path}")
+    if args.rebuild_vectors:
+        from ai_chat_archive.vectors import open_vector_index, rebuild_vector_index
+
+        start = time.perf_counter()
+        vectors = open_vector_index(reset=True)
+        count = rebuild_vector_index(archive_root, vectors)
+        vectors.close()
+        print(f"Embedded {count} entries in {time.perf_counter() - start:.1f}s -> {vectors.directory}")
+    duplicates_path = get_duplicate_index_path()
+    if args.rebuild_duplicates:
+        start = time.perf_counter()
+        duplicates = DuplicateIndex(duplicates_path, settings.CONFIG["duplicates"])
+        count = rebuild_duplicate_index(archive_root, duplicates, args.workers or os.cpu_count() or 1)
+        duplicates.close()
+        print(f"Signed {count} entries in {time.perf_counter() - start:.1f}s -> {duplicates_path}")
+    if args.duplicates:
+        if not duplicates_path.exists():
+            print(f"No duplicate index at {duplicates_path}")
+            print("  Set duplicates.enabled in config.yaml and run an import, or build it from the existing "
+                  "archive with: archive-search.py --rebuild-duplicates")
+            sys.exit(1)
+        report_duplicates(duplicates_path, catalog_path, args)
+        return
+
+    text, query_domains = build_search_query(" ".join(args.query))
+    domains = args.domain + query_domains
+    filters = {"tags": args.tag, "month": args.month, "since": args.since, "until": args.until, "ai": args.ai}
+    # @domain words narrow a keyword search inside the FTS query; everything else filters via the catalog
+    use_catalog = any(filters.values()) or (domains and (not text or args.semantic))
+
+    if not text and not domains and not any(filters.values()):
+        if rebuilding:
+            return
+        parser.error("give a query, a filter, --duplicates or a --rebuild option")
+    missing = []
+    if text and args.semantic:
+        from ai_chat_archive.vectors import get_vector_index_path, open_vector_index
+
+        if not get_vector_index_path().exists():
+            missing.append(("vector index", get_vector_index_path(), "--rebuild-vectors"))
+    elif text and not args.semantic and not index_path.exists():
+        missing.append(("search index", index_path, "--rebuild"))
+    if use_catalog and not catalog_path.exists():
+        missing.append(("catalog", catalog_path, "--rebuild-catalog"))
+    for name, path, flag in missing:
+        print(f"No {name} at {path}")
+        print(f"  Run an import, or build it from the existing archive with: archive-search.py {flag}")
+    if missing:
+        sys.exit(1)
+
+    start = time.perf_counter()
+    paths = None
+    if use_catalog:
+        catalog = ArchiveCatalog(catalog_path)
+        entries = catalog.query(domains=domains, limit=None if text else args.limit, **filters)
+        catalog.close()
+        paths = [entry["path"] for entry in entries]
+        results = [{"path": entry["path"], "date": entry["date"], "title": entry["topic"],
+                    "domain": entry["domain"], "tags": entry["tags"], "snippet": ""} for entry in entries]
+    if text and args.semantic:
+        vectors = open_vector_index()
+        matches = vectors.search(" ".join(word for word in args.query if not word.startswith("@")),
+                                 limit=args.limit, paths=paths)
+        vectors.close()
+        catalog = ArchiveCatalog(catalog_path) if catalog_path.exists() else None
+        results = []
+        for match in matches:
+            entry = catalog.get(match["path"]) if catalog else None
+            results.append({"path": match["path"], "date": entry["date"] if entry else "",
+                            "title": entry["topic"] if entry else match["path"],
+                            "domain": entry["domain"] if entry else "", "score": match["score"],
+                            "snippet": f"(best match: {match['kind']} chunk {match['chunk']})"})
+        if catalog:
+            catalog.close()
+    elif text:
+        index = SearchIndex(index_path)
+        results = index.search(" ".join(args.query), limit=args.limit, domains=args.domain, paths=paths)
+        index.close()
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        for result in results:
+            result["path"] = str(archive_root / result["path"])
+            print(json.dumps(result, ensure_ascii=False))
+        return
+
+    for result in results:
+        print(f"{result['date']}  {result['domain']:<18} {result['title']}")
+        print(f"    {archive_root / result['path']}")
+        if result["snippet"]:
+            print(f"    {' '.join(result['snippet'].split())}")
+    print(f"\n{len(results)} result(s) in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+AI Chat Archive Show
+
+Print archive entries in full. With archive.transcripts "sidecar" in
+config.yaml, the markdown files hold the frontmatter, summary and key
+outputs, and each transcript is in a compressed file next to its entry;
+this reads it back on demand. --convert rewrites the archive into one
+storage mode or the other (the indexes are unaffected).
+
+Usage:
+    python3 bin/archive-show.py 2026/01-January/2026-01-16-project-planning.md
+    python3 bin/archive-show.py --transcript ~/AI-CHAT-ARCHIVE/2026/01-January/2026-01-16-project-planning.md
+    python3 bin/archive-show.py --convert sidecar
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show archive entries with their transcripts")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Entries to show (absolute, or relative to the archive or current directory)")
+    parser.add_argument("--transcript", action="store_true", help="Print only the transcript")
+    parser.add_argument("--convert", choices=["inline", "sidecar"],
+                        help="Rewrite every entry with its transcript stored this way")
+    args = parser.parse_args()
+    if not args.paths and not args.convert:
+        parser.error("give an entry to show, or --convert")
+
+    from ai_chat_archive import settings
+    from ai_chat_archive.search import parse_archive_entry
+    from ai_chat_archive.transcripts import convert_transcripts, read_archive_entry
+
+    archive_root = settings.ARCHIVE_ROOT
+    if args.convert:
+        if not archive_root.exists():
+            print(f"Archive not found: {archive_root}")
+            sys.exit(1)
+        start = time.perf_counter()
+        count = convert_transcripts(archive_root, args.convert)
+        print(f"Rewrote {count} entries with {args.convert} transcripts in {time.perf_counter() - start:.1f}s")
+        print(f"  (set archive.transcripts: {args.convert} in config/config.yaml for future imports)")
+
+    for path in args.paths:
+        filepath = path.expanduser()
+        if not filepath.is_file() and (archive_root / path).is_file():
+            filepath = archive_root / path
+        if not filepath.is_file():
+            print(f"Entry not found: {path}", file=sys.stderr)
+            sys.exit(1)
+        content = read_archive_entry(filepath)
+        if args.transcript:
+            content = parse_archive_entry(content)["transcript"] + "\n"
+        sys.stdout.write(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+AI Chat Archive Enrichment
+
+Second phase of a two-phase import. import-chats.py --enrich-later writes
+every entry right away with its rule-based summary and key outputs, marked
+`summary: pending` in the frontmatter; this script upgrades pending entries
+in place with Claude summaries, anthropic.concurrency at a time, and keeps
+the search index, catalog and vector index up to date. The marker in each
+file is the only state, so it can be stopped at any point and run again
+(in the background, or overnight) to finish the rest.
+
+Usage:
+    python3 bin/enrich-archive.py
+    python3 bin/enrich-archive.py --limit 500
+    python3 bin/enrich-archive.py --list
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upgrade pending archive entries with Claude summaries")
+    parser.add_argument("--api-key", type=str, help="Anthropic API key (or set ANTHROPIC_API_KEY env var)")
+    parser.add_argument("--limit", type=int, help="Enrich at most this many entries in this run")
+    parser.add_argument("--threads", type=int,
+                        help="Entries analyzed at a time (default: anthropic.concurrency in config.yaml)")
+    parser.add_argument("--list", action="store_true", help="List the pending entries instead of enriching them")
+    args = parser.parse_args()
+
+    from ai_chat_archive import settings
+    from ai_chat_archive.enrich import enrich_archive, iter_pending_entries
+
+    archive_root = settings.ARCHIVE_ROOT
+    if not archive_root.exists():
+        print(f"Archive not found: {archive_root}")
+        sys.exit(1)
+    if args.list:
+        count = 0
+        for filepath in iter_pending_entries(archive_root):
+            print(filepath)
+            count += 1
+        print(f"\n{count} entries pending enrichment")
+        return
+
+    api_key_env = settings.CONFIG["anthropic"]["api_key_env"]
+    api_key = args.api_key or os.environ.get(api_key_env)
+    if not api_key:
+        print(f"Error: enrichment requires {api_key_env} environment variable or --api-key parameter")
+        sys.exit(1)
+    if not settings.ANTHROPIC_AVAILABLE:
+        print("Error: anthropic package not installed. Run: pip install anthropic")
+        sys.exit(1)
+
+    from ai_chat_archive.catalog import ArchiveCatalog, get_catalog_path
+    from ai_chat_archive.search import SearchIndex, get_search_index_path
+
+    search_index = SearchIndex(get_search_index_path())
+    catalog = ArchiveCatalog(get_catalog_path())
+    vector_index = None
+    if settings.CONFIG["embeddings"].get("enabled") and settings.NUMPY_AVAILABLE:
+        from ai_chat_archive.vectors import open_vector_index
+
+        vector_index = open_vector_index()
+
+    def rewritten(path, content):
+        search_index.add(path, content)
+        catalog.refresh(path)
+        if vector_index is not None:
+            vector_index.add(path, content)
+
+    def commit():
+        search_index.commit()
+        catalog.commit()
+        if vector_index is not None:
+            vector_index.flush()
+
+    print(f"Archive location: {archive_root}")
+    print(f"Enriching pending entries with {settings.CONFIG['anthropic']['model']}...")
+    start = time.perf_counter()
+    try:
+        stats = enrich_archive(archive_root, api_key, rewritten, args.limit, args.threads, commit)
+    except KeyboardInterrupt:
+        print("  Interrupted; run bin/enrich-archive.py again to enrich the entries still pending")
+        sys.exit(130)
+    finally:
+        search_index.close()
+        catalog.close()
+        if vector_index is not None:
+            vector_index.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'='*60}")
+    print("Enrichment complete!")
+    print(f"  Enriched: {stats['enriched']} in {elapsed:.1f}s")
+    print(f"  Errors (still pending): {stats['errors']}")
+    if stats['changed']:
+        print(f"  Changed during enrichment (still pending): {stats['changed']}")
+    print(f"  API requests: {stats['api_requests']}")
+    print(f"  API tokens: {stats['input_tokens']} input, {stats['output_tokens']} output")
+    if stats['chunked_conversations']:
+        print(f"  Long conversations summarized in chunks: {stats['chunked_conversations']} "
+              f"({stats['chunks_sent']} chunks sent, {stats['chunks_skipped']} skipped)")
+    if settings.CONFIG["anthropic"].get("cache", True):
+        print(f"  Summary cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
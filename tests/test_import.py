@@ -10,17 +10,17 @@ from datetime import datetime
 from pathlib import Path
 from sys import path
 
-# Add bin directory to path for imports
-path.insert(0, str(Path(__file__).parent.parent / "bin"))
+# Add the repository root to path so the ai_chat_archive package imports
+path.insert(0, str(Path(__file__).parent.parent))
 
-# Mock the import script functions
-# In production, these would be imported from import-chats.py
+# The package behind bin/import-chats.py; settings are patched on import_chats.settings
+import ai_chat_archive as import_chats  # noqa: E402
 
 
 def test_sanitize_topic():
     """Test topic sanitization."""
     # Import after path setup
-    from import_chats import sanitize_topic
+    from ai_chat_archive import sanitize_topic
 
     # Basic conversion
     assert sanitize_topic("Hello World") == "hello-world"
@@ -43,7 +43,7 @@ def test_sanitize_topic():
 def test_config_loading(tmp_path):
     """Test configuration loading with priority."""
     import os
-    from import_chats import load_config
+    from ai_chat_archive import load_config
 
     # Test default config (no file, no env vars)
     config = load_config()
@@ -61,7 +61,6 @@ domains:
 """)
 
     # Mock config path
-    import import_chats
     original_path = Path(import_chaps.__file__).parent.parent / "config" / "config.yaml"
     # In production, would temporarily replace config path
 
@@ -76,7 +75,7 @@ domains:
 
 def test_detect_domain():
     """Test domain detection from content."""
-    from import_chats import detect_domain, DOMAIN_KEYWORDS
+    from ai_chat_archive import detect_domain, DOMAIN_KEYWORDS
 
     # Music domain
     content = "I'm working on a new song with hip-hop beats"
@@ -96,7 +95,7 @@ def test_detect_domain():
 
 def test_generate_tags():
     """Test tag generation."""
-    from import_chats import generate_tags
+    from ai_chat_archive import generate_tags
 
     context = {
         "sprint": {"flagship": "Brand System"},
@@ -119,9 +118,37 @@ def test_generate_tags():
     assert len(tags) <= 5
 
 
+def test_keyword_matcher_matches_substring_scan():
+    """Test the one-pass matcher finds exactly the keywords a substring scan finds."""
+    import random
+    from ai_chat_archive import KeywordMatcher
+
+    keywords = ["shadow", "shadow work", "shadow-work", "music", "music group", "dm", "2e",
+                "site", "website", "web", "a.b", "c++", "sing", "in"]
+    matcher = KeywordMatcher(keywords)
+    matcher.REGEX_MIN_KEYWORDS = 0  # Exercise the regex pass on a small table
+    rng = random.Random(7)
+    vocabulary = keywords + ["admin", "websites", "shadowy", "x", " ", "-", "singing"]
+
+    for _ in range(200):
+        text = "".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12)))
+        assert matcher.find(text) == {kw for kw in keywords if kw in text}
+
+    assert KeywordMatcher([]).find("anything") == set()
+
+
+def test_keyword_matcher_follows_configured_keywords(monkeypatch):
+    """Test the shared matcher is rebuilt when the domain keywords change."""
+    from ai_chat_archive.analysis import get_keyword_matcher
+
+    assert "zephyrology" not in get_keyword_matcher().find("notes on zephyrology")
+    monkeypatch.setattr(import_chats.settings, "DOMAIN_KEYWORDS", {"@weather": ["zephyrology"]})
+    assert "zephyrology" in get_keyword_matcher().find("notes on zephyrology")
+
+
 def test_month_names():
     """Test month name mapping."""
-    from import_chats import MONTH_NAMES
+    from ai_chat_archive import MONTH_NAMES
 
     assert MONTH_NAMES[1] == "01-January"
     assert MONTH_NAMES[6] == "06-June"
@@ -133,7 +160,7 @@ def test_month_names():
 
 def test_parse_claude_conversation():
     """Test Claude conversation parsing."""
-    from import_chats import parse_claude_conversation
+    from ai_chat_archive import parse_claude_conversation
 
     chat = {
         "name": "Test Conversation",
@@ -156,7 +183,7 @@ def test_parse_claude_conversation():
 
 def test_parse_chatgpt_conversation():
     """Test ChatGPT conversation parsing."""
-    from import_chats import parse_chatgpt_conversation
+    from ai_chat_archive import parse_chatgpt_conversation
 
     chat = {
         "title": "GPT Test",
@@ -183,9 +210,79 @@ def test_parse_chatgpt_conversation():
     assert "transcript" in result
 
 
+def test_grok_export_streams_and_parses(monkeypatch, tmp_path):
+    """Test streaming a Grok export (an object, not an array) and parsing its conversations."""
+    from ai_chat_archive.cli import SOURCE_NAMES
+    from ai_chat_archive.sources import SOURCES
+
+    assert tuple(SOURCES) == SOURCE_NAMES
+    chats = [{
+        "conversation": {"id": "g1", "title": "Grok Test", "create_time": "2026-01-16T10:00:00Z"},
+        "responses": [
+            {"response": {"sender": "ASSISTANT", "message": "Hi there!",
+                          "create_time": {"$date": {"$numberLong": "1768557660000"}}}},
+            {"response": {"sender": "human", "message": "Hello [grok]",
+                          "create_time": {"$date": {"$numberLong": "1768557600000"}}}},
+        ],
+    }, {"conversation": {"id": "g2", "title": "Empty", "create_time": "2026-01-17T10:00:00Z"}, "responses": []}]
+    export = tmp_path / "prod-grok-backend.json"
+    export.write_text(json.dumps({"projects": [{"conversations": []}], "conversations": chats, "tasks": []}))
+
+    grok = SOURCES["grok"]
+    for ijson in {import_chats.settings.IJSON_AVAILABLE, False}:
+        monkeypatch.setattr(import_chats.settings, "IJSON_AVAILABLE", ijson)
+        assert list(grok.iter_conversations(export)) == chats
+        assert list(grok.iter_conversations(export, skip=1)) == chats[1:]
+
+    result = grok.parse(chats[0], {"sprint": {}, "domains": {}})
+    assert result["title"] == "Grok Test"
+    assert result["ai"] == "grok"
+    assert result["transcript"] == "**Human:** Hello [grok]\n\n**Assistant:** Hi there!"
+    assert grok.parse(chats[1], {"sprint": {}, "domains": {}}) is None
+    assert grok.conversation_id(chats[0]) == "g1"
+
+
+def _chatgpt_node(role, text, parent, children):
+    return {
+        "message": {"author": {"role": role}, "content": {"content_type": "text", "parts": [text]}},
+        "parent": parent,
+        "children": children,
+    }
+
+
+def test_chatgpt_transcript_follows_branches():
+    """Test ChatGPT transcripts follow the active branch, or every branch once."""
+    from ai_chat_archive import chatgpt_transcript_parts
+
+    # A regenerated answer: q1 has two replies, and the second one was continued.
+    # Mapping order interleaves the branches.
+    mapping = {
+        "root": {"message": None, "parent": None, "children": ["q1"]},
+        "a1-new": _chatgpt_node("assistant", "New answer", "q1", ["q2"]),
+        "q1": _chatgpt_node("user", "Question", "root", ["a1-old", "a1-new"]),
+        "q2": _chatgpt_node("user", "Follow-up", "a1-new", ["a2"]),
+        "a1-old": _chatgpt_node("assistant", "Old answer", "q1", []),
+        "a2": _chatgpt_node("assistant", "Final answer", "q2", []),
+    }
+
+    assert chatgpt_transcript_parts(mapping, "a2") == [
+        "**User:** Question", "**Assistant:** New answer",
+        "**User:** Follow-up", "**Assistant:** Final answer",
+    ]
+    # Without current_node, the last leaf in mapping order is the active branch
+    assert chatgpt_transcript_parts(mapping) == chatgpt_transcript_parts(mapping, "a2")
+
+    assert chatgpt_transcript_parts(mapping, "a2", all_branches=True) == [
+        "**User:** Question",
+        "*[Branch 1 of 2]*", "**Assistant:** Old answer",
+        "*[Branch 2 of 2]*", "**Assistant:** New answer",
+        "**User:** Follow-up", "**Assistant:** Final answer",
+    ]
+
+
 def test_generate_summary():
     """Test summary generation."""
-    from import_chats import generate_summary
+    from ai_chat_archive import generate_summary
 
     title = "Music Production Workflow"
     transcript = """
@@ -204,7 +301,7 @@ def test_generate_summary():
 
 def test_extract_key_outputs():
     """Test key outputs extraction."""
-    from import_chats import extract_key_outputs
+    from ai_chat_archive import extract_key_outputs
 
     transcript = """
     **Human:** What should we do?
@@ -223,6 +320,26 @@ def test_extract_key_outputs():
         assert output.startswith("-")
 
 
+def test_extract_key_outputs_fallback_uses_line_positions():
+    """Test the assistant fallback reads the lines after each marker, even when markers repeat."""
+    from ai_chat_archive import extract_key_outputs
+
+    transcript = "\n".join([
+        "**Assistant:**",
+        "First answer about the overall project layout",
+        "**Human:** ok",
+        "**Assistant:**",
+        "Second answer about the deployment pipeline",
+    ])
+    assert extract_key_outputs(transcript) == [
+        "- First answer about the overall project layout",
+        "- Second answer about the deployment pipeline",
+    ]
+
+    # A line with several markers is one output, not one per marker
+    assert extract_key_outputs("We will plan to ship it on Friday") == ["- We will plan to ship it on Friday"]
+
+
 def test_path_expansion():
     """Test path expansion with tilde."""
     from pathlib import Path
@@ -233,6 +350,58 @@ def test_path_expansion():
     assert "AI-CHAT-ARCHIVE" in str(path)
 
 
+def test_iter_conversations_streams_export():
+    """Test streaming conversations from an export file."""
+    from ai_chat_archive import iter_conversations
+
+    fixture = Path(__file__).parent / "fixtures" / "sample-claude-export.json"
+    expected = json.loads(fixture.read_text())
+
+    assert list(iter_conversations(fixture)) == expected
+    assert list(iter_conversations(fixture, skip=1)) == expected[1:]
+
+
+def test_iter_conversations_streams_from_zip(monkeypatch, tmp_path):
+    """Test reading conversations.json straight out of an export .zip, with and without ijson."""
+    import zipfile
+
+    fixture = Path(__file__).parent / "fixtures" / "sample-claude-export.json"
+    expected = json.loads(fixture.read_text())
+    export = tmp_path / "data-2026-01-16.zip"
+    with zipfile.ZipFile(export, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("users.json", "[]")
+        archive.write(fixture, "data-2026-01-16/conversations.json")
+
+    assert import_chats.describe_export(export) == f"{export} (data-2026-01-16/conversations.json)"
+    for ijson in {import_chats.settings.IJSON_AVAILABLE, False}:
+        monkeypatch.setattr(import_chats.settings, "IJSON_AVAILABLE", ijson)
+        assert list(import_chats.iter_conversations(export)) == expected
+
+    empty = tmp_path / "empty.zip"
+    with zipfile.ZipFile(empty, "w") as archive:
+        archive.writestr("users.json", "[]")
+    assert import_chats.describe_export(empty) is None
+
+
+def test_iter_json_array_small_chunks():
+    """Test the pure-Python scanner across chunk boundaries."""
+    import io
+    from ai_chat_archive import _iter_json_array_pure
+
+    chats = [
+        {"name": "Brackets ] and } in a \"string\"", "chat_messages": [{"text": "a\\"}]},
+        {"name": "Unicode é 中", "chat_messages": [], "nested": {"a": [1, 2, {"b": None}]}},
+    ]
+    text = json.dumps(chats, ensure_ascii=False)
+
+    assert list(_iter_json_array_pure(io.StringIO(text), chunk_size=3)) == chats
+
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_json_array_pure(io.StringIO('{"not": "an array"}')))
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_json_array_pure(io.StringIO('[{"truncated": 1}')))
+
+
 @pytest.fixture
 def sample_claude_export():
     """Sample Claude export for testing."""
@@ -281,12 +450,11 @@ def sample_chatgpt_export():
 
 def test_end_to_end_claude(sample_claude_export, tmp_path):
     """Test end-to-end Claude import."""
-    from import_chats import parse_claude_conversation, create_archive_entry
+    from ai_chat_archive import parse_claude_conversation, create_archive_entry
 
     # Mock archive root
-    import import_chats
     original_root = import_chats.ARCHIVE_ROOT
-    import_chats.ARCHIVE_ROOT = tmp_path
+    import_chats.settings.ARCHIVE_ROOT = tmp_path
 
     try:
         context = {"sprint": {}, "domains": {}}
@@ -308,7 +476,978 @@ def test_end_to_end_claude(sample_claude_export, tmp_path):
         assert "## Transcript" in content
 
     finally:
-        import_chats.ARCHIVE_ROOT = original_root
+        import_chats.settings.ARCHIVE_ROOT = original_root
+
+
+def test_import_conversations_workers_deterministic(tmp_path):
+    """Test that a process pool produces the same files as a serial import."""
+    from argparse import Namespace
+
+    chats = [
+        {"name": "Same Title", "created_at": "2026-01-16T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": f"Message {i}"}]}
+        for i in range(20)
+    ]
+    chats.append({"name": "Bad date", "created_at": "2026-13-45", "chat_messages": None})
+    context = {"sprint": {}, "domains": {}}
+
+    original_root = import_chats.ARCHIVE_ROOT
+    outputs = {}
+    try:
+        for workers in (1, 2):
+            import_chats.settings.ARCHIVE_ROOT = tmp_path / f"workers-{workers}"
+            args = Namespace(sample=False, workers=workers)
+            counts = import_chats.import_conversations("claude", chats, context, args)
+            files = sorted(import_chats.ARCHIVE_ROOT.rglob("*.md"))
+            outputs[workers] = (counts, {f.name: f.read_text() for f in files})
+    finally:
+        import_chats.settings.ARCHIVE_ROOT = original_root
+
+    assert outputs[1] == outputs[2]
+    counts, files = outputs[1]
+    assert counts["imported"] == 20
+    assert counts["errors"] == 1
+    assert "2026-01-16-same-title-19.md" in files
+    assert "Message 19" in files["2026-01-16-same-title-19.md"]
+
+
+def test_import_streams_merges_sources_deterministically(monkeypatch, tmp_path):
+    """Test that exports imported concurrently give the same archive as importing them one by one."""
+    from argparse import Namespace
+
+    claude = [{"name": "Same Title", "created_at": "2026-01-16T10:00:00Z",
+               "chat_messages": [{"sender": "human", "text": f"Claude {i}"}]} for i in range(12)]
+    chatgpt = [{"title": "Same Title", "create_time": datetime(2026, 1, 16, 12).timestamp(),
+                "mapping": {"n": {"message": {"author": {"role": "user"},
+                                              "content": {"content_type": "text", "parts": [f"GPT {i}"]}}}}}
+               for i in range(5)]
+
+    def broken():
+        yield {"conversation": {"title": "Grok", "create_time": "2026-01-16T09:00:00Z"},
+               "responses": [{"response": {"sender": "human", "message": "Grok 0"}}]}
+        raise json.JSONDecodeError("Expecting value", "", 0)
+
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1)
+    monkeypatch.setitem(import_chats.settings.CONFIG["duplicates"], "enabled", False)
+    outputs = []
+    for run in range(3):
+        monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path / f"run-{run}")
+        monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+        counts = import_chats.import_streams([("claude", iter(claude), None, 0), ("chatgpt", iter(chatgpt), None, 0),
+                                              ("grok", broken(), None, 0)], context, args)
+        files = {f.name: f.read_text() for f in import_chats.settings.ARCHIVE_ROOT.glob("2026/*/*.md")}
+        outputs.append((counts, files))
+
+    assert outputs[0] == outputs[1] == outputs[2]
+    counts, files = outputs[0]
+    assert counts["imported"] == 18
+    assert "2026-01-16-same-title-16.md" in files
+    assert sum("Grok 0" in text for text in files.values()) == 1
+
+    # One stream at a time writes the same set of entries
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path / "sequential")
+    for source, chats in (("claude", claude), ("chatgpt", chatgpt)):
+        import_chats.import_conversations(source, chats, context, args)
+    sequential = {f.read_text() for f in import_chats.settings.ARCHIVE_ROOT.glob("2026/*/*.md")}
+    assert sequential == {text for text in files.values() if "Grok 0" not in text}
+
+
+def test_archive_writer_resolves_names_in_memory(monkeypatch, tmp_path):
+    """Test that the writer lists each folder once, picks free names and reports failed writes."""
+    from datetime import datetime
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    folder = tmp_path / "2026/01-January"
+    folder.mkdir(parents=True)
+    (folder / "2026-01-16-same-title.md").write_text("existing")
+    data = {"date": datetime(2026, 1, 16), "topic": "same-title"}
+
+    listed = []
+    real_listdir = import_chats.entries.os.listdir
+    monkeypatch.setattr(import_chats.entries.os, "listdir",
+                        lambda directory: listed.append(directory) or real_listdir(directory))
+    reported = []
+    writer = import_chats.ArchiveWriter(threads=2, queue_depth=2)
+    paths = [writer.write(data, f"entry {i}", done=lambda entry_path, error: reported.append((entry_path.name, error)))
+             for i in range(5)]
+
+    # A failed write frees its name for the next entry
+    (folder / "2026-01-16-same-title-6.md").mkdir()
+    failed = writer.write(data, "unwritable", done=lambda entry_path, error: reported.append((entry_path.name, error)))
+    writer.close()
+
+    assert listed == [folder]
+    assert [p.name for p in paths] == [f"2026-01-16-same-title-{i}.md" for i in range(1, 6)]
+    assert [p.read_text() for p in paths] == [f"entry {i}" for i in range(5)]
+    assert (folder / "2026-01-16-same-title.md").read_text() == "existing"
+    assert [name for name, error in reported if error is None] == [p.name for p in paths]
+    assert reported[-1][0] == failed.name and isinstance(reported[-1][1], OSError)
+    assert failed.name not in writer.listings[folder]
+
+
+def test_archive_writer_keeps_moved_name_until_written(monkeypatch, tmp_path):
+    """Test a moved entry's old name is not handed to another entry before the old file is removed."""
+    from datetime import datetime
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    folder = tmp_path / "2026/01-January"
+    folder.mkdir(parents=True)
+    old = folder / "2026-01-16-old-title.md"
+    old.write_text("old version")
+
+    writer = import_chats.ArchiveWriter(threads=2, queue_depth=4)
+    moved = writer.write({"date": datetime(2026, 1, 16), "topic": "new-title"}, "moved", replace=old)
+    fresh = writer.write({"date": datetime(2026, 1, 16), "topic": "old-title"}, "fresh")
+    assert fresh.name == "2026-01-16-old-title-1.md"
+    writer.flush()
+
+    assert moved.read_text() == "moved" and fresh.read_text() == "fresh"
+    assert not old.exists() and old.name not in writer.listings[folder]
+    # Once the old file is gone its name is free again
+    assert writer.write({"date": datetime(2026, 1, 16), "topic": "old-title"}, "later") == old
+    writer.close()
+    assert old.read_text() == "later"
+
+
+def test_claude_scheduler_retries_rate_limits():
+    """Test that 429/529, 5xx and connection errors are retried and other errors are not."""
+    from ai_chat_archive import ClaudeScheduler
+
+    class StatusError(Exception):
+        def __init__(self, status_code):
+            super().__init__(f"status {status_code}")
+            self.status_code = status_code
+            self.response = None
+
+    class APIConnectionError(Exception):
+        pass
+
+    class FakeMessages:
+        def __init__(self, failures):
+            self.failures = list(failures)
+            self.calls = 0
+
+        def create(self, **request):
+            self.calls += 1
+            if self.failures:
+                failure = self.failures.pop(0)
+                raise failure if isinstance(failure, Exception) else StatusError(failure)
+            return "ok"
+
+    class FakeClient:
+        def __init__(self, failures):
+            self.messages = FakeMessages(failures)
+
+    client = FakeClient([429, 529, 503, APIConnectionError("reset")])
+    scheduler = ClaudeScheduler(client, concurrency=2, requests_per_minute=600, backoff_base=0)
+    assert scheduler.create(model="m", max_tokens=10, messages=[]) == "ok"
+    assert client.messages.calls == 5
+
+    client = FakeClient([400])
+    scheduler = ClaudeScheduler(client, backoff_base=0)
+    with pytest.raises(StatusError):
+        scheduler.create(model="m", max_tokens=10, messages=[])
+    assert client.messages.calls == 1
+
+
+@pytest.fixture
+def fake_messages_api():
+    """
+    Local stand-in for the Messages API that fails the first request.
+
+    Yields (base URL, request bodies, failures): the first request gets the
+    first (status, error type) of `failures`, 429 unless a test changes it.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    requests = []
+    failures = [(429, "rate_limit_error")]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            requests.append(body)
+            if len(requests) == 1:
+                status, error_type = failures[0]
+                payload = {"type": "error", "error": {"type": error_type, "message": "try again"}}
+                headers = {"retry-after": "0"}
+            else:
+                payload = {
+                    "id": "msg_test", "type": "message", "role": "assistant", "model": body["model"],
+                    "content": [{"type": "text", "text": "Fake summary."}],
+                    "stop_reason": "end_turn", "stop_sequence": None,
+                    "usage": {"input_tokens": 10, "output_tokens": 3},
+                }
+                status, headers = 200, {}
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", requests, failures
+    server.shutdown()
+
+
+@pytest.mark.parametrize("failure", [(429, "rate_limit_error"), (503, "api_error")])
+def test_claude_scheduler_fake_server(fake_messages_api, failure):
+    """Test the shared API client against a local fake API, retrying a 429 or a 503 once."""
+    pytest.importorskip("anthropic")
+
+    base_url, requests, failures = fake_messages_api
+    failures[:] = [failure]
+    original_url = import_chats.CONFIG["anthropic"]["base_url"]
+    import_chats.CONFIG["anthropic"]["base_url"] = base_url
+    import_chats._claude_schedulers.clear()
+    try:
+        scheduler = import_chats.get_claude_scheduler("test-key")
+        assert import_chats.get_claude_scheduler("test-key") is scheduler
+        response = scheduler.create(
+            model="claude-3-haiku-20240307", max_tokens=50,
+            messages=[{"role": "user", "content": "Summarize"}])
+    finally:
+        import_chats.CONFIG["anthropic"]["base_url"] = original_url
+        import_chats._claude_schedulers.clear()
+
+    assert response.content[0].text == "Fake summary."
+    assert len(requests) == 2
+
+
+def test_analyze_with_claude_single_call(monkeypatch, tmp_path):
+    """Test combined analysis makes one request and falls back per field."""
+
+    monkeypatch.setitem(import_chats.CONFIG["anthropic"], "cache", False)
+
+    replies = []
+    requests = []
+
+    class FakeScheduler:
+        def create(self, **request):
+            requests.append(request)
+            text = replies.pop(0)
+            return type("Response", (), {"content": [type("Block", (), {"text": text})()]})()
+
+    monkeypatch.setattr(import_chats.settings, "ANTHROPIC_AVAILABLE", True)
+    monkeypatch.setattr(import_chats.claude_api, "get_claude_scheduler", lambda api_key: FakeScheduler())
+    transcript = "**Human:** Plan the release\n\n**Assistant:** We decided to ship on Friday."
+
+    replies.append("SUMMARY:\nPlanned the release.\n\nKEY OUTPUTS:\n- Ship Friday\n- Write notes")
+    summary, outputs = import_chats.analyze_with_claude("Release", transcript, "@system", "key")
+    assert summary == "Planned the release."
+    assert outputs == ["- Ship Friday", "- Write notes"]
+    assert len(requests) == 1
+
+    # Missing key outputs fall back to rule-based extraction only
+    replies.append("SUMMARY: Planned the release.")
+    summary, outputs = import_chats.analyze_with_claude("Release", transcript, "@system", "key")
+    assert summary == "Planned the release."
+    assert outputs == import_chats.extract_key_outputs(transcript)
+
+    # Missing summary falls back to the rule-based summary only
+    replies.append("KEY OUTPUTS:\n- Ship Friday")
+    summary, outputs = import_chats.analyze_with_claude("Release", transcript, "@system", "key")
+    assert summary == import_chats.generate_summary("Release", transcript, "@system")
+    assert outputs == ["- Ship Friday"]
+
+
+def test_long_transcript_map_reduce_within_budget(monkeypatch):
+    """Test long transcripts are chunked on message boundaries and summarized within the token budget."""
+    options = import_chats.CONFIG["anthropic"]
+    for key, value in {"cache": False, "chunk_tokens": 400, "token_budget": 3000, "max_tokens_chunk_notes": 50,
+                       "long_transcripts": "map_reduce", "combined_analysis": True}.items():
+        monkeypatch.setitem(options, key, value)
+
+    requests = []
+
+    class FakeScheduler:
+        def create(self, **request):
+            requests.append(request)
+            prompt = request["messages"][0]["content"]
+            text = "SUMMARY:\nShipped.\n\nKEY OUTPUTS:\n- Ship Friday" if "SUMMARY:" in prompt else "- noted"
+            import_chats.claude_api.record_api_usage(type("Response", (), {"usage": type("Usage", (), {
+                "input_tokens": import_chats.estimate_tokens(prompt), "output_tokens": 5})()})(), 0.0)
+            return type("Response", (), {"content": [type("Block", (), {"text": text})()]})()
+
+    monkeypatch.setattr(import_chats.settings, "ANTHROPIC_AVAILABLE", True)
+    monkeypatch.setattr(import_chats.claude_api, "get_claude_scheduler", lambda api_key: FakeScheduler())
+    filler = "**Human:** Tell me more about the weather today\n\n**Assistant:** " + "It is mild and grey. " * 40
+    transcript = "\n\n".join(["**Human:** Plan the launch\n\n**Assistant:** We will plan it.\n- pick a day"]
+                               + [filler] * 30 + ["**Human:** So?\n\n**Assistant:** We decided to ship Friday."])
+
+    chunks = import_chats.chunk_transcript(transcript, 400)
+    assert "".join(chunks) == transcript
+    assert all(chunk.startswith(("**Human:** ", "**Assistant:** ")) for chunk in chunks)
+    assert all(import_chats.estimate_tokens(chunk) <= 400 for chunk in chunks)
+
+    usage = import_chats.track_api_usage()
+    summary, outputs = import_chats.analyze_with_claude("Launch", transcript, "@system", "key")
+    import_chats.claude_api._api_usage.current = None
+    assert (summary, outputs) == ("Shipped.", ["- Ship Friday"])
+
+    # First and last chunks are condensed; the filler in between scores no relevance and is skipped
+    notes = [r["messages"][0]["content"] for r in requests[:-1]]
+    assert len(notes) == 2
+    assert "Plan the launch" in notes[0] and "ship Friday" in notes[1]
+    assert f"Part {len(chunks)}:" in requests[-1]["messages"][0]["content"]
+    assert usage["chunks_sent"] == 2 and usage["chunks_skipped"] == len(chunks) - 2
+    assert usage["input_tokens"] + sum(r["max_tokens"] for r in requests) <= 3000
+
+    # "truncate" sends the start of the transcript only
+    requests.clear()
+    monkeypatch.setitem(options, "long_transcripts", "truncate")
+    import_chats.analyze_with_claude("Launch", transcript, "@system", "key")
+    assert len(requests) == 1 and "ship Friday" not in requests[0]["messages"][0]["content"]
+
+
+@pytest.fixture
+def fake_batches_api():
+    """Local stand-in for the Message Batches endpoints; a batch ends on its second retrieve."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    batches = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, payload, content_type="application/json"):
+            data = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _batch(self, batch_id):
+            batch = batches[batch_id]
+            ended = batch["polls"] >= 2
+            return {"id": batch_id, "type": "message_batch", "processing_status": "ended" if ended else "in_progress",
+                    "request_counts": {"processing": 0 if ended else len(batch["requests"]), "succeeded": 0,
+                                       "errored": 0, "canceled": 0, "expired": 0},
+                    "created_at": "2026-01-16T10:00:00Z", "expires_at": "2026-01-17T10:00:00Z",
+                    "ended_at": "2026-01-16T11:00:00Z" if ended else None, "archived_at": None,
+                    "cancel_initiated_at": None,
+                    "results_url": f"http://127.0.0.1:{server.server_port}/v1/messages/batches/{batch_id}/results"
+                    if ended else None}
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            batch_id = f"msgbatch_{len(batches)}"
+            batches[batch_id] = {"requests": body["requests"], "polls": 0}
+            self._send(self._batch(batch_id))
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            batch_id = parts[3]
+            if parts[-1] == "results":
+                lines = []
+                for request in batches[batch_id]["requests"]:
+                    prompt = request["params"]["messages"][0]["content"]
+                    text = ("SUMMARY:\nBatch summary.\n\nKEY OUTPUTS:\n- Batch output" if "SUMMARY:" in prompt
+                            else "- Batch notes")
+                    message = {"id": "msg_test", "type": "message", "role": "assistant",
+                               "model": request["params"]["model"], "content": [{"type": "text", "text": text}],
+                               "stop_reason": "end_turn", "stop_sequence": None,
+                               "usage": {"input_tokens": 10, "output_tokens": 3}}
+                    lines.append(json.dumps({"custom_id": request["custom_id"],
+                                             "result": {"type": "succeeded", "message": message}}))
+                self._send("\n".join(lines) + "\n", "application/binary")
+            else:
+                batches[batch_id]["polls"] += 1
+                self._send(self._batch(batch_id))
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", batches
+    server.shutdown()
+
+
+def test_claude_batch_summaries_resume_across_runs(monkeypatch, tmp_path, fake_batches_api):
+    """Test --claude-batch queues summaries, survives a restart while batches run, and rewrites the entries."""
+    pytest.importorskip("anthropic")
+    from argparse import Namespace
+    from ai_chat_archive.batches import BatchQueue, get_batch_client, run_batches
+
+    base_url, batches = fake_batches_api
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+    monkeypatch.setitem(import_chats.CONFIG["duplicates"], "enabled", False)
+    for key, value in {"base_url": base_url, "cache_path": str(tmp_path / "cache.sqlite"), "chunk_tokens": 400,
+                       "long_transcripts": "map_reduce"}.items():
+        monkeypatch.setitem(import_chats.CONFIG["anthropic"], key, value)
+    long_text = "\n\n".join(f"**Human:** We decided to plan step {i}\n\n**Assistant:** " + "Noted. " * 80
+                             for i in range(20))
+    chats = [{"name": f"Chat {i}", "created_at": "2026-01-16T10:00:00Z",
+              "chat_messages": [{"sender": "human", "text": long_text if i == 0 else f"Message {i}"}]}
+             for i in range(3)]
+
+    queue = BatchQueue(tmp_path)
+    import_chats.import_conversations("claude", chats, {"sprint": {}, "domains": {}},
+                                      Namespace(sample=False, workers=1), batch_queue=queue)
+    client = get_batch_client("key")
+    # First run: submitted and polled once, then the process stops while the batch is running
+    queue.advance()
+    assert queue.submit(client) == queue.running() > 2
+    assert queue.poll(client) is True
+    queue.close()
+
+    queue = BatchQueue(tmp_path)
+    assert run_batches(queue, client, poll_seconds=0) == 3
+    # The first batch is collected, not submitted again; the second holds the long chat's final prompt
+    assert len(batches) == 2 and len(batches["msgbatch_1"]["requests"]) == 1
+    for entry_path in sorted(tmp_path.glob("2026/*/*.md")):
+        content = entry_path.read_text()
+        assert "## Summary\nBatch summary.\n\n## Key Outputs\n- Batch output\n\n## Transcript" in content
+    assert queue.running() == 0
+
+    # Replies were cached: queueing the same entries again needs no requests
+    queue.add("2026/01-January/2026-01-16-chat-1.md", "Chat 1", "@system", "**Human:** Message 1")
+    assert queue.stats["cache_hits"] == 1
+    queue.close()
+
+
+def test_batch_client_requires_message_batches(monkeypatch):
+    """Test get_batch_client fails with a clear error when anthropic has no client.messages.batches."""
+    anthropic = pytest.importorskip("anthropic")
+    from ai_chat_archive.batches import get_batch_client
+
+    class OldAnthropic:
+        def __init__(self, **options):
+            self.messages = object()
+
+    monkeypatch.setattr(anthropic, "Anthropic", OldAnthropic)
+    with pytest.raises(RuntimeError, match=r"anthropic>=0\.41\.0"):
+        get_batch_client("key")
+
+
+def test_enrich_later_upgrades_pending_entries_resumably(monkeypatch, tmp_path):
+    """Test --enrich-later writes marked rule-based entries that enrich_archive upgrades over several runs."""
+    from argparse import Namespace
+    from ai_chat_archive.enrich import enrich_archive, iter_pending_entries
+
+    analysis = "SUMMARY:\nEnriched summary.\n\nKEY OUTPUTS:\n- Enriched output"
+    replies = [analysis, "not an analysis"]
+
+    class FakeScheduler:
+        def create(self, **request):
+            text = replies.pop(0) if replies else analysis
+            return type("Response", (), {"content": [type("Block", (), {"text": text})()]})()
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+    monkeypatch.setattr(import_chats.settings, "ANTHROPIC_AVAILABLE", True)
+    monkeypatch.setattr(import_chats.claude_api, "get_claude_scheduler", lambda api_key: FakeScheduler())
+    monkeypatch.setitem(import_chats.CONFIG["anthropic"], "cache", False)
+    chats = [{"name": f"Chat {i}", "created_at": "2026-01-16T10:00:00Z",
+              "chat_messages": [{"sender": "human", "text": f"We decided to plan step {i}"}]} for i in range(3)]
+    index = import_chats.SearchIndex(tmp_path / "search.sqlite")
+
+    stats = import_chats.import_conversations("claude", chats, {"sprint": {}, "domains": {}},
+                                              Namespace(sample=False, workers=1, enrich_later=True),
+                                              search_index=index)
+    assert stats["pending_enrichment"] == 3
+    pending = list(iter_pending_entries(tmp_path))
+    assert len(pending) == 3
+    assert "\nsummary: pending\n---\n" in pending[0].read_text()
+    assert len(index.search("plan")) == 3
+
+    # The first run is stopped after one entry; the second reply is unusable, so that entry stays pending
+    rewritten = []
+    stats = enrich_archive(tmp_path, "key", lambda entry_path, content: rewritten.append(entry_path),
+                           limit=2, threads=1)
+    assert stats["enriched"] == 1 and stats["errors"] == 1
+    assert len(list(iter_pending_entries(tmp_path))) == 2
+
+    stats = enrich_archive(tmp_path, "key", lambda entry_path, content: index.add(entry_path, content))
+    assert stats["enriched"] == 2 and list(iter_pending_entries(tmp_path)) == []
+    for entry_path in pending:
+        content = entry_path.read_text()
+        assert "summary: pending" not in content
+        assert "## Summary\nEnriched summary.\n\n## Key Outputs\n- Enriched output\n\n## Transcript" in content
+    assert len(index.search("enriched")) == 2
+    index.close()
+
+
+def test_llm_cache_lru_eviction(tmp_path):
+    """Test the response cache evicts least-recently-used entries by size."""
+    from ai_chat_archive import LLMCache
+
+    cache = LLMCache(tmp_path / "cache.sqlite", max_bytes=300)
+    cache.put("a", "x" * 100)
+    cache.put("b", "y" * 100)
+    assert cache.get("a") == "x" * 100  # "a" is now more recent than "b"
+    cache.put("c", "z" * 150)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 100
+    assert cache.get("c") == "z" * 150
+
+    # Replacing an entry counts only its new size
+    for _ in range(5):
+        cache.put("c", "z" * 120)
+    assert cache.size == 220 and cache.get("a") == "x" * 100
+
+    key = LLMCache.make_key("summary", "model", 200, "prompt")
+    assert key == LLMCache.make_key("summary", "model", 200, "prompt")
+    assert key != LLMCache.make_key("summary", "model", 300, "prompt")
+
+
+def test_warm_cache_reimport_makes_no_api_calls(monkeypatch, tmp_path):
+    """Test that re-importing with a warm cache serves every reply from disk."""
+    from argparse import Namespace
+
+    calls = []
+
+    class FakeScheduler:
+        def create(self, **request):
+            calls.append(request)
+            text = "SUMMARY: Cached summary.\nKEY OUTPUTS:\n- Point"
+            return type("Response", (), {"content": [type("Block", (), {"text": text})()]})()
+
+    monkeypatch.setattr(import_chats.settings, "ANTHROPIC_AVAILABLE", True)
+    monkeypatch.setattr(import_chats.claude_api, "get_claude_scheduler", lambda api_key: FakeScheduler())
+    monkeypatch.setitem(import_chats.CONFIG["anthropic"], "cache_path", str(tmp_path / "cache.sqlite"))
+
+    chats = [
+        {"name": f"Chat {i}", "created_at": "2026-01-16T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": f"Question {i}"}]}
+        for i in range(3)
+    ]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1)
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path / "first")
+    cold = import_chats.import_conversations("claude", chats, context, args, True, "key")
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path / "second")
+    warm = import_chats.import_conversations("claude", chats, context, args, True, "key")
+
+    assert cold["cache_misses"] == 3 and cold["cache_hits"] == 0
+    assert warm["cache_hits"] == 3 and warm["cache_misses"] == 0
+    assert len(calls) == 3
+    assert "Cached summary." in next((tmp_path / "second").rglob("*.md")).read_text()
+
+
+def test_incremental_import_skips_unchanged(monkeypatch, tmp_path):
+    """Test that re-imports skip unchanged chats and update changed ones in place."""
+    from argparse import Namespace
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    chats = [
+        {"uuid": f"uuid-{i}", "name": "Same Title", "created_at": "2026-01-16T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": f"Message {i}"}]}
+        for i in range(3)
+    ]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1)
+    manifest = import_chats.ImportManifest(tmp_path)
+
+    first = import_chats.import_conversations("claude", chats, context, args, manifest=manifest)
+    assert first["imported"] == 3
+
+    second = import_chats.import_conversations("claude", chats, context, args, manifest=manifest)
+    assert second["unchanged"] == 3
+    assert second["imported"] == 0
+
+    chats[1]["chat_messages"][0]["text"] = "Edited message"
+    third = import_chats.import_conversations("claude", chats, context, args, manifest=manifest)
+    assert third["updated"] == 1
+    assert third["unchanged"] == 2
+
+    files = sorted(tmp_path.rglob("*.md"))
+    assert [f.name for f in files] == [
+        "2026-01-16-same-title-1.md", "2026-01-16-same-title-2.md", "2026-01-16-same-title.md"]
+    _, previous = manifest.lookup("claude", "uuid-1")
+    assert "Edited message" in previous.read_text()
+    manifest.close()
+
+
+def test_interrupted_import_resumes_without_duplicates(monkeypatch, tmp_path):
+    """Test that a crashed import is redone in place and a stopped one resumes from its checkpoint."""
+    from argparse import Namespace
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+    chats = [
+        {"uuid": f"uuid-{i}", "name": f"Chat {i}", "created_at": "2026-01-16T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": f"Message {i}"}]}
+        for i in range(10)
+    ]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1, full=False)
+
+    def stream(stop):
+        for i, chat in enumerate(chats):
+            if i == stop:
+                raise KeyboardInterrupt
+            yield chat
+
+    # Killed before any checkpoint: files are written, but the manifest records were never committed
+    manifest = import_chats.ImportManifest(tmp_path)
+    monkeypatch.setattr(manifest, "checkpoint", lambda *args: None)
+    with pytest.raises(KeyboardInterrupt):
+        import_chats.import_conversations("claude", stream(4), context, args, manifest=manifest, export="v1")
+    manifest.journal_file.close()
+    manifest.db.close()
+    assert len(list(tmp_path.glob("2026/*/*.md"))) == 4
+
+    # Stopped with Ctrl-C: a checkpoint is saved on the way out
+    manifest = import_chats.ImportManifest(tmp_path)
+    with pytest.raises(KeyboardInterrupt):
+        import_chats.import_conversations("claude", stream(7), context, args, manifest=manifest, export="v1")
+    assert manifest.resume_position("claude", "v1") == 7
+    assert manifest.resume_position("claude", "v2") == 0
+
+    counts = import_chats.import_conversations("claude", chats[7:], context, args, manifest=manifest,
+                                               export="v1", start=7)
+    manifest.close()
+    assert counts["imported"] == 3
+
+    names = sorted(f.name for f in tmp_path.glob("2026/*/*.md"))
+    assert names == sorted(f"2026-01-16-chat-{i}.md" for i in range(10))
+    assert not list(tmp_path.rglob("*.tmp"))
+    assert "[Chat 9]" in (tmp_path / "INDEX.md").read_text()
+
+
+def test_resume_retries_failed_writes(monkeypatch, tmp_path):
+    """Test the checkpoint stays before a conversation whose write failed, so resuming imports it."""
+    from argparse import Namespace
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+    chats = [{"uuid": f"uuid-{i}", "name": f"Chat {i}", "created_at": "2026-01-16T10:00:00Z",
+              "chat_messages": [{"sender": "human", "text": f"Message {i}"}]} for i in range(5)]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1, full=False)
+    real_write = import_chats.entries.write_entry_files
+
+    def write_entry_files(filepath, content, replacing=False):
+        if filepath.name == "2026-01-16-chat-2.md":
+            raise OSError("disk full")
+        real_write(filepath, content, replacing)
+
+    manifest = import_chats.ImportManifest(tmp_path)
+    monkeypatch.setattr(import_chats.entries, "write_entry_files", write_entry_files)
+    counts = import_chats.import_conversations("claude", chats, context, args, manifest=manifest, export="v1")
+    assert counts["imported"] == 4 and counts["errors"] == 1
+    assert manifest.resume_position("claude", "v1") == 2
+
+    monkeypatch.setattr(import_chats.entries, "write_entry_files", real_write)
+    counts = import_chats.import_conversations("claude", chats[2:], context, args, manifest=manifest,
+                                               export="v1", start=2)
+    assert counts["imported"] == 1 and counts["unchanged"] == 2
+    assert manifest.resume_position("claude", "v1") == 5
+    manifest.close()
+    assert (tmp_path / "2026/01-January/2026-01-16-chat-2.md").exists()
+
+
+def test_search_index_follows_imports(monkeypatch, tmp_path):
+    """Test imported entries are searchable and re-imports replace their index rows."""
+    from argparse import Namespace
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    chats = [
+        {"uuid": "uuid-0", "name": "Trap Beat Session", "created_at": "2026-01-16T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": "Help me mix these trap beats with the melody"}]},
+        {"uuid": "uuid-1", "name": "Website Copy", "created_at": "2026-01-17T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": "Rewrite the landing page headline"}]},
+    ]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1)
+    manifest = import_chats.ImportManifest(tmp_path)
+    index = import_chats.SearchIndex(tmp_path / "search.sqlite")
+
+    import_chats.import_conversations("claude", chats, context, args, manifest=manifest, search_index=index)
+    assert len(index) == 2
+    results = index.search('"trap beats"')
+    assert [r["title"] for r in results] == ["Trap Beat Session"]
+    assert (tmp_path / results[0]["path"]).exists()
+    assert [r["title"] for r in index.search("headline OR melody @loopwalker")] == ["Trap Beat Session"]
+
+    chats[0]["chat_messages"][0]["text"] = "Help me write a chorus"
+    import_chats.import_conversations("claude", chats, context, args, manifest=manifest, search_index=index)
+    assert len(index) == 2
+    assert index.search("mix") == []
+    assert [r["title"] for r in index.search("chorus")] == ["Trap Beat Session"]
+
+    # Punctuation in queries is searched for, not parsed as FTS5 syntax
+    assert index.search('mix: "these -trap') == []
+    index.close()
+    manifest.close()
+
+
+
+def test_catalog_matches_rebuild_from_files(monkeypatch, tmp_path):
+    """Test the catalog written during import equals one rebuilt from the markdown files."""
+    from argparse import Namespace
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    chats = [
+        {"uuid": "uuid-0", "name": "New Song", "created_at": "2025-12-03T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": "Lyrics and melody for a song"}]},
+        {"uuid": "uuid-1", "name": "Sprint Review", "created_at": "2025-12-20T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": "Review the sprint workflow"}]},
+        {"uuid": "uuid-2", "name": "Another Song", "created_at": "2026-01-05T10:00:00Z",
+         "chat_messages": [{"sender": "human", "text": "More lyrics for the song"}]},
+    ]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1)
+    catalog = import_chats.ArchiveCatalog(tmp_path / "catalog.sqlite")
+    import_chats.import_conversations("claude", chats, context, args, catalog=catalog)
+
+    assert [e["topic"] for e in catalog.query(domains=["@loopwalker"])] == ["Another Song", "New Song"]
+    assert [e["topic"] for e in catalog.query(domains=["@loopwalker"], month="December")] == ["New Song"]
+    assert [e["topic"] for e in catalog.query(month="2025-12")] == ["Sprint Review", "New Song"]
+    assert [e["topic"] for e in catalog.query(tags=["music"], since="2026-01-01")] == ["Another Song"]
+
+    imported = catalog.query()
+    rebuilt = import_chats.ArchiveCatalog(tmp_path / "rebuilt.sqlite")
+    assert import_chats.rebuild_catalog(tmp_path, rebuilt, workers=2) == 3
+    assert rebuilt.query() == imported
+    assert all(e["transcript_bytes"] > 0 and len(e["content_hash"]) == 64 for e in imported)
+    rebuilt.close()
+    catalog.close()
+
+
+def test_sidecar_transcripts_read_back_like_inline_entries(monkeypatch, tmp_path):
+    """Test archive.transcripts "sidecar" keeps transcripts out of the markdown without changing what is read back."""
+    from argparse import Namespace
+    from ai_chat_archive.transcripts import convert_transcripts, read_archive_entry
+
+    monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+    chats = [{"uuid": f"uuid-{i}", "name": f"Chat {i}", "created_at": "2026-01-16T10:00:00Z",
+              "chat_messages": [{"sender": "human", "text": f"Explain the quicksort partition step {i}"},
+                                {"sender": "assistant", "text": "def partition(items):\n    pass\n" * 50}]}
+             for i in range(2)]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1)
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path / "inline")
+    import_chats.import_conversations("claude", chats, context, args)
+
+    root = tmp_path / "sidecar"
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", root)
+    monkeypatch.setitem(import_chats.CONFIG["archive"], "transcripts", "sidecar")
+    manifest = import_chats.ImportManifest(root)
+    index = import_chats.SearchIndex(root / "search.sqlite")
+    catalog = import_chats.ArchiveCatalog(root / "catalog.sqlite")
+    import_chats.import_conversations("claude", chats, context, args, manifest=manifest, search_index=index,
+                                      catalog=catalog)
+
+    entry = root / "2026/01-January/2026-01-16-chat-0.md"
+    markdown = entry.read_text()
+    assert "quicksort" not in markdown and markdown.endswith(
+        "## Transcript\n\n[Transcript: 2026-01-16-chat-0.transcript.gz](2026-01-16-chat-0.transcript.gz)\n")
+    assert read_archive_entry(entry) == (tmp_path / "inline" / entry.relative_to(root)).read_text()
+    assert [r["title"] for r in index.search("quicksort step 1")] == ["Chat 1"]
+    rebuilt = import_chats.ArchiveCatalog(root / "rebuilt.sqlite")
+    import_chats.rebuild_catalog(root, rebuilt)
+    assert rebuilt.query() == catalog.query()
+
+    # A re-import that moves the entry takes its sidecar along
+    chats[0]["created_at"] = "2026-02-01T10:00:00Z"
+    import_chats.import_conversations("claude", chats, context, args, manifest=manifest, catalog=catalog)
+    assert sorted(p.name for p in root.glob("2026/01-January/*")) == [
+        "2026-01-16-chat-1.md", "2026-01-16-chat-1.transcript.gz"]
+
+    assert convert_transcripts(root, "inline") == 2
+    assert not list(root.rglob("*.transcript.gz"))
+    assert (root / "2026/01-January/2026-01-16-chat-1.md").read_text() == \
+        (tmp_path / "inline/2026/01-January/2026-01-16-chat-1.md").read_text()
+    for db in (manifest, index, catalog, rebuilt):
+        db.close()
+
+
+def test_index_written_once_per_run(monkeypatch, tmp_path):
+    """Test INDEX.md rows are buffered during import and merged in one atomic write."""
+    from argparse import Namespace
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+    index_path = tmp_path / "INDEX.md"
+    index_path.write_text("# My Archive\n\nNotes stay here.\n\n## 2025\n\n### March\n\n"
+                          "- **2025-03-02** — [Old Chat](2025/03-March/2025-03-02-old-chat.md) — code\n")
+
+    writes = []
+    original = import_chats.write_text_atomic
+    monkeypatch.setattr(import_chats.entries, "write_text_atomic",
+                        lambda file, text: (file == index_path and writes.append(file), original(file, text)))
+
+    chats = [
+        {"uuid": f"uuid-{i}", "name": name, "created_at": created,
+         "chat_messages": [{"sender": "human", "text": "Hello"}]}
+        for i, (name, created) in enumerate([("First", "2026-01-05T10:00:00Z"), ("Second", "2026-02-07T10:00:00Z"),
+                                             ("Third", "2026-01-20T10:00:00Z")])
+    ]
+    import_chats.import_conversations("claude", chats, {"sprint": {}, "domains": {}}, Namespace(sample=False, workers=1))
+    assert writes == []
+    assert import_chats.flush_index() == 3
+    assert len(writes) == 1
+
+    content = index_path.read_text()
+    assert content.startswith("# My Archive\n\nNotes stay here.\n\n## 2026\n\n### February\n")
+    rows = [line.split("]")[0].split("[")[1] for line in content.splitlines() if line.startswith("- **")]
+    assert rows == ["Second", "Third", "First", "Old Chat"]
+    assert content.index("### January") < content.index("## 2025") < content.index("### March")
+    assert import_chats.flush_index() == 0
+
+
+def test_flush_index_keeps_hand_written_lines(monkeypatch, tmp_path):
+    """Test lines flush_index does not recognise stay in their section, and a missing INDEX.md is created."""
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    monkeypatch.setattr(import_chats.entries, "_index_updates", {})
+    index_path = tmp_path / "INDEX.md"
+    entry = {"date": datetime(2025, 3, 9), "title": "New Chat", "tags": []}
+
+    import_chats.update_index(entry, tmp_path / "2025/03-March/2025-03-09-new-chat.md")
+    assert import_chats.flush_index() == 1
+    assert index_path.read_text() == (import_chats.INDEX_HEADER + "\n## 2025\n\n### March\n\n"
+                                      "- **2025-03-09** — [New Chat](2025/03-March/2025-03-09-new-chat.md)\n")
+
+    index_path.write_text("# Index\n\n## 2025\n\nA quiet year.\n\n### March\n\n"
+                          "- **2025-03-02** — [Old Chat](2025/03-March/2025-03-02-old-chat.md)\n"
+                          "Remember to tidy March.\n\n### February\n\n- 2025-02-01 paper notes, not imported\n")
+    import_chats.update_index(entry, tmp_path / "2025/03-March/2025-03-09-new-chat.md")
+    assert import_chats.flush_index() == 1
+    assert index_path.read_text() == (
+        "# Index\n\n## 2025\n\nA quiet year.\n\n### March\n\n"
+        "- **2025-03-09** — [New Chat](2025/03-March/2025-03-09-new-chat.md)\n"
+        "- **2025-03-02** — [Old Chat](2025/03-March/2025-03-02-old-chat.md)\n"
+        "\nRemember to tidy March.\n\n### February\n\n- 2025-02-01 paper notes, not imported\n")
+
+
+def test_vector_index_appends_and_searches(tmp_path):
+    """Test the vector index ranks similar entries first and appends re-imports without rewriting."""
+    pytest.importorskip("numpy")
+
+    def entry(title, transcript):
+        data = {"date": datetime(2026, 1, 16), "title": title, "domain": "@system", "tags": [], "ai": "claude",
+                "transcript": transcript}
+        return import_chats.render_archive_entry(data)
+
+    config = {"chunk_chars": 200, "ivf_min_chunks": 10 ** 9}
+    embedder = import_chats.HashingEmbedder(256)
+    index = import_chats.VectorIndex(tmp_path / "vectors", embedder, config)
+    index.add("a.md", entry("Chorus Ideas", "**Human:** The chorus melody needs a stronger hook and lyrics"))
+    index.add("b.md", entry("Tax Forms", "**Human:** Which receipts do I keep for quarterly taxes?"))
+    index.add("c.md", entry("Landing Page", "**Human:** Rewrite the website headline and call to action"))
+    assert [r["path"] for r in index.search("melodies and hooks for a song chorus", limit=2)][0] == "a.md"
+    assert [r["path"] for r in index.search("website", paths=["b.md", "c.md"])] == ["c.md", "b.md"]
+
+    size = index.vectors_path.stat().st_size
+    index.add("b.md", entry("Tax Forms", "**Human:** Write a chorus melody about receipts"))
+    index.flush()
+    assert index.vectors_path.stat().st_size > size
+    assert len(index) == 3
+    index.close()
+
+    # Reopened as int8 with IVF lists, the same entries come back
+    import shutil
+    shutil.rmtree(tmp_path / "vectors")
+    index = import_chats.VectorIndex(tmp_path / "vectors", embedder, {**config, "dtype": "int8", "ivf_min_chunks": 1,
+                                                                     "ivf_probe": 100})
+    index.add("a.md", entry("Chorus Ideas", "**Human:** The chorus melody needs a stronger hook and lyrics"))
+    index.add("c.md", entry("Landing Page", "**Human:** Rewrite the website headline and call to action"))
+    assert index.search("chorus melody", limit=1)[0]["path"] == "a.md"
+    assert index.ivf_path.exists()
+    index.close()
+
+def test_near_duplicates_flagged_on_import_and_clustered(monkeypatch, tmp_path):
+    """Test a near-identical conversation from another export is flagged and reported as a cluster."""
+    from argparse import Namespace
+
+    monkeypatch.setattr(import_chats.settings, "ARCHIVE_ROOT", tmp_path)
+    monkeypatch.setitem(import_chats.settings.CONFIG["duplicates"], "enabled", True)
+    prompt = ("I am writing a song about walking home at night and I need a chorus that lifts after a quiet "
+              "verse, with a melody that climbs and lyrics about streetlights, rain and the last train home")
+    reply = "Start the chorus on the fifth, hold the word streetlights, then resolve down on home " * 3
+    claude = [{"uuid": "uuid-0", "name": "Night Walk Song", "created_at": "2026-01-16T10:00:00Z",
+               "chat_messages": [{"sender": "human", "text": prompt}, {"sender": "assistant", "text": reply}]},
+              {"uuid": "uuid-1", "name": "Tax Receipts", "created_at": "2026-01-17T10:00:00Z",
+               "chat_messages": [{"sender": "human", "text": "Which receipts should I keep for quarterly taxes?"}]}]
+    chatgpt = [{"id": "conv-0", "title": "Chorus help", "create_time": 1768600000, "current_node": "b",
+                "mapping": {"a": _chatgpt_node("user", prompt + " please", None, ["b"]),
+                            "b": _chatgpt_node("assistant", reply, "a", [])}}]
+    context = {"sprint": {}, "domains": {}}
+    args = Namespace(sample=False, workers=1)
+    index = import_chats.DuplicateIndex(tmp_path / "duplicates.sqlite", {"threshold": 0.7})
+
+    import_chats.import_conversations("claude", claude, context, args, duplicate_index=index)
+    stats = import_chats.import_conversations("chatgpt", chatgpt, context, args, duplicate_index=index)
+    assert stats["near_duplicates"] == 1 and stats["imported"] == 1
+    flagged = next(tmp_path.glob("*/*/*chorus-help.md")).read_text()
+    assert 'duplicate_of: "2026/01-January/2026-01-16-night-walk-song.md"' in flagged
+    assert import_chats.parse_archive_entry(flagged)["ai"] == "chatgpt"
+
+    clusters = index.clusters()
+    assert [[entry_path.split("/")[-1] for entry_path, _ in cluster] for cluster in clusters] == [
+        ["2026-01-16-chorus-help.md", "2026-01-16-night-walk-song.md"]]
+    assert clusters[0][1][1] >= 0.7
+
+    # Signatures rebuilt from the markdown files give the same clusters
+    rebuilt = import_chats.DuplicateIndex(tmp_path / "rebuilt.sqlite", {"threshold": 0.7})
+    assert import_chats.rebuild_duplicate_index(tmp_path, rebuilt) == 3
+    assert rebuilt.clusters() == clusters
+    rebuilt.close()
+    index.close()
+
+
+def test_minhash_signature_matches_without_numpy(monkeypatch):
+    """Test the pure-Python MinHash gives the same signature as the numpy path."""
+
+    transcript = "**Human:** " + " ".join(f"word{i % 37} w{i}" for i in range(200))
+    signature = import_chats.minhash_signature(transcript, 64, 5)
+    monkeypatch.setattr(import_chats.settings, "NUMPY_AVAILABLE", False)
+    assert import_chats.minhash_signature(transcript, 64, 5) == signature
+    assert len(signature) == 64 * 4
+    assert import_chats.minhash_signature("", 64, 5) is None
+    assert import_chats.signature_similarity(signature, signature) == 1.0
+
+
+def test_load_context_reparses_only_changed_files(monkeypatch, tmp_path):
+    """Test Human OS fields are cached by mtime and size and the raw documents are not kept."""
+    import os
+
+    root = tmp_path / "Human"
+    (root / "SYSTEM/00-Index").mkdir(parents=True)
+    (root / "SYSTEM/00-Index/Sprint.md").write_text("# Sprint\n\n**Flagship:** Brand Positioning\n")
+    for name in ("brent", "gal"):
+        (root / f"@{name}-INDEX.md").write_text(f"# @{name}\n\n## NOW\n| **{name} project** | active |\n## NEXT\n")
+    monkeypatch.setattr(import_chats.settings, "HUMAN_OS_ROOT", root)
+    monkeypatch.setattr(import_chats.settings, "DERIVED_CACHE_PATH", tmp_path / "cache.json")
+    monkeypatch.setitem(import_chats.CONFIG, "human_os", {"enabled": True, "domains": ["brent", "gal", "missing"]})
+
+    parsed = []
+    for name in ("extract_sprint_fields", "extract_domain_fields"):
+        original = getattr(import_chats, name)
+        monkeypatch.setattr(import_chats.context, name, lambda text, original=original: (parsed.append(text), original(text))[1])
+
+    context = import_chats.load_context()
+    assert context["sprint"] == {"flagship": "Brand Positioning"}
+    assert context["domains"] == {"@brent": {"active_projects": ["brent project"]},
+                                  "@gal": {"active_projects": ["gal project"]}}
+    assert len(parsed) == 3
+    assert "NOW" not in (tmp_path / "cache.json").read_text()
+
+    assert import_chats.load_context() == context
+    assert len(parsed) == 3
+
+    gal = root / "@gal-INDEX.md"
+    gal.write_text("# @gal\n\n## NOW\n| **outreach sprint** | active |\n## NEXT\n")
+    os.utime(gal, ns=(gal.stat().st_atime_ns, gal.stat().st_mtime_ns + 10 ** 9))
+    assert import_chats.load_context()["domains"]["@gal"] == {"active_projects": ["outreach sprint"]}
+    assert len(parsed) == 4
 
 
 if __name__ == "__main__":